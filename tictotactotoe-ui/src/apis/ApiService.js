@@ -17,14 +17,20 @@
 import BaseService from './BaseService';
 
 export default class JsonApiService extends BaseService {
-  static createGames(name) {
+  static createGames(name, size, winLength, ai, aiLevel) {
     return this.postRequest(this.urlGames, {
       name,
+      size,
+      win_length: winLength,
+      ai,
+      ai_level: aiLevel,
     });
   }
 
-  static requestGames() {
-    return this.getRequest(this.urlGames, {});
+  static requestGames(cursor) {
+    return this.getRequest(this.urlGames, {
+      cursor,
+    });
   }
 
   static updateGame(gameId, player) {
@@ -66,6 +72,10 @@ export default class JsonApiService extends BaseService {
     return this.getRequest(`${this.urlGames}/${gameId}`, {});
   }
 
+  static listenGame(gameId) {
+    return new EventSource(`${this.urlGames}/${gameId}/events`, { withCredentials: true });
+  }
+
   static who() {
     return this.getRequest(this.urlWho, {});
   }
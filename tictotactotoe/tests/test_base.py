@@ -110,10 +110,11 @@ class TicToTacToToeApiTestCase(TestCase):
             },
         )
 
-    def _games_post(self) -> str:
+    def _games_post(self, **kwargs) -> str:
         """
         Create a game
 
+        :param kwargs: Extra game settings such as size and win_length.
         :return: Game id.
         """
 
@@ -123,6 +124,7 @@ class TicToTacToToeApiTestCase(TestCase):
             "/v1/games",
             data={
                 "name": "test001",
+                **kwargs,
             },
         )
         return game.json()["data"]["id"]
@@ -226,10 +228,11 @@ class TicToTacToToeApiTestCase(TestCase):
         self._register("o")
         self._register("z")
 
-    def _setup_game(self) -> str:
+    def _setup_game(self, **kwargs) -> str:
         """
         Create a game and set up the players to play the game.
 
+        :param kwargs: Extra game settings such as size and win_length.
         :return: Game ID.
         :rtype: str.
         """
@@ -239,7 +242,7 @@ class TicToTacToToeApiTestCase(TestCase):
             self._register(player)
             self._login(player)
             if player == "x":
-                game_id = self._games_post()
+                game_id = self._games_post(**kwargs)
             self._game_put(game_id, player)
             self._logout()
         return game_id
@@ -0,0 +1,91 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.test import TestCase
+from tictotactotoe_api import benchmarks
+
+
+class TicToTacToToeBenchmarkTestCases(TestCase):
+    """
+    Let's make sure the benchmarks run and are compared with their baseline.
+    """
+
+    def test_measure(self):
+        """
+        Every benchmark runs and reports its timings and allocations.
+        """
+
+        for name in benchmarks.BENCHMARKS:
+            result = benchmarks.measure(name, 0.01)
+            self.assertGreater(result["runs"], 0, name)
+            self.assertGreater(result["ops"], 0, name)
+            self.assertLessEqual(result["p50"], result["p99"], name)
+            self.assertGreaterEqual(result["allocated"], 0, name)
+
+    def test_compare(self):
+        """
+        Changes within the tolerance are the same speed.
+        """
+
+        baseline = {"a": {"p50": 10.0}, "b": {"p50": 10.0}, "c": {"p50": 10.0}}
+        results = {
+            "a": {"p50": 5.0},
+            "b": {"p50": 20.0},
+            "c": {"p50": 10.5},
+            "d": {"p50": 1.0},
+        }
+        changes = benchmarks.compare(results, baseline)
+        self.assertEqual(
+            {name: change["verdict"] for name, change in changes.items()},
+            {"a": "faster", "b": "slower", "c": "same"},
+        )
+        self.assertEqual(changes["a"]["speedup"], 2.0)
+
+    def test_command(self):
+        """
+        The command stores a baseline and compares later runs with it.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "benchmarks.json"
+            out = StringIO()
+            call_command(
+                "benchmark",
+                "engine.winner",
+                seconds=0.01,
+                baseline=str(baseline),
+                save=True,
+                stdout=out,
+            )
+            self.assertIn(
+                "engine.winner", json.loads(baseline.read_text(encoding="utf-8"))
+            )
+            out = StringIO()
+            call_command(
+                "benchmark",
+                "engine.winner",
+                seconds=0.01,
+                baseline=str(baseline),
+                stdout=out,
+            )
+            self.assertRegex(
+                out.getvalue(), r"engine\.winner .* \d+\.\d+x (faster|slower|same)"
+            )
@@ -0,0 +1,128 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tictotactotoe_api.cache import game_cache
+from .test_base import TicToTacToToeApiTestCase
+
+
+class TicToTacToToeCacheTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure games are served from the cache without going stale.
+    """
+
+    def test_game_get_cached(self):
+        """
+        Reading a game that was just played only reads its version from the games table.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, [{"player": "x", "x": 0, "y": 0}])
+        self._login("o")
+        with CaptureQueriesContext(connection) as queries:
+            game = self._game_get(game_id)
+        games = [
+            q
+            for q in queries.captured_queries
+            if '"tictotactotoe_api_games"' in q["sql"]
+        ]
+        self.assertEqual(game.status_code, 200)
+        self.assertEqual(game.json()["data"]["version"], 3)
+        self.assertEqual(len(games), 1)
+        self.assertTrue(
+            games[0]["sql"].startswith('SELECT "tictotactotoe_api_games"."version" ')
+        )
+
+    def test_game_put_invalidates(self):
+        """
+        Seating a player is seen by the next read of the game.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_id = self._games_post()
+        self.assertIsNone(self._game_get(game_id).json()["data"]["player_x"])
+        self._game_put(game_id, "x")
+        player = self._game_get(game_id).json()["data"]["player_x"]
+        self.assertEqual(player["username"], "test001")
+
+    def test_game_get_other_worker(self):
+        """
+        A game another worker changed is read again rather than served or answered 304 stale.
+        """
+
+        game_id = self._setup_game()
+        self._login("o")
+        etag = self._game_get(game_id)["ETag"]
+        stale = game_cache.fetch(game_id)
+        self._play_moves(game_id, [{"player": "x", "x": 0, "y": 0}])
+        # this worker's cache still holds the game from before the other worker's move
+        game_cache.backend.set(game_cache.key(game_id), stale)
+        self._login("o")
+        game = self._client("get", f"/v1/games/{game_id}", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(game.status_code, 200)
+        self.assertEqual(game.json()["data"]["version"], stale.version + 1)
+        self.assertEqual(game.json()["data"]["moves"][0][0], "x")
+        self.assertEqual(game_cache.get(game_id).moves_count, 1)
+
+    def test_game_move_stale_cache(self):
+        """
+        A move judged against a cached game that is behind the database is judged again.
+        """
+
+        game_id = self._setup_game()
+        stale = game_cache.fetch(game_id)
+        self._play_moves(game_id, [{"player": "x", "x": 0, "y": 0}])
+        # another worker's cache still holds the game from before the move
+        game_cache.backend.set(game_cache.key(game_id), stale)
+        move = self._play_moves(game_id, [{"player": "o", "x": 1, "y": 1}])
+        self.assertEqual(move.status_code, 201)
+        self.assertEqual(game_cache.get(game_id).moves_count, 2)
+
+    def test_cached_players(self):
+        """
+        Only what is shown of the players is cached, not their passwords or emails.
+        """
+
+        game_id = self._setup_game()
+        game_cache.fetch(game_id)
+        cached = game_cache.backend.get(game_cache.key(game_id))
+        for player in ["x", "o"]:
+            user = getattr(cached, f"player_{player}")
+            self.assertEqual(user.username, self.users[player]["username"])
+            for field in ["password", "email", "is_staff"]:
+                self.assertIn(field, user.get_deferred_fields())
+
+    def test_cache_stats(self):
+        """
+        Only admins can read the cache counters.
+        """
+
+        self._register("x")
+        self._login("x")
+        self.assertEqual(self._client("get", "/v1/stats/cache").status_code, 403)
+        self._logout()
+
+        admin = User.objects.create_superuser(username="admin001")
+        self.client.force_login(admin)
+        stats = self._client("get", "/v1/stats/cache")
+        self.assertEqual(stats.status_code, 200)
+        self.assertEqual(
+            set(stats.json()["data"]),
+            {"backend", "hits", "misses", "ratio"},
+        )
@@ -0,0 +1,169 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.test import SimpleTestCase
+from tictotactotoe_api.engine import Board, line_index
+
+
+class TicToTacToToeEngineTestCases(SimpleTestCase):
+    """
+    Let's make sure the board engine finds the same results as the game.
+    """
+
+    def test_lines(self):
+        """
+        Three rows, three columns and two diagonals.
+        """
+
+        self.assertEqual(len(line_index(3, 3).lines), 8)
+
+    def test_moves_round_trip(self):
+        """
+        Moves layout should come back the same after going through the board.
+        """
+
+        moves = [
+            ["x", None, "o"],
+            [None, "x", None],
+            ["o", None, None],
+        ]
+        self.assertEqual(Board.from_moves(moves).to_moves(), moves)
+
+    def test_winner_row(self):
+        """
+        A full row wins.
+        """
+
+        board = Board.from_moves(
+            [
+                [None, None, None],
+                ["o", "o", "o"],
+                ["x", "x", None],
+            ]
+        )
+        self.assertEqual(board.winner(), "o")
+
+    def test_winner_diagonal(self):
+        """
+        Both diagonals win.
+        """
+
+        back = Board.from_moves(
+            [
+                ["x", "o", None],
+                [None, "x", "o"],
+                [None, None, "x"],
+            ]
+        )
+        forward = Board.from_moves(
+            [
+                ["o", None, "x"],
+                [None, "x", "o"],
+                ["x", None, None],
+            ]
+        )
+        self.assertEqual(back.winner(), "x")
+        self.assertEqual(forward.winner(), "x")
+
+    def test_tie(self):
+        """
+        A full board without a line is a tie.
+        """
+
+        board = Board.from_moves(
+            [
+                ["x", "x", "o"],
+                ["o", "x", "x"],
+                ["x", "o", "o"],
+            ]
+        )
+        self.assertTrue(board.is_full())
+        self.assertEqual(board.winner(), "tie")
+
+    def test_still_playing(self):
+        """
+        No line and empty cells means the game goes on.
+        """
+
+        board = Board()
+        board.place(1, 1, "x")
+        self.assertFalse(board.is_empty(1, 1))
+        self.assertTrue(board.is_empty(0, 0))
+        self.assertIsNone(board.winner())
+
+    def test_play_only_checks_last_move(self):
+        """
+        Playing a move reports the winner through the lines of that cell.
+        """
+
+        board = Board.from_moves(
+            [
+                ["x", "x", None],
+                ["o", "o", None],
+                [None, None, None],
+            ]
+        )
+        self.assertEqual(board.count, 4)
+        self.assertIsNone(board.play(2, 2, "x"))
+        self.assertEqual(board.play(2, 1, "o"), "o")
+
+    def test_play_tie(self):
+        """
+        The last empty cell without a line is a tie from the move count.
+        """
+
+        board = Board.from_moves(
+            [
+                ["x", "x", "o"],
+                ["o", "x", "x"],
+                ["x", "o", None],
+            ]
+        )
+        self.assertEqual(board.play(2, 2, "o"), "tie")
+
+    def test_line_index_cached(self):
+        """
+        The line index for a board is only built once.
+        """
+
+        self.assertIs(line_index(15, 5), line_index(15, 5))
+        self.assertEqual(len(line_index(4, 3).cell_lines), 16)
+
+    def test_five_in_a_row(self):
+        """
+        A large board needs the full win length to win.
+        """
+
+        board = Board(15, 5)
+        for x in range(4):
+            self.assertIsNone(board.play(x + 5, x + 3, "x"))
+        self.assertEqual(board.play(9, 7, "x"), "x")
+        self.assertEqual(board.winner(), "x")
+
+    def test_encode_round_trip(self):
+        """
+        Encoded boards are one character per cell and decode back the same.
+        """
+
+        board = Board(4, 3)
+        board.place(3, 1, "x")
+        board.place(0, 3, "o")
+        encoded = board.encode()
+        self.assertEqual(encoded, "-------x----o---")
+        decoded = Board.decode(encoded, 4, 3)
+        self.assertEqual(decoded.to_moves(), board.to_moves())
+        self.assertEqual(decoded.count, 2)
+        self.assertEqual(Board.decode("", 4, 3).count, 0)
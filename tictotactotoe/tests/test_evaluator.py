@@ -0,0 +1,187 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from tictotactotoe_api import evaluator, tictactoe
+from tictotactotoe_api.engine import Board
+from .test_base import TicToTacToToeApiTestCase
+
+
+class TicToTacToToeEvaluatorTestCases(SimpleTestCase):
+    """
+    Let's make sure boards are judged the same way the games judge them.
+    """
+
+    def _positions(self, board: Board, player: str, found: dict):
+        """
+        Walk every game that can be played from a board.
+
+        :param board: Board to play from.
+        :param player: Player to move.
+        :param found: Outcome of every board seen, by encoded board.
+        """
+        other = "o" if player == "x" else "x"
+        for cell in range(9):
+            x, y = cell % 3, cell // 3
+            if not board.is_empty(x, y):
+                continue
+            after = board.copy()
+            winner = after.play(x, y, player)
+            encoded = after.encode()
+            if encoded in found:
+                continue
+            if winner is None:
+                found[encoded] = f"turn_{other}"
+                self._positions(after, other, found)
+            else:
+                found[encoded] = "tie" if winner == "tie" else f"winner_{winner}"
+
+    def test_reachable(self):
+        """
+        Every board a game can reach gets the state the game would be in.
+        """
+
+        found = {Board().encode(): "turn_x"}
+        self._positions(Board(), "x", found)
+        outcomes = evaluator.evaluate(evaluator.decode(list(found)))
+        self.assertEqual(
+            [evaluator.OUTCOMES[outcome] for outcome in outcomes], list(found.values())
+        )
+
+    def test_illegal(self):
+        """
+        Boards that no game can reach are illegal.
+        """
+
+        boards = [
+            "ooo------",
+            "xxxxoo---",
+            "xxxooo---",
+            "xxx-oo-o-",
+            "xx-ooo---",
+            "xo?------",
+        ]
+        outcomes = evaluator.evaluate(evaluator.decode(boards))
+        self.assertEqual(outcomes.tolist(), [evaluator.ILLEGAL] * len(boards))
+        self.assertEqual(
+            evaluator.evaluate([[2, 0, 0, 0, 0, 0, 0, 0, 0]]).tolist(),
+            [evaluator.ILLEGAL],
+        )
+
+    def test_table(self):
+        """
+        Looking boards up in the table agrees with scoring their lines.
+        """
+
+        boards = np.random.default_rng(17).integers(
+            -1, 3, size=(5000, 9), dtype=np.int8
+        )
+        self.assertEqual(
+            evaluator.evaluate(boards).tolist(), evaluator._score(boards, 3, 3).tolist()
+        )
+
+    def test_bigger_boards(self):
+        """
+        Bigger boards are scored with their own lines.
+        """
+
+        boards = evaluator.decode(
+            ["xxx-oo----------", "xxxoooxo--------", "----------------"], 4
+        )
+        self.assertEqual(
+            evaluator.evaluate(boards, 4, 3).tolist(),
+            [evaluator.WINNER_X, evaluator.ILLEGAL, evaluator.TURN_X],
+        )
+        with self.assertRaises(ValueError):
+            evaluator.decode(["xxx"], 4)
+
+
+class TicToTacToToeEvaluateApiTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure boards can be evaluated over the API.
+    """
+
+    def test_evaluate(self):
+        """
+        Encoded boards and lists of cells both get a result each, in order.
+        """
+
+        self._register("x")
+        self._login("x")
+        encoded = self._client(
+            "post", "/v1/evaluate", data={"boards": ["xxxoo----", "x--------"]}
+        )
+        self.assertEqual(encoded.status_code, 200)
+        self.assertEqual(encoded.json()["data"]["results"], ["winner_x", "turn_o"])
+        cells = self._client(
+            "post",
+            "/v1/evaluate",
+            data={"size": 4, "win_length": 4, "boards": [[1, -1] + [0] * 14, [0] * 16]},
+        )
+        self.assertEqual(cells.status_code, 200)
+        self.assertEqual(cells.json()["data"]["results"], ["turn_x", "turn_x"])
+
+    def test_evaluate_off_loop(self):
+        """
+        Boards are classified in a worker thread, not on the event loop.
+        """
+
+        loops = []
+
+        def evaluate(*args):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return evaluator.evaluate(*args)
+
+        self._register("x")
+        self._login("x")
+        with mock.patch.object(tictactoe, "evaluate", evaluate):
+            response = self._client(
+                "post", "/v1/evaluate", data={"boards": ["x--------"]}
+            )
+        self.assertEqual(response.json()["data"]["results"], ["turn_o"])
+        self.assertEqual(loops, [None])
+
+    def test_evaluate_bad(self):
+        """
+        Boards of the wrong size or holding anything but cells are rejected.
+        """
+
+        self.assertEqual(
+            self._client(
+                "post", "/v1/evaluate", data={"boards": ["---------"]}
+            ).status_code,
+            403,
+        )
+        self._register("x")
+        self._login("x")
+        for data in [
+            {"boards": []},
+            {"boards": ["xxx"]},
+            {"boards": [[1, 0, 0]]},
+            {"boards": [[1000] * 9]},
+            {"boards": [["x"] * 9]},
+            {"boards": ["---------"], "size": 3, "win_length": 4},
+            {"boards": ["---------"] * 10001},
+        ]:
+            self.assertEqual(
+                self._client("post", "/v1/evaluate", data=data).status_code, 400
+            )
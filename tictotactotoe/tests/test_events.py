@@ -0,0 +1,101 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from django.contrib.auth.models import User
+from django.test import TestCase
+from tictotactotoe_api.events import hub
+from tictotactotoe_api.models import Games as GamesModel
+
+
+class TicToTacToToeEventTestCases(TestCase):
+    """
+    Let's make sure players hear about changes to their game.
+    """
+
+    async def test_events_not_logged_in(self):
+        """
+        Only logged in users can listen to a game.
+        """
+
+        game = await GamesModel.objects.acreate(name="test001")
+        response = await self.async_client.get(f"/api/v1/games/{game.id}/events")
+        self.assertEqual(response.status_code, 403)
+
+    async def test_events_game_not_found(self):
+        """
+        Listening to a game that does not exist is not found.
+        """
+
+        user = await User.objects.acreate(username="test001")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get("/api/v1/games/nope/events")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_events_stream(self):
+        """
+        The stream starts in sync with the game and then passes along published events.
+        """
+
+        user = await User.objects.acreate(username="test001")
+        game = await GamesModel.objects.acreate(name="test001")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(f"/api/v1/games/{game.id}/events")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        first = await anext(events)
+        self.assertTrue(first.startswith(b"event: sync\n"))
+
+        publisher = threading.Thread(
+            target=hub.publish,
+            args=(str(game.id), "move", {"player": "x", "x": 0, "y": 0}),
+        )
+        publisher.start()
+        publisher.join()
+        second = await anext(events)
+        self.assertEqual(second, b'event: move\ndata: {"player":"x","x":0,"y":0}\n\n')
+
+    async def test_events_sync_after_subscribe(self):
+        """
+        A move committed before the stream starts is in the sync event and not sent twice.
+        """
+
+        user = await User.objects.acreate(username="test001")
+        game = await GamesModel.objects.acreate(name="test001")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(f"/api/v1/games/{game.id}/events")
+        await GamesModel.objects.filter(id=game.id).aupdate(
+            state="turn_o", moves_count=1, version=game.version + 1
+        )
+        events = aiter(response.streaming_content)
+        first = await anext(events)
+        self.assertIn(
+            f'"state":"turn_o","moves_count":1,"version":{game.version + 1}'.encode(),
+            first,
+        )
+
+        for version in [game.version + 1, game.version + 2]:
+            publisher = threading.Thread(
+                target=hub.publish,
+                args=(str(game.id), "move", {"x": 0, "y": 0, "version": version}),
+            )
+            publisher.start()
+            publisher.join()
+        second = await anext(events)
+        self.assertEqual(
+            second,
+            f'event: move\ndata: {{"x":0,"y":0,"version":{game.version + 2}}}\n\n'.encode(),
+        )
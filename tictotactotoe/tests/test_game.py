@@ -14,7 +14,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from unittest import mock
 from uuid import UUID, uuid4
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tictotactotoe_api.models import Games as GamesModel
 from .test_base import TicToTacToToeApiTestCase
 
 
@@ -138,3 +143,252 @@ class TicToTacToToeGameTestCases(TicToTacToToeApiTestCase):
         self._game_put(game_id, "x")
         invalid = self._game_put(game_id, "o")
         self.assertEqual(invalid.status_code, 400)
+
+    def test_game_seat_race(self):
+        """
+        Players racing for a seat read before either sat down cannot both get it or lose a version.
+        """
+
+        self._setup_players()
+        self._login("x")
+        game_id = self._games_post()
+        stale = GamesModel.objects.get(id=game_id)
+        version = stale.version
+        self.assertEqual(self._game_put(game_id, "x").status_code, 202)
+        self._login("o")
+        with mock.patch.object(
+            GamesModel.objects, "aget", mock.AsyncMock(return_value=stale)
+        ):
+            taken = self._game_put(game_id, "x")
+            self.assertEqual(taken.status_code, 400)
+            self.assertEqual(taken.json()["message"], "Someone is already x")
+            self.assertEqual(self._game_put(game_id, "o").status_code, 202)
+        game = GamesModel.objects.get(id=game_id)
+        self.assertEqual(game.player_x.username, self.users["x"]["username"])
+        self.assertEqual(game.player_o.username, self.users["o"]["username"])
+        self.assertEqual(game.version, version + 2)
+
+    def test_games_post_size(self):
+        """
+        Create a bigger board and make sure it is laid out that way.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_id = self._games_post(size=5, win_length=4)
+        data = self._game_get(game_id).json().get("data")
+        self.assertEqual(data.get("win_length"), 4)
+        self.assertEqual(len(data.get("moves")), 5)
+        self.assertEqual(len(data.get("moves")[0]), 5)
+
+    def test_games_post_bad_win_length(self):
+        """
+        Cannot need more in a row than fits on the board.
+        """
+
+        self._register("x")
+        self._login("x")
+        game = self._client(
+            "post", "/v1/games", data={"name": "test001", "size": 3, "win_length": 4}
+        )
+        self.assertEqual(game.status_code, 400)
+
+    def test_games_get_pages(self):
+        """
+        Walk the games a page at a time with the cursor.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_ids = [self._games_post() for _ in range(3)]
+        first = self._client("get", "/v1/games?limit=2").json().get("data")
+        self.assertEqual([g["id"] for g in first["results"]], game_ids[:0:-1])
+        second = (
+            self._client("get", f"/v1/games?limit=2&cursor={first['next']}")
+            .json()
+            .get("data")
+        )
+        self.assertEqual([g["id"] for g in second["results"]], game_ids[:1])
+        self.assertIsNone(second["next"])
+
+    def test_games_get_filters(self):
+        """
+        Filter the games by state, player and open seats.
+        """
+
+        self._register("x")
+        self._login("x")
+        seated = self._games_post()
+        self._game_put(seated, "x")
+        empty = self._games_post()
+        games = self._client("get", "/v1/games?player=1").json().get("data")
+        self.assertEqual([g["id"] for g in games["results"]], [seated])
+        games = (
+            self._client("get", "/v1/games?open=true&state=turn_x").json().get("data")
+        )
+        self.assertEqual([g["id"] for g in games["results"]], [empty, seated])
+        games = self._client("get", "/v1/games?state=tie").json().get("data")
+        self.assertEqual(games["results"], [])
+
+    def test_games_get_bad_cursor(self):
+        """
+        A cursor that was not handed out is a bad request.
+        """
+
+        self._register("x")
+        self._login("x")
+        games = self._client("get", "/v1/games?cursor=nope")
+        self.assertEqual(games.status_code, 400)
+
+    def test_games_get_queries(self):
+        """
+        Listing games is one query no matter how many seated games there are.
+        """
+
+        self._setup_players()
+        counts = []
+        for _ in range(2):
+            for player in ["x", "o"]:
+                self._login(player)
+                game_id = self._games_post()
+                self._game_put(game_id, player)
+                self._logout()
+            self._login("z")
+            with CaptureQueriesContext(connection) as queries:
+                games = self._client("get", "/v1/games")
+            game_queries = [
+                q["sql"]
+                for q in queries.captured_queries
+                if "tictotactotoe_api_games" in q["sql"]
+            ]
+            self.assertEqual(len(game_queries), 1)
+            counts.append(len(queries.captured_queries))
+            self._logout()
+        self.assertEqual(counts[0], counts[1])
+        player = games.json()["data"]["results"][0]["player_o"]
+        self.assertEqual(sorted(player.keys()), ["id", "username"])
+
+    def test_game_get_not_modified(self):
+        """
+        A game that has not changed since the last look is not sent again.
+        """
+
+        game_id = self._setup_game()
+        self._login("x")
+        game = self._game_get(game_id)
+        etag = game["ETag"]
+        self.assertEqual(etag, f'"{game.json()["data"]["version"]}"')
+        self.assertIn("no-cache", game["Cache-Control"])
+        again = self._client("get", f"/v1/games/{game_id}", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        moves = self._client(
+            "get", f"/v1/games/{game_id}/moves", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(moves.status_code, 304)
+        self._client("post", f"/v1/games/{game_id}/moves", data={"x": 0, "y": 0})
+        changed = self._client("get", f"/v1/games/{game_id}", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_game_get_finished_cached(self):
+        """
+        A finished game can be cached for a long time.
+        """
+
+        game_id = self._setup_game()
+        moves = []
+        for i in range(3):
+            moves.append({"player": "x", "x": i, "y": 0})
+            moves.append({"player": "o", "x": i, "y": 1})
+        self._play_moves(game_id, moves[:-1])
+        self._login("x")
+        game = self._game_get(game_id)
+        self.assertEqual(game.json()["data"]["state"], "winner_x")
+        self.assertIn("immutable", game["Cache-Control"])
+
+    def test_games_bulk_post(self):
+        """
+        Admins can create a round of games with the players already seated.
+        """
+
+        self._setup_players()
+        x, o = (
+            User.objects.get(username=self.users[p]["username"]).id for p in ["x", "o"]
+        )
+        games = [{"name": f"round{i}", "player_x": x, "player_o": o} for i in range(3)]
+        self._login("x")
+        denied = self._client("post", "/v1/games/bulk", data={"games": games})
+        self.assertEqual(denied.status_code, 403)
+        self._logout()
+
+        self.client.force_login(User.objects.create_superuser(username="admin001"))
+        with CaptureQueriesContext(connection) as queries:
+            bulk = self._client("post", "/v1/games/bulk", data={"games": games})
+            inserts = [
+                q for q in queries.captured_queries if q["sql"].startswith("INSERT")
+            ]
+        self.assertEqual(bulk.status_code, 201)
+        self.assertEqual(len(inserts), 1)
+        ids = bulk.json()["data"]["ids"]
+        self.assertEqual(len(ids), 3)
+        game = self._game_get(ids[2]).json()["data"]
+        self.assertEqual(game["name"], "round2")
+        self.assertEqual(game["state"], "turn_x")
+        self.assertEqual(game["player_o"]["id"], o)
+
+    def test_games_bulk_post_bad(self):
+        """
+        Nothing is created when any game in the bulk is not valid.
+        """
+
+        self._setup_players()
+        x = User.objects.get(username=self.users["x"]["username"]).id
+        self.client.force_login(User.objects.create_superuser(username="admin001"))
+        for games in [
+            [],
+            [{"name": "round0", "player_x": x, "player_o": x}],
+            [{"name": "round0", "player_x": x, "player_o": 9999}],
+            [{"name": "round0", "player_x": x, "player_o": 9999}] * 1001,
+        ]:
+            bulk = self._client("post", "/v1/games/bulk", data={"games": games})
+            self.assertEqual(bulk.status_code, 400)
+        self.assertEqual(self._client("get", "/v1/games").json()["data"]["results"], [])
+
+    def test_game_analysis(self):
+        """
+        Every empty cell is evaluated for the player to move.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, [{"player": "x", "x": 1, "y": 0}])
+        self._login("o")
+        analysis = self._client("get", f"/v1/games/{game_id}/analysis")
+        self.assertEqual(analysis.status_code, 200)
+        data = analysis.json()["data"]
+        self.assertEqual(data["player"], "o")
+        self.assertEqual(len(data["cells"]), 8)
+        draws = {
+            (cell["x"], cell["y"]) for cell in data["cells"] if cell["result"] == "draw"
+        }
+        self.assertEqual(draws, {(0, 0), (2, 0), (1, 1), (1, 2)})
+        again = self._client(
+            "get",
+            f"/v1/games/{game_id}/analysis",
+            HTTP_IF_NONE_MATCH=analysis["ETag"],
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_game_analysis_bad(self):
+        """
+        Only 3x3 games that exist can be analysed.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_id = self._games_post(size=4)
+        self.assertEqual(
+            self._client("get", f"/v1/games/{game_id}/analysis").status_code, 400
+        )
+        self.assertEqual(
+            self._client("get", f"/v1/games/{uuid4()}/analysis").status_code, 404
+        )
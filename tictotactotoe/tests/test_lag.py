@@ -0,0 +1,75 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import time
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from tictotactotoe_api.lag import LoopLagMonitor
+from tictotactotoe_api.views.viewtictactoe import GameView, GamesView, MovesView
+from .test_base import TicToTacToToeApiTestCase
+
+
+class TicToTacToToeLoopTestCases(SimpleTestCase):
+    """
+    Let's make sure the game views run on the event loop and that blocking it shows up.
+    """
+
+    def test_views_async(self):
+        """
+        The game views are coroutines so they are not handed off to a thread.
+        """
+
+        for view in [GameView, GamesView, MovesView]:
+            self.assertTrue(iscoroutinefunction(view.as_view()))
+
+    async def test_loop_lag(self):
+        """
+        Blocking the event loop is measured as lag.
+        """
+
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        monitor.start()
+        await asyncio.sleep(0)
+        time.sleep(0.05)
+        await asyncio.sleep(0.02)
+        stats = monitor.stats()
+        self.assertGreaterEqual(stats["samples"], 1)
+        self.assertGreaterEqual(stats["max"], 0.03)
+
+
+class TicToTacToToeLoopStatsTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure the event loop lag can be read.
+    """
+
+    def test_loop_stats(self):
+        """
+        Only admins can read the event loop lag.
+        """
+
+        self._register("x")
+        self._login("x")
+        self.assertEqual(self._client("get", "/v1/stats/loop").status_code, 403)
+        self._logout()
+
+        admin = User.objects.create_superuser(username="admin001")
+        self.client.force_login(admin)
+        stats = self._client("get", "/v1/stats/loop")
+        self.assertEqual(stats.status_code, 200)
+        self.assertEqual(set(stats.json()["data"]), {"samples", "last", "max", "mean"})
@@ -0,0 +1,109 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import logging
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, override_settings
+from tictotactotoe_api import loadtest
+from tictotactotoe_api.models import Games as GamesModel
+
+
+@override_settings(PASSWORD_HASHERS=loadtest.FAST_HASHERS)
+class TicToTacToToeLoadTestCases(TransactionTestCase):
+    """
+    Let's make sure the load test plays real games through the ASGI app.
+    """
+
+    def test_client(self):
+        """
+        The in process client keeps the session and gets past the CSRF check.
+        """
+
+        from tictotactotoe.asgi import application  # pylint: disable=C0415
+
+        async def session():
+            stats = loadtest.LoadStats()
+            client = await loadtest._player(application, stats)
+            who = await client.request("GET", "/api/v1/who")
+            logout = await client.request("POST", "/api/v1/logout", {})
+            return stats, client, who, logout
+
+        stats, client, who, logout = asyncio.run(session())
+        self.assertEqual(stats.errors, dict.fromkeys(loadtest.ENDPOINTS, 0))
+        self.assertEqual(who[0], 200)
+        self.assertEqual(logout[0], 202)
+        self.assertNotIn("sessionid", client.cookies)
+
+    def test_run(self):
+        """
+        Every game is played to the end and each endpoint gets its latencies.
+        """
+
+        # the in memory test database fails rather than waits on locks, so one game at a time
+        report = loadtest.run(games=4, concurrency=1, seed=20)
+        self.assertEqual(report["games"], 4)
+        self.assertEqual(report["abandoned"], 0)
+        self.assertEqual(report["locked"], 0)
+        self.assertEqual(set(report["endpoints"]), set(loadtest.ENDPOINTS))
+        self.assertEqual(report["endpoints"]["games_post"]["requests"], 4)
+        self.assertEqual(report["endpoints"]["register"]["requests"], 2)
+        self.assertEqual(
+            sum(report["endpoints"][name]["errors"] for name in loadtest.ENDPOINTS), 0
+        )
+        self.assertEqual(
+            GamesModel.objects.filter(
+                state__in=["winner_x", "winner_o", "tie"]
+            ).count(),
+            4,
+        )
+
+    def test_run_size(self):
+        """
+        Games on bigger boards are played to the end too, the win length is the board size.
+        """
+
+        report = loadtest.run(games=2, concurrency=1, size=5, seed=20)
+        self.assertEqual(report["games"], 2)
+        self.assertEqual(report["abandoned"], 0)
+        self.assertEqual(report["endpoints"]["moves_post"]["errors"], 0)
+        self.assertEqual(
+            set(GamesModel.objects.values_list("size", "win_length")), {(5, 5)}
+        )
+
+    def test_locked(self):
+        """
+        Database lock errors the app logs are counted.
+        """
+
+        stats = loadtest.LoadStats()
+        for message in [
+            "OperationalError: database is locked",
+            "OperationalError: no such table",
+        ]:
+            stats.handle(
+                logging.makeLogRecord({"msg": message, "levelno": logging.ERROR})
+            )
+        self.assertEqual(stats.locked, 1)
+
+    def test_command_counts(self):
+        """
+        The sweep needs counts it can use.
+        """
+
+        with self.assertRaises(CommandError):
+            call_command("loadtest", workers="one", stdout=StringIO())
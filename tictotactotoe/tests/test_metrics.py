@@ -0,0 +1,197 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from tictotactotoe_api.metrics import LATENCY_BUCKETS, Histogram, metrics
+from .test_base import TicToTacToToeApiTestCase
+
+MOVES_ROUTE = 'route="api/v1/games/<str:game_id>/moves",method="POST"'
+
+
+class TicToTacToToeMetricsTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure requests and games are counted and scraped in the Prometheus format.
+    """
+
+    def _scrape(self) -> dict:
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["Content-Type"].startswith("text/plain; version=0.0.4")
+        )
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_histogram(self):
+        """
+        Values land in the first bucket whose bound they do not go over.
+        """
+
+        histogram = Histogram(LATENCY_BUCKETS)
+        for value in [0.0005, 0.001, 0.002, 60.0]:
+            histogram.observe(value)
+        self.assertEqual(histogram.counts[:3], [2, 1, 0])
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(sum(histogram.counts), 4)
+        self.assertAlmostEqual(histogram.sum, 60.0035)
+
+    def test_requests(self):
+        """
+        Requests are recorded by URL pattern and method along with their queries and size.
+        """
+
+        game_id = self._setup_game()
+        before = self._scrape()
+        self._play_moves(game_id, [{"player": "x", "x": 0, "y": 0}])
+        self._client("get", "/v1/nowhere")
+        after = self._scrape()
+
+        def delta(name):
+            return after.get(name, 0) - before.get(name, 0)
+
+        prefix = "tictotactotoe_http"
+        self.assertEqual(
+            delta(f'{prefix}_requests_total{{{MOVES_ROUTE},status="201"}}'), 1
+        )
+        self.assertEqual(
+            delta(f"{prefix}_request_duration_seconds_count{{{MOVES_ROUTE}}}"), 1
+        )
+        self.assertEqual(
+            delta(
+                f'{prefix}_request_duration_seconds_bucket{{{MOVES_ROUTE},le="+Inf"}}'
+            ),
+            1,
+        )
+        self.assertGreater(delta(f"{prefix}_request_queries_sum{{{MOVES_ROUTE}}}"), 0)
+        self.assertGreater(
+            delta(f"{prefix}_response_size_bytes_sum{{{MOVES_ROUTE}}}"), 0
+        )
+        self.assertEqual(
+            delta(
+                f'{prefix}_requests_total{{route="unmatched",method="GET",status="404"}}'
+            ),
+            1,
+        )
+
+    def test_moves(self):
+        """
+        Moves are counted as accepted or by the reason they were turned away.
+        """
+
+        game_id = self._setup_game()
+        self._register("z")
+        before = dict(metrics.moves)
+        self._play_moves(
+            game_id,
+            [
+                {"player": "o", "x": 0, "y": 0},
+                {"player": "x", "x": 0, "y": 0},
+                {"player": "o", "x": 0, "y": 0},
+                {"player": "z", "x": 1, "y": 1},
+                {"player": "o", "x": 1, "y": 9},
+            ],
+        )
+        self._login("o")
+        self._client("post", "/v1/games/not-a-game/moves", data={"x": 1, "y": 1})
+        self._client("post", f"/v1/games/{game_id}/moves", data={"x": "a", "y": 1})
+        self._logout()
+        counted = {
+            outcome: metrics.moves[outcome] - before[outcome] for outcome in before
+        }
+        self.assertEqual(
+            {outcome: count for outcome, count in counted.items() if count},
+            {
+                "accepted": 1,
+                "not_your_turn": 1,
+                "taken": 1,
+                "not_player": 1,
+                "off_board": 1,
+                "not_found": 1,
+                "invalid": 1,
+            },
+        )
+
+    def test_moves_batch(self):
+        """
+        Moves sent in a batch are counted like single ones, accepted ones once they commit.
+        """
+
+        game_id = self._setup_game()
+        before = dict(metrics.moves)
+        self._login("x")
+        with self.captureOnCommitCallbacks(execute=True):
+            batch = self._client(
+                "post",
+                "/v1/moves",
+                data={
+                    "moves": [
+                        {"game_id": game_id, "x": 0, "y": 0},
+                        {"game_id": game_id, "x": 1, "y": 1},
+                        {"game_id": game_id, "x": 1, "y": 9},
+                        {
+                            "game_id": "00000000-0000-0000-0000-000000000000",
+                            "x": 0,
+                            "y": 0,
+                        },
+                        {"game_id": "nope", "x": 0, "y": 0},
+                    ]
+                },
+            )
+        self._logout()
+        self.assertEqual(batch.status_code, 200)
+        counted = {
+            outcome: metrics.moves[outcome] - before[outcome] for outcome in before
+        }
+        self.assertEqual(
+            {outcome: count for outcome, count in counted.items() if count},
+            {
+                "accepted": 1,
+                "not_your_turn": 1,
+                "off_board": 1,
+                "not_found": 1,
+                "invalid": 1,
+            },
+        )
+
+    def test_games(self):
+        """
+        Games are counted when they are created and when they are won once the win commits.
+        """
+
+        created = metrics.games_created
+        finished = metrics.games_finished["winner_x"]
+        game_id = self._setup_game()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._play_moves(
+                game_id,
+                [
+                    {"player": "x", "x": 0, "y": 0},
+                    {"player": "o", "x": 0, "y": 1},
+                    {"player": "x", "x": 1, "y": 0},
+                    {"player": "o", "x": 1, "y": 1},
+                    {"player": "x", "x": 2, "y": 0},
+                ],
+            )
+        self.assertEqual(metrics.games_created - created, 1)
+        self.assertEqual(metrics.games_finished["winner_x"] - finished, 1)
+        samples = self._scrape()
+        self.assertEqual(
+            samples["tictotactotoe_games_created_total"], metrics.games_created
+        )
+        self.assertIn('tictotactotoe_moves_total{outcome="changed"}', samples)
@@ -14,6 +14,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from unittest import mock
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from tictotactotoe_api import tictactoe
+from tictotactotoe_api.models import Games as GamesModel
+from tictotactotoe_api.models import Moves as MovesModel
 from .test_base import TicToTacToToeApiTestCase
 
 
@@ -452,3 +459,195 @@ class TicToTacToToeMoveTestCases(TicToTacToToeApiTestCase):
         self._login("x")
         move = self._client("post", f"/v1/games/{game_id}/moves", data={})
         self.assertEqual(move.status_code, 400)
+
+    def test_game_large_board_win(self):
+        """
+        Make sure a bigger board plays past the 3x3 edges and needs the full win length.
+        """
+
+        game_id = self._setup_game(size=5, win_length=4)
+        moves = []
+        for i in range(4):
+            moves.append({"player": "x", "x": i + 1, "y": 4})
+            moves.append({"player": "o", "x": i, "y": 0})
+        move = self._play_moves(game_id, moves[:-1])
+        self.assertEqual(
+            move.json()["message"], "Congratulations x you are the winner!"
+        )
+
+    def test_game_move_post_queries(self):
+        """
+        Make sure a move reads the game once and writes only the move and the game state.
+        """
+
+        game_id = self._setup_game()
+        self._login("x")
+        with CaptureQueriesContext(connection) as queries:
+            move = self._client(
+                "post", f"/v1/games/{game_id}/moves", data={"x": 0, "y": 0}
+            )
+        self.assertEqual(move.status_code, 201)
+        game_queries = [
+            q["sql"]
+            for q in queries.captured_queries
+            if "tictotactotoe_api_" in q["sql"]
+        ]
+        self.assertEqual(len(game_queries), 3)
+        self.assertTrue(game_queries[1].startswith("UPDATE"))
+        self.assertNotIn('"name"', game_queries[1])
+
+    def test_game_move_unique_cell(self):
+        """
+        Make sure the database turns away a second move on a cell even when the board missed it.
+        """
+
+        game_id = self._setup_game()
+        MovesModel.objects.create(game_id=game_id, player="o", x=0, y=0, ply=1)
+        move = self._play_moves(game_id, [{"player": "x", "x": 0, "y": 0}])
+        self.assertEqual(move.status_code, 400)
+        self.assertEqual(
+            move.json()["message"], "I am sorry a player already placed a move here!"
+        )
+        game = GamesModel.objects.get(id=game_id)
+        self.assertEqual(game.state, "turn_x")
+        self.assertEqual(game.moves_count, 0)
+
+    def test_game_moves_batch(self):
+        """
+        Make sure a batch of moves across games is judged move by move, in order.
+        """
+
+        first = self._setup_game()
+        second = self._setup_game()
+        self._login("x")
+        with CaptureQueriesContext(connection) as queries:
+            batch = self._client(
+                "post",
+                "/v1/moves",
+                data={
+                    "moves": [
+                        {"game_id": first, "x": 0, "y": 0},
+                        {"game_id": second, "x": 1, "y": 1},
+                        {"game_id": first, "x": 9, "y": 0},
+                        {"game_id": first, "x": 2, "y": 2},
+                        {"game_id": "nope", "x": 0, "y": 0},
+                    ]
+                },
+            )
+            updates = [
+                q["sql"]
+                for q in queries.captured_queries
+                if q["sql"].startswith("UPDATE")
+            ]
+        self.assertEqual(batch.status_code, 200)
+        results = batch.json()["data"]["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["ok", "ok", "error", "error", "error"],
+        )
+        self.assertEqual(results[0]["data"], {"player": "x", "x": 0, "y": 0})
+        self.assertEqual(
+            results[3]["message"], "It is not your turn x! Sorry, please wait for o."
+        )
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(MovesModel.objects.filter(game_id=first).count(), 1)
+        game = GamesModel.objects.get(id=second)
+        self.assertEqual(game.state, "turn_o")
+        self.assertEqual(game.board, "----x----")
+
+    def test_game_moves_batch_bad(self):
+        """
+        Make sure a batch has to be a list of at most a hundred moves.
+        """
+
+        game_id = self._setup_game()
+        self._login("x")
+        for moves in [
+            [],
+            {"game_id": game_id, "x": 0, "y": 0},
+            [{"x": 0, "y": 0}] * 101,
+        ]:
+            batch = self._client("post", "/v1/moves", data={"moves": moves})
+            self.assertEqual(batch.status_code, 400)
+
+    def test_game_ai_reply(self):
+        """
+        Make sure the computer answers a move straight away when it is playing.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_id = self._games_post(ai="o", ai_level=3)
+        self._game_put(game_id, "x")
+        move = self._client("post", f"/v1/games/{game_id}/moves", data={"x": 0, "y": 0})
+        self.assertEqual(move.status_code, 201)
+        self.assertEqual(move.json()["data"]["reply"], {"player": "o", "x": 1, "y": 1})
+        game = GamesModel.objects.get(id=game_id)
+        self.assertEqual(game.state, "turn_x")
+        self.assertEqual(game.moves_count, 2)
+        self.assertEqual(game.version, 3)
+        self.assertEqual(self._game_get(game_id).json()["data"]["moves"][1][1], "o")
+
+    def test_game_ai_opens(self):
+        """
+        Make sure the computer makes the first move once its opponent sits down.
+        """
+
+        self._register("o")
+        self._login("o")
+        game_id = self._games_post(ai="x")
+        self.assertEqual(self._game_put(game_id, "x").status_code, 400)
+        self._game_put(game_id, "o")
+        game = self._game_get(game_id).json()["data"]
+        self.assertEqual(game["state"], "turn_o")
+        self.assertEqual(sum(cell == "x" for row in game["moves"] for cell in row), 1)
+        open_games = self._client("get", "/v1/games?open=true").json()["data"][
+            "results"
+        ]
+        self.assertEqual(open_games, [])
+
+    def test_game_ai_opens_changed(self):
+        """
+        Make sure the computer still opens when the game changes just before its move is saved.
+        """
+
+        move_save = tictactoe._move_save
+        calls = []
+
+        def changed(game_id, version, moves):
+            calls.append(version)
+            if len(calls) == 1:
+                GamesModel.objects.filter(id=game_id).update(version=F("version") + 1)
+            return move_save(game_id, version, moves)
+
+        self._register("o")
+        self._login("o")
+        game_id = self._games_post(ai="x")
+        with mock.patch.object(tictactoe, "_move_save", changed):
+            seat = self._game_put(game_id, "o")
+        self.assertEqual(seat.status_code, 202)
+        self.assertEqual(len(calls), 2)
+        game = GamesModel.objects.get(id=game_id)
+        self.assertEqual(game.state, "turn_o")
+        self.assertEqual(game.moves_count, 1)
+
+        game_id = self._games_post(ai="x")
+        with mock.patch.object(tictactoe, "_move_save", return_value=False):
+            seat = self._game_put(game_id, "o")
+        self.assertEqual(seat.status_code, 400)
+        self.assertEqual(
+            seat.json()["message"],
+            "The computer could not open the game, please try again!",
+        )
+
+    def test_game_ai_board_size(self):
+        """
+        Make sure the computer only plays the board it has solved.
+        """
+
+        self._register("x")
+        self._login("x")
+        game = self._client(
+            "post", "/v1/games", data={"name": "test001", "size": 4, "ai": "o"}
+        )
+        self.assertEqual(game.status_code, 400)
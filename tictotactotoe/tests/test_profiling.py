@@ -0,0 +1,178 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from tictotactotoe_api.profiling import (
+    PROFILE_ID_HEADER,
+    StackSampler,
+    request_profiler,
+)
+from .test_base import TicToTacToToeApiTestCase
+
+
+class TicToTacToToeSamplerTestCases(SimpleTestCase):
+    """
+    Let's make sure the stack sampler counts the stacks of every thread.
+    """
+
+    def test_sample(self):
+        """
+        A sample holds the stack of this test, from the thread down to the test itself.
+        """
+
+        sampler = StackSampler()
+        sampler.sample()
+        sampler.sample()
+        stacks = sampler.folded().splitlines()
+        self.assertEqual(sampler.samples, 2)
+        mine = [
+            stack
+            for stack in stacks
+            if stack.startswith(threading.current_thread().name)
+        ]
+        self.assertEqual(len(mine), 1)
+        # the innermost frame is the sampler itself
+        frames, count = mine[0].rsplit(" ", 1)
+        self.assertEqual(count, "2")
+        self.assertEqual(
+            frames.split(";")[-2:],
+            [
+                f"{__name__}.TicToTacToToeSamplerTestCases.test_sample",
+                "tictotactotoe_api.profiling.StackSampler.sample",
+            ],
+        )
+
+    def test_start_stop(self):
+        """
+        Nothing is sampled until the sampler starts and sampling stops with it.
+        """
+
+        sampler = StackSampler(interval=0.001)
+        self.assertFalse(sampler.running)
+        self.assertEqual(sampler.samples, 0)
+        sampler.start()
+        try:
+            self.assertTrue(sampler.running)
+            time.sleep(0.05)
+        finally:
+            sampler.stop()
+        self.assertFalse(sampler.running)
+        samples = sampler.samples
+        self.assertGreater(samples, 0)
+        self.assertNotIn("stack-sampler", sampler.folded())
+        time.sleep(0.01)
+        self.assertEqual(sampler.samples, samples)
+
+
+class TicToTacToToeProfilingTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure only the requests staff ask for are profiled and only when profiling is on.
+    """
+
+    def tearDown(self):
+        request_profiler.enabled = False
+        super().tearDown()
+
+    def _admin(self):
+        admin = User.objects.create_superuser(username="admin001")
+        self.client.force_login(admin)
+
+    def test_profile(self):
+        """
+        A staff request sent with the header is profiled under its request id.
+        """
+
+        self._admin()
+        switched = self._client("put", "/v1/stats/profiles", data={"enabled": True})
+        self.assertEqual(switched.status_code, 202)
+        self.assertTrue(switched.json()["data"]["enabled"])
+
+        games = self._client(
+            "get", "/v1/games", HTTP_X_PROFILE="1", HTTP_X_REQUEST_ID="abc123"
+        )
+        self.assertEqual(games.status_code, 200)
+        self.assertEqual(games[PROFILE_ID_HEADER], "abc123")
+        cache = self._client("get", "/v1/stats/cache", HTTP_X_PROFILE="1")
+        self.assertIn(PROFILE_ID_HEADER, cache)
+
+        profiles = self._client("get", "/v1/stats/profiles").json()["data"]["profiles"]
+        self.assertEqual(
+            [profile["id"] for profile in profiles],
+            [cache[PROFILE_ID_HEADER], "abc123"],
+        )
+        profile = self._client("get", "/v1/stats/profiles/abc123").json()["data"]
+        self.assertEqual(profile["path"], "/api/v1/games")
+        self.assertEqual(profile["status"], 200)
+        self.assertTrue(profile["rows"])
+        self.assertEqual(
+            set(profile["rows"][0]),
+            {"function", "calls", "primitive_calls", "tottime", "cumtime"},
+        )
+        self.assertEqual(
+            self._client("get", "/v1/stats/profiles/nope").status_code, 404
+        )
+
+    def test_not_profiled(self):
+        """
+        Requests are not profiled while profiling is off, without the header or from non staff.
+        """
+
+        self._admin()
+        self.assertNotIn(
+            PROFILE_ID_HEADER, self._client("get", "/v1/games", HTTP_X_PROFILE="1")
+        )
+        request_profiler.enabled = True
+        self.assertNotIn(PROFILE_ID_HEADER, self._client("get", "/v1/games"))
+        self.client.logout()
+        self._register("x")
+        self._login("x")
+        games = self._client("get", "/v1/games", HTTP_X_PROFILE="1")
+        self.assertEqual(games.status_code, 200)
+        self.assertNotIn(PROFILE_ID_HEADER, games)
+        self.assertEqual(self._client("get", "/v1/stats/profiles").status_code, 403)
+        self.assertEqual(
+            self._client(
+                "put", "/v1/stats/sampler", data={"running": True}
+            ).status_code,
+            403,
+        )
+
+    def test_sampler(self):
+        """
+        Admins start and stop the stack sampler and read its stacks.
+        """
+
+        self._admin()
+        started = self._client(
+            "put", "/v1/stats/sampler", data={"running": True, "interval": 0.001}
+        )
+        try:
+            self.assertEqual(started.status_code, 202)
+            self.assertTrue(started.json()["data"]["running"])
+            time.sleep(0.05)
+        finally:
+            stopped = self._client("put", "/v1/stats/sampler", data={"running": False})
+        self.assertFalse(stopped.json()["data"]["running"])
+        sampler = self._client("get", "/v1/stats/sampler").json()["data"]
+        self.assertGreater(sampler["samples"], 0)
+        self.assertIn("MainThread;", sampler["folded"])
+        invalid = self._client(
+            "put", "/v1/stats/sampler", data={"running": True, "interval": 5}
+        )
+        self.assertEqual(invalid.status_code, 400)
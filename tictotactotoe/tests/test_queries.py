@@ -0,0 +1,296 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from datetime import timedelta
+from uuid import UUID
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from tictotactotoe_api.cache import game_cache
+from tictotactotoe_api.engine import Board
+from tictotactotoe_api.models import Games as GamesModel
+from tictotactotoe_api.models import Moves as MovesModel
+from tictotactotoe_api.tictactoe import get_board
+from .test_base import TicToTacToToeApiTestCase
+
+# Games in the database each endpoint is measured at, the later sizes add to the earlier ones.
+QUERY_BUDGET_SIZES = (10, 1000, 100000)
+# Most queries each endpoint may run from a cold game cache, session and user lookups included.
+QUERY_BUDGETS = {
+    "games_get": 3,
+    "games_get_player": 3,
+    "games_get_open": 3,
+    "games_get_next_page": 3,
+    "games_post": 3,
+    "games_bulk_post": 4,
+    "game_get": 3,
+    "game_put": 5,
+    "moves_get": 4,
+    "moves_get_since": 4,
+    "moves_get_since_none": 3,
+    "replay_get_early": 4,
+    "replay_get_late": 4,
+    "game_post": 7,
+    "moves_post": 7,
+    "analysis_get": 3,
+    "evaluate_post": 2,
+    "who_get": 3,
+}
+# Moves played in the game the per game endpoints are measured on, one per game up to this many.
+QUERY_BUDGET_MOVES = 200
+
+
+class TicToTacToToeQueryBudgetTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure no endpoint runs more queries than its budget or more as the tables grow.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.player_x = User.objects.create_user(username="budget_x")
+        self.player_o = User.objects.create_user(username="budget_o")
+        self.admin = User.objects.create_superuser(username="budget_admin")
+        self.games = 0
+
+    def _grow(self, games: int):
+        """
+        Fill the games table up to a number of games, a mix of open, running and finished ones.
+        """
+
+        states = ["turn_x", "turn_o", "winner_x", "winner_o", "tie"]
+        created = timezone.now() - timedelta(days=1)
+        GamesModel.objects.bulk_create(
+            (
+                GamesModel(
+                    id=UUID(int=number + 1),
+                    name="filler",
+                    state=states[number % len(states)],
+                    player_x=self.player_x,
+                    player_o=None if number % 7 == 0 else self.player_o,
+                    created=created - timedelta(seconds=number),
+                )
+                for number in range(self.games, games)
+            ),
+            batch_size=5000,
+        )
+        self.games = games
+
+    def _game(self, size: int = 19, win_length: int = 5, moves: int = 0) -> GamesModel:
+        """
+        A game with both players seated and some moves played, none of them winning.
+        """
+
+        board = Board(size, win_length)
+        played = []
+        for cell in range(size * size):
+            if len(played) == moves:
+                break
+            player = "x" if board.count % 2 == 0 else "o"
+            after = board.copy()
+            if after.play(cell % size, cell // size, player) is None:
+                board = after
+                played.append(
+                    MovesModel(
+                        player=player, x=cell % size, y=cell // size, ply=board.count
+                    )
+                )
+        game = GamesModel.objects.create(
+            name="budget",
+            size=size,
+            win_length=win_length,
+            player_x=self.player_x,
+            player_o=self.player_o,
+            board=board.encode(),
+            moves_count=board.count,
+            state="turn_x" if board.count % 2 == 0 else "turn_o",
+        )
+        for move in played:
+            move.game = game
+        MovesModel.objects.bulk_create(played)
+        return game
+
+    def _endpoints(self, games: int) -> dict:
+        """
+        The request each endpoint is measured with, as the user making it, method, uri and data.
+        """
+
+        game = self._game(moves=min(games, QUERY_BUDGET_MOVES))
+        mover = self.player_x if game.state == "turn_x" else self.player_o
+        board = get_board(game)
+        x, y = next(
+            (x, y) for y in range(19) for x in range(19) if board.is_empty(x, y)
+        )
+        batch = self._game(moves=0)
+        open_game = GamesModel.objects.create(name="open", player_x=self.player_x)
+        small = self._game(3, 3, 2)
+        self.client.force_login(self.player_o)
+        first = self._client("get", "/v1/games?limit=10")
+        return {
+            "games_get": (self.player_o, "get", "/v1/games", None),
+            "games_get_player": (
+                self.player_o,
+                "get",
+                f"/v1/games?player={self.player_x.id}",
+                None,
+            ),
+            "games_get_open": (self.player_o, "get", "/v1/games?open=1", None),
+            "games_get_next_page": (
+                self.player_o,
+                "get",
+                f"/v1/games?limit=10&cursor={first.json()['data']['next']}",
+                None,
+            ),
+            "games_post": (self.player_x, "post", "/v1/games", {"name": "budget"}),
+            "games_bulk_post": (
+                self.admin,
+                "post",
+                "/v1/games/bulk",
+                {
+                    "games": [
+                        {
+                            "name": "bulk",
+                            "player_x": self.player_x.id,
+                            "player_o": self.player_o.id,
+                        }
+                    ]
+                    * 10
+                },
+            ),
+            "game_get": (self.player_o, "get", f"/v1/games/{game.id}", None),
+            "game_put": (
+                self.player_o,
+                "put",
+                f"/v1/games/{open_game.id}",
+                {"player": "o"},
+            ),
+            "moves_get": (self.player_o, "get", f"/v1/games/{game.id}/moves", None),
+            "moves_get_since": (
+                self.player_o,
+                "get",
+                f"/v1/games/{game.id}/moves?since={game.moves_count - 1}",
+                None,
+            ),
+            "moves_get_since_none": (
+                self.player_o,
+                "get",
+                f"/v1/games/{game.id}/moves?since={game.moves_count}",
+                None,
+            ),
+            "replay_get_early": (
+                self.player_o,
+                "get",
+                f"/v1/games/{game.id}/replay?ply=1",
+                None,
+            ),
+            "replay_get_late": (
+                self.player_o,
+                "get",
+                f"/v1/games/{game.id}/replay",
+                None,
+            ),
+            "game_post": (
+                mover,
+                "post",
+                f"/v1/games/{game.id}/moves",
+                {"x": x, "y": y},
+            ),
+            "moves_post": (
+                self.player_x,
+                "post",
+                "/v1/moves",
+                {"moves": [{"game_id": str(batch.id), "x": 0, "y": 0}]},
+            ),
+            "analysis_get": (
+                self.player_o,
+                "get",
+                f"/v1/games/{small.id}/analysis",
+                None,
+            ),
+            "evaluate_post": (
+                self.player_o,
+                "post",
+                "/v1/evaluate",
+                {"boards": ["x-o------"] * 100, "size": 3, "win_length": 3},
+            ),
+            "who_get": (self.player_o, "get", "/v1/who", None),
+        }
+
+    def _queries(self, user, method: str, uri: str, data) -> list:
+        """
+        Make a request from a cold game cache and capture the queries it runs.
+        """
+
+        self.client.force_login(user)
+        game_cache.backend.clear()
+        kwargs = {} if data is None else {"data": data}
+        with CaptureQueriesContext(connection) as queries:
+            response = self._client(method, uri, **kwargs)
+        self.assertTrue(
+            status.is_success(response.status_code), f"{uri}: {response.content}"
+        )
+        return queries.captured_queries
+
+    @staticmethod
+    def _sql(queries: list) -> str:
+        return "\n".join(
+            f"  {number}. {query['sql']}" for number, query in enumerate(queries, 1)
+        )
+
+    def _assert_budget(self, endpoint: str, games: int, queries: list, budget: int):
+        """
+        Fail with the SQL that ran when an endpoint goes over its budget.
+        """
+
+        if len(queries) > budget:
+            self.fail(
+                f"{endpoint} ran {len(queries)} queries with {games} games, its budget is "
+                f"{budget}:\n{self._sql(queries)}"
+            )
+
+    def test_query_budgets(self):
+        """
+        Every endpoint stays within its query budget and runs as many queries at every size.
+        """
+
+        first = {}
+        for games in QUERY_BUDGET_SIZES:
+            self._grow(games)
+            for endpoint, request in self._endpoints(games).items():
+                queries = self._queries(*request)
+                with self.subTest(endpoint=endpoint, games=games):
+                    self._assert_budget(
+                        endpoint, games, queries, QUERY_BUDGETS[endpoint]
+                    )
+                    smallest, before = first.setdefault(endpoint, (games, queries))
+                    if len(queries) != len(before):
+                        self.fail(
+                            f"{endpoint} ran {len(before)} queries with {smallest} games and "
+                            f"{len(queries)} with {games} games, first:\n{self._sql(before)}\n"
+                            f"then:\n{self._sql(queries)}"
+                        )
+
+    def test_over_budget(self):
+        """
+        Going over a budget fails with the queries that ran.
+        """
+
+        queries = self._queries(self.player_o, "get", "/v1/games", None)
+        with self.assertRaises(AssertionError) as raised:
+            self._assert_budget("games_get", self.games, queries, len(queries) - 1)
+        self.assertIn("games_get ran", str(raised.exception))
+        self.assertIn('FROM "tictotactotoe_api_games"', str(raised.exception))
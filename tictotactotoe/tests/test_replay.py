@@ -0,0 +1,147 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tictotactotoe_api.engine import Board
+from tictotactotoe_api.models import Moves as MovesModel
+from .test_base import TicToTacToToeApiTestCase
+
+# x wins along the top row on the fifth ply.
+MOVES = [
+    {"player": "x", "x": 0, "y": 0},
+    {"player": "o", "x": 0, "y": 1},
+    {"player": "x", "x": 1, "y": 0},
+    {"player": "o", "x": 1, "y": 1},
+    {"player": "x", "x": 2, "y": 0},
+]
+
+
+class TicToTacToToeReplayTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure moves are numbered and a game can be replayed to any of its plies.
+    """
+
+    def _replay(self, game_id: str, ply=None):
+        uri = f"/v1/games/{game_id}/replay"
+        if ply is not None:
+            uri = f"{uri}?ply={ply}"
+        self._login("o")
+        replay = self._client("get", uri)
+        self._logout()
+        return replay
+
+    def test_moves_ordered(self):
+        """
+        Moves are numbered in the order they were played and listed in that order.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES)
+        self._login("x")
+        moves = self._client("get", f"/v1/games/{game_id}/moves").json()["data"]
+        self.assertEqual([move["ply"] for move in moves], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [{key: move[key] for key in ["player", "x", "y"]} for move in moves], MOVES
+        )
+        self.assertTrue(all(move["created"] for move in moves))
+
+    def test_replay(self):
+        """
+        The board at every ply is the one the game had after that many moves.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES)
+        board = Board()
+        for ply in range(len(MOVES) + 1):
+            if ply:
+                move = MOVES[ply - 1]
+                board.place(move["x"], move["y"], move["player"])
+            replay = self._replay(game_id, ply)
+            self.assertEqual(replay.status_code, 200)
+            data = replay.json()["data"]
+            self.assertEqual(data["ply"], ply)
+            self.assertEqual(data["moves_count"], len(MOVES))
+            self.assertEqual(data["moves"], board.to_moves())
+            if ply:
+                self.assertEqual(
+                    {key: data["move"][key] for key in ["player", "x", "y", "ply"]},
+                    {**MOVES[ply - 1], "ply": ply},
+                )
+            else:
+                self.assertIsNone(data["move"])
+        self.assertEqual(self._replay(game_id, 4).json()["data"]["state"], "turn_x")
+        self.assertEqual(self._replay(game_id, 3).json()["data"]["state"], "turn_o")
+        latest = self._replay(game_id).json()["data"]
+        self.assertEqual(latest["ply"], 5)
+        self.assertEqual(latest["state"], "winner_x")
+
+    def test_replay_range_scan(self):
+        """
+        A replay reads the moves it needs through the game and ply index.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES)
+        for ply in [1, 4]:
+            self._login("o")
+            with CaptureQueriesContext(connection) as queries:
+                self._client("get", f"/v1/games/{game_id}/replay?ply={ply}")
+            moves = [q["sql"] for q in queries.captured_queries if "_moves" in q["sql"]]
+            self._logout()
+            self.assertEqual(len(moves), 1)
+            self.assertNotIn("ORDER BY", moves[0])
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {moves[0]}")
+                plan = " ".join(str(row) for row in cursor.fetchall())
+            # SQLite names the index of the unique constraint on game and ply itself
+            self.assertRegex(
+                plan, r"SEARCH \w+ USING INDEX \w+ \(game_id=\? AND ply[<>]"
+            )
+        self.assertEqual(MovesModel.objects.filter(game_id=game_id).count(), len(MOVES))
+
+    def test_replay_bad(self):
+        """
+        Plies outside the game or that are not numbers are turned away.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES[:2])
+        too_far = self._replay(game_id, 3)
+        self.assertEqual(too_far.status_code, 400)
+        self.assertEqual(too_far.json()["message"], "ply must be between 0 and 2!")
+        self.assertEqual(self._replay(game_id, -1).status_code, 400)
+        self.assertEqual(self._replay(game_id, "one").status_code, 400)
+        self.assertEqual(
+            self._replay("00000000-0000-0000-0000-000000000000").status_code, 404
+        )
+
+    def test_replay_computer(self):
+        """
+        The computer's reply gets the ply after the move it answers.
+        """
+
+        self._register("x")
+        self._login("x")
+        game_id = self._games_post(ai="o")
+        self._game_put(game_id, "x")
+        self._client("post", f"/v1/games/{game_id}/moves", data={"x": 1, "y": 1})
+        self._logout()
+        moves = MovesModel.objects.filter(game_id=game_id).order_by("ply")
+        self.assertEqual(
+            [(move.ply, move.player) for move in moves], [(1, "x"), (2, "o")]
+        )
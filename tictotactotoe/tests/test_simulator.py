@@ -0,0 +1,86 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from tictotactotoe_api import simulator
+
+
+class TicToTacToToeSimulatorTestCases(SimpleTestCase):
+    """
+    Let's make sure simulated games follow the rules and add up.
+    """
+
+    def test_random(self):
+        """
+        Random players give x the well known edge on the classic board.
+        """
+
+        report = simulator.simulate(20000, seed=18)
+        self.assertEqual(sum(report["outcomes"].values()), 20000)
+        self.assertEqual(sum(report["lengths"].values()), 20000)
+        self.assertEqual(min(report["lengths"]), 5)
+        self.assertEqual(len(report["openings"]), 9)
+        self.assertAlmostEqual(
+            report["outcomes"]["winner_x"] / 20000, 0.585, delta=0.02
+        )
+        self.assertAlmostEqual(report["outcomes"]["tie"] / 20000, 0.127, delta=0.02)
+        self.assertAlmostEqual(report["advantage"], 0.297, delta=0.03)
+
+    def test_seed(self):
+        """
+        A seed plays the same games however many workers there are.
+        """
+
+        with mock.patch.object(simulator, "SIMULATE_BATCH", 1000):
+            one = simulator.simulate(3000, size=4, seed=7)
+            two = simulator.simulate(3000, size=4, seed=7, workers=2)
+        self.assertEqual(one["outcomes"], two["outcomes"])
+        self.assertEqual(one["lengths"], two["lengths"])
+
+    def test_solver(self):
+        """
+        The solver never loses, to itself that is always a tie.
+        """
+
+        report = simulator.simulate(2000, x="solver", o="solver", seed=18)
+        self.assertEqual(
+            report["outcomes"], {"winner_x": 0, "winner_o": 0, "tie": 2000}
+        )
+        report = simulator.simulate(2000, x="random", o="solver", seed=18)
+        self.assertEqual(report["outcomes"]["winner_x"], 0)
+
+    def test_bigger_boards(self):
+        """
+        Wins on bigger boards follow the win length.
+        """
+
+        report = simulator.simulate(500, size=5, win_length=4, seed=18)
+        self.assertEqual(sum(report["outcomes"].values()), 500)
+        self.assertEqual(min(report["lengths"]), 7)
+        with self.assertRaises(ValueError):
+            simulator.simulate(10, size=4, x="solver")
+
+    def test_command(self):
+        """
+        The command prints the report.
+        """
+
+        out = StringIO()
+        call_command("simulate", games=1000, seed=18, workers=1, stdout=out)
+        self.assertIn("First move advantage", out.getvalue())
@@ -0,0 +1,129 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .test_base import TicToTacToToeApiTestCase
+from .test_replay import MOVES
+
+
+class TicToTacToToeSinceTestCases(TicToTacToToeApiTestCase):
+    """
+    Let's make sure clients polling a game only get the moves they do not have yet.
+    """
+
+    def _since(self, game_id: str, since, **kwargs):
+        self._login("o")
+        moves = self._client(
+            "get", f"/v1/games/{game_id}/moves?since={since}", **kwargs
+        )
+        self._logout()
+        return moves
+
+    def test_since(self):
+        """
+        Only the moves after the ply come back, in order, with the state of the game.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES[:3])
+        for since in range(3):
+            moves = self._since(game_id, since)
+            self.assertEqual(moves.status_code, 200)
+            data = moves.json()["data"]
+            self.assertEqual(data["since"], since)
+            self.assertEqual(data["moves_count"], 3)
+            self.assertEqual(data["state"], "turn_o")
+            self.assertEqual(
+                [move["ply"] for move in data["moves"]], list(range(since + 1, 4))
+            )
+            self.assertEqual(
+                [
+                    {key: move[key] for key in ["player", "x", "y"]}
+                    for move in data["moves"]
+                ],
+                MOVES[since:3],
+            )
+
+        self._play_moves(game_id, MOVES[3:])
+        data = self._since(game_id, 3).json()["data"]
+        self.assertEqual([move["ply"] for move in data["moves"]], [4, 5])
+        self.assertEqual(data["state"], "winner_x")
+
+    def test_since_nothing_new(self):
+        """
+        A client that is up to date gets no content, without the moves being read.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES[:2])
+        self._login("o")
+        with CaptureQueriesContext(connection) as queries:
+            moves = self._client("get", f"/v1/games/{game_id}/moves?since=2")
+        read = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "_moves" in query["sql"]
+        ]
+        self._logout()
+        self.assertEqual(moves.status_code, 204)
+        self.assertEqual(moves.content, b"")
+        self.assertEqual(read, [])
+        self.assertTrue(moves.has_header("ETag"))
+
+        not_modified = self._since(game_id, 1, HTTP_IF_NONE_MATCH=moves["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_since_range_scan(self):
+        """
+        The new moves are read through the game and ply index.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES)
+        self._login("o")
+        with CaptureQueriesContext(connection) as queries:
+            self._client("get", f"/v1/games/{game_id}/moves?since=3")
+        read = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "_moves" in query["sql"]
+        ]
+        self._logout()
+        self.assertEqual(len(read), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {read[0]}")
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertRegex(plan, r"SEARCH \w+ USING INDEX \w+ \(game_id=\? AND ply>\?\)")
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_since_bad(self):
+        """
+        Plies the game has not reached or that are not numbers are turned away.
+        """
+
+        game_id = self._setup_game()
+        self._play_moves(game_id, MOVES[:2])
+        for since, message in [
+            ("a", "since must be a number!"),
+            (-1, "since must be between 0 and 2!"),
+            (3, "since must be between 0 and 2!"),
+        ]:
+            moves = self._since(game_id, since)
+            self.assertEqual(moves.status_code, 400)
+            self.assertEqual(moves.json()["message"], message)
+        missing = self._since("00000000-0000-0000-0000-000000000000", 0)
+        self.assertEqual(missing.status_code, 404)
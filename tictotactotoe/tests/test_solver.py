@@ -0,0 +1,135 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import mmap
+import random
+import tempfile
+from pathlib import Path
+from django.test import SimpleTestCase, override_settings
+from tictotactotoe_api import solver
+from tictotactotoe_api.engine import Board
+
+
+class AlwaysMistaken(random.Random):
+    """
+    Randomness that always decides to pass over the best moves.
+    """
+
+    def random(self):
+        return 0.0
+
+
+class TicToTacToToeSolverTestCases(SimpleTestCase):
+    """
+    Let's make sure the computer plays well, or badly when asked to.
+    """
+
+    def _never_loses(self, board: Board, player: str, computer: str) -> bool:
+        """
+        Try every move the other player could make against the perfect computer.
+
+        :param board: Board to play from.
+        :param player: Player to move.
+        :param computer: Player the computer is.
+        :return: Boolean, False if any line of play beats the computer.
+        """
+        other = "o" if player == "x" else "x"
+        if player == computer:
+            x, y = solver.choose(board, solver.MAX_LEVEL)
+            board = board.copy()
+            winner = board.play(x, y, player)
+            return winner is not None or self._never_loses(board, other, computer)
+        for cell in range(9):
+            x, y = cell % 3, cell // 3
+            if not board.is_empty(x, y):
+                continue
+            after = board.copy()
+            winner = after.play(x, y, player)
+            if winner == player:
+                return False
+            if winner is None and not self._never_loses(after, other, computer):
+                return False
+        return True
+
+    def test_perfect_play(self):
+        """
+        Nobody can beat the computer at its best, whichever side it plays.
+        """
+
+        self.assertTrue(self._never_loses(Board(), "x", "x"))
+        self.assertTrue(self._never_loses(Board(), "x", "o"))
+
+    def test_scores(self):
+        """
+        After a corner opening only the center holds the draw.
+        """
+
+        self.assertEqual(solver.scores(Board()), [0] * 9)
+        board = Board()
+        board.place(0, 0, "x")
+        scores = solver.scores(board)
+        self.assertEqual(scores[0], solver.ILLEGAL)
+        self.assertEqual(scores[4], 0)
+        self.assertTrue(
+            all(score < 0 for cell, score in enumerate(scores) if cell not in [0, 4])
+        )
+
+    def test_analyse(self):
+        """
+        Every empty cell gets its result and how many moves away it is.
+        """
+
+        board = Board()
+        for x, y, player in [(0, 0, "x"), (0, 1, "o"), (1, 0, "x"), (1, 1, "o")]:
+            board.place(x, y, player)
+        cells = {(cell["x"], cell["y"]): cell for cell in solver.analyse(board)}
+        self.assertEqual(len(cells), 5)
+        self.assertEqual(cells[(2, 0)]["result"], "win")
+        self.assertEqual(cells[(2, 0)]["distance"], 1)
+        self.assertEqual(cells[(2, 2)]["result"], "loss")
+        self.assertEqual(cells[(2, 2)]["distance"], 2)
+
+    def test_levels(self):
+        """
+        Lower levels pick a move that is not the best when they decide to slip.
+        """
+
+        board = Board()
+        board.place(0, 0, "x")
+        self.assertEqual(
+            solver.choose(board, solver.MAX_LEVEL, AlwaysMistaken()), (1, 1)
+        )
+        self.assertNotEqual(solver.choose(board, 1, AlwaysMistaken()), (1, 1))
+
+    def test_table_mapped(self):
+        """
+        A saved table is memory mapped and holds the same scores as solving it.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "solver.bin"
+            solver.save(path)
+            with override_settings(SOLVER_TABLE=path):
+                solver.table.cache_clear()
+                try:
+                    mapped = solver.table()
+                    self.assertIsInstance(mapped.index.obj, mmap.mmap)
+                    self.assertEqual(
+                        mapped.index.tobytes() + mapped.rows.tobytes(),
+                        solver.solve(),
+                    )
+                finally:
+                    solver.table.cache_clear()
@@ -68,9 +68,14 @@ SPECTACULAR_SETTINGS = {
     },
     "LICENSE": "",
     "VERSION": "0.0.1",
+    # moves and the computer's seat share the x and o choices
+    "ENUM_NAME_OVERRIDES": {
+        "PlayerEnum": "tictotactotoe_api.models.Moves.PLAYER_CHOICES",
+    },
 }
 
 MIDDLEWARE = [
+    "tictotactotoe_api.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -141,6 +146,43 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The games cache holds game rows in front of the database, LocMemCache is an LRU per worker
+# and FileBasedCache (GAMES_CACHE_LOCATION set to a directory) is shared by the workers of a host.
+# Either way a cached game is checked against its version column before it is served.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "games": {
+        "BACKEND": os.environ.get(
+            "GAMES_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("GAMES_CACHE_LOCATION", "games"),
+        "TIMEOUT": int(os.environ.get("GAMES_CACHE_TIMEOUT", "10")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("GAMES_CACHE_MAX_ENTRIES", "10000")),
+        },
+    },
+}
+
+
+# Computer opponent
+# Solved 3x3 positions written by "manage.py solve" and memory mapped by every worker.
+
+SOLVER_TABLE = os.environ.get("SOLVER_TABLE", BASE_DIR / "solver.bin")
+
+
+# Profiling
+# Both stay off unless switched on here or by an admin at runtime through v1/stats/profiles and
+# v1/stats/sampler, requests are only profiled when a staff user sends the X-Profile header.
+
+PROFILE_REQUESTS = os.environ.get("DJANGO_PROFILE_REQUESTS", "").lower() == "true"
+PROFILE_SAMPLER = os.environ.get("DJANGO_PROFILE_SAMPLER", "").lower() == "true"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -18,6 +18,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
+from tictotactotoe_api.views.viewstats import MetricsView
 
 
 def custom400(request, exception=None):
@@ -84,4 +85,5 @@ handler500 = custom500
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("tictotactotoe_api.urls")),
+    path("metrics", MetricsView.as_view()),
 ]
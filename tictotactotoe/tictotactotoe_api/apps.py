@@ -15,6 +15,7 @@ limitations under the License.
 """
 
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TictotactotoeApiConfig(AppConfig):
@@ -24,3 +25,13 @@ class TictotactotoeApiConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "tictotactotoe_api"
+
+    def ready(self):
+        """
+        Switch on the profilers the settings ask for.
+        """
+        from .profiling import request_profiler, stack_sampler  # pylint: disable=C0415
+
+        request_profiler.enabled = settings.PROFILE_REQUESTS
+        if settings.PROFILE_SAMPLER:
+            stack_sampler.start()
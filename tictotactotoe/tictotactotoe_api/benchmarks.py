@@ -0,0 +1,299 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from uuid import uuid4
+import numpy as np
+from django.contrib.auth.models import User as UserModel
+from django.test import Client
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from .engine import Board
+from .evaluator import evaluate
+from .models import Games as GamesModel
+from .models import Moves as MovesModel
+from .serializers import GameSerializer, MoveSerializer
+from .solver import choose
+from .tictactoe import get_moves, get_winner
+from .views.base import TicToTacToToeAPIView
+
+# Runs the allocations are measured over, tracemalloc slows every run down so they are kept apart.
+ALLOCATION_RUNS = 20
+# Runs before the timed ones so caches and lazy imports are warm.
+WARMUP_RUNS = 5
+
+# Benchmarks by name: setup, whether it needs a database and the most runs it can take.
+BENCHMARKS = {}
+
+
+def benchmark(name: str, database: bool = False, runs: int = None):
+    """
+    Register a benchmark, the decorated setup hands back the operation to time.
+
+    Setup is called once for the timed runs and once more for the allocation runs.
+
+    :param name: Benchmark name, dotted by the area it covers.
+    :type name: str.
+    :param database: Whether the benchmark needs a database.
+    :type database: bool.
+    :param runs: Most runs one setup can take, None for no limit.
+    :type runs: int or None.
+    :return: Decorator.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = (setup, database, runs)
+        return setup
+
+    return register
+
+
+def _board(size: int, win_length: int, moves: int) -> Board:
+    """
+    A board part way through a game nobody has won yet.
+    """
+    board = Board(size, win_length)
+    cells = list(range(board.index.cells))
+    random.Random(size).shuffle(cells)
+    for cell in cells:
+        if board.count == moves:
+            break
+        player = "x" if board.count % 2 == 0 else "o"
+        after = board.copy()
+        if after.play(cell % size, cell // size, player) is None:
+            board = after
+    return board
+
+
+@benchmark("engine.winner")
+def _engine_winner():
+    board = _board(3, 3, 4)
+    return board.winner
+
+
+@benchmark("engine.winner_19x19")
+def _engine_winner_big():
+    board = _board(19, 5, 100)
+    return board.winner
+
+
+@benchmark("engine.play")
+def _engine_play():
+    board = _board(19, 5, 100)
+    x, y = next((x, y) for y in range(19) for x in range(19) if board.is_empty(x, y))
+    return lambda: board.copy().play(x, y, "x")
+
+
+@benchmark("evaluator.evaluate_10k")
+def _evaluator_evaluate():
+    boards = np.random.default_rng(19).integers(-1, 2, size=(10000, 9), dtype=np.int8)
+    return lambda: evaluate(boards)
+
+
+@benchmark("solver.choose")
+def _solver_choose():
+    board = _board(3, 3, 2)
+    return lambda: choose(board)
+
+
+@benchmark("serializer.move")
+def _serializer_move():
+    move = MovesModel(player="x", x=1, y=2)
+
+    def round_trip():
+        data = MoveSerializer(move).data
+        MoveSerializer(data=data).is_valid(raise_exception=True)
+
+    return round_trip
+
+
+@benchmark("serializer.game")
+def _serializer_game():
+    game = GamesModel(
+        name="benchmark",
+        player_x=UserModel(id=1, username="x"),
+        player_o=UserModel(id=2, username="o"),
+    )
+
+    def round_trip():
+        data = GameSerializer(game).data
+        GameSerializer(data=data).is_valid(raise_exception=True)
+
+    return round_trip
+
+
+@benchmark("view.response")
+def _view_response():
+    renderer = JSONRenderer()
+    data = GameSerializer(GamesModel(name="benchmark")).data
+
+    def render():
+        response = TicToTacToToeAPIView._response(  # pylint: disable=W0212
+            status.HTTP_200_OK, data, "Here is the game!"
+        )
+        response.accepted_renderer = renderer
+        response.accepted_media_type = renderer.media_type
+        response.renderer_context = {}
+        return response.render()
+
+    return render
+
+
+def _game(size: int = 3, win_length: int = 3, moves: int = 0) -> GamesModel:
+    """
+    A game in the database with both players seated, part way through.
+    """
+    player_x = UserModel.objects.create(username=f"x{uuid4().hex[:12]}")
+    player_o = UserModel.objects.create(username=f"o{uuid4().hex[:12]}")
+    board = _board(size, win_length, moves)
+    game = GamesModel.objects.create(
+        name="benchmark",
+        size=size,
+        win_length=win_length,
+        player_x=player_x,
+        player_o=player_o,
+        board=board.encode(),
+        moves_count=board.count,
+        state="turn_x" if board.count % 2 == 0 else "turn_o",
+    )
+    # the order the moves were played in is not kept, x gets the odd plies and o the even ones
+    plies = {"x": 1, "o": 2}
+    moves = []
+    for y, row in enumerate(board.to_moves()):
+        for x, player in enumerate(row):
+            if player:
+                moves.append(
+                    MovesModel(game=game, player=player, x=x, y=y, ply=plies[player])
+                )
+                plies[player] += 2
+    MovesModel.objects.bulk_create(moves)
+    return game
+
+
+@benchmark("db.get_winner", database=True)
+def _db_get_winner():
+    game_id = str(_game(moves=4).id)
+    return lambda: get_winner(game_id)
+
+
+@benchmark("db.get_moves", database=True)
+def _db_get_moves():
+    game_id = str(_game(moves=4).id)
+    return lambda: get_moves(game_id)
+
+
+@benchmark("view.game_post", database=True, runs=300)
+def _view_game_post():
+    # on a 19x19 board that needs all 19 in a row, playing the cells in order wins by cell 360
+    game = _game(19, 19)
+    clients = []
+    for player in [game.player_x, game.player_o]:
+        client = Client()
+        client.force_login(player)
+        clients.append(client)
+    uri = f"/api/v1/games/{game.id}/moves"
+    cells = iter(range(19 * 19))
+
+    def post():
+        cell = next(cells)
+        response = clients[cell % 2].post(
+            uri, {"x": cell % 19, "y": cell // 19}, content_type="application/json"
+        )
+        if not status.is_success(response.status_code):
+            raise RuntimeError(response.content)
+
+    return post
+
+
+def measure(name: str, seconds: float = 1.0) -> dict:
+    """
+    Time one benchmark for a while, then measure what a run allocates.
+
+    :param name: Benchmark name.
+    :type name: str.
+    :param seconds: How long to keep timing runs for.
+    :type seconds: float.
+    :return: runs, ops per second, p50, p95 and p99 in microseconds and bytes allocated per run.
+    :rtype: dict.
+    """
+    setup, _, runs = BENCHMARKS[name]
+    limit = runs - WARMUP_RUNS if runs else None
+    operation = setup()
+    for _ in range(WARMUP_RUNS):
+        operation()
+    times = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline and (limit is None or len(times) < limit):
+        started = time.perf_counter_ns()
+        operation()
+        times.append(time.perf_counter_ns() - started)
+
+    operation = setup()
+    operation()
+    allocated = []
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOCATION_RUNS):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            operation()
+            allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    percentiles = (
+        statistics.quantiles(times, n=100, method="inclusive") if len(times) > 1 else []
+    )
+    return {
+        "runs": len(times),
+        "ops": len(times) * 1e9 / sum(times),
+        "p50": statistics.median(times) / 1000,
+        "p95": percentiles[94] / 1000 if percentiles else times[0] / 1000,
+        "p99": percentiles[98] / 1000 if percentiles else times[0] / 1000,
+        "allocated": int(statistics.median(allocated)),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.1) -> dict:
+    """
+    Compare results with a stored baseline, by median run time so a few slow runs do not count.
+
+    :param results: Results by benchmark name.
+    :type results: dict.
+    :param baseline: Earlier results by benchmark name.
+    :type baseline: dict.
+    :param tolerance: Change in speed that is put down to noise.
+    :type tolerance: float.
+    :return: Speedup, above 1 is faster, and verdict for every benchmark in the baseline.
+    :rtype: dict.
+    """
+    changes = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        speedup = baseline[name]["p50"] / result["p50"]
+        if speedup > 1 + tolerance:
+            verdict = "faster"
+        elif speedup < 1 - tolerance:
+            verdict = "slower"
+        else:
+            verdict = "same"
+        changes[name] = {"speedup": speedup, "verdict": verdict}
+    return changes
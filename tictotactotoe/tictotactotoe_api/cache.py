@@ -0,0 +1,293 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import logging
+import threading
+from contextvars import ContextVar
+from uuid import UUID
+from django.core.cache import caches
+from .models import Games as GamesModel
+
+log = logging.getLogger("api")
+
+# Alias in settings.CACHES, any Django cache backend can be plugged in there.
+GAMES_CACHE = "games"
+# Fields of the players cached with a game, just what is shown of them so password hashes and
+# emails never end up in the cache backend.
+PLAYER_FIELDS = ("id", "username")
+
+
+def _games():
+    """
+    Games with only the fields of their players that are shown, ready to be cached.
+    """
+    meta = GamesModel._meta  # pylint: disable=W0212
+    fields = [field.name for field in meta.concrete_fields]
+    players = [
+        f"player_{player}__{field}" for player in ["o", "x"] for field in PLAYER_FIELDS
+    ]
+    return GamesModel.objects.select_related("player_o", "player_x").only(
+        *fields, *players
+    )
+
+
+# Keys of the games checked against the database during the request being served, None outside a
+# request so every fetch checks.
+_checked = ContextVar("checked", default=None)
+
+
+def _version(game_id):
+    """
+    Just the version of a game, read by its primary key.
+    """
+    return GamesModel.objects.filter(id=game_id).values_list("version", flat=True)
+
+
+class GameCache:
+    """
+    Game rows, players included, cached by game id in front of the database.
+
+    Entries are only ever replaced by a newer version of the game, the write path stores the game it
+    just committed. Reads check a cached game against the version column before trusting it, so a
+    game another worker changed is read again instead of being served or answered 304 stale.
+    """
+
+    def __init__(self, alias: str = GAMES_CACHE):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        """
+        Django cache backend behind this cache.
+        """
+        return caches[self.alias]
+
+    @staticmethod
+    def key(game_id) -> str:
+        """
+        Cache key for a game, the same game id written any way gets the same key.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Cache key or None when the id cannot be a game.
+        :rtype: str or None.
+        """
+        try:
+            return f"game:{UUID(str(game_id)).hex}"
+        except ValueError:
+            return None
+
+    def get(self, game_id) -> GamesModel:
+        """
+        Get a game from the cache.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Cached game or None on a miss.
+        :rtype: GamesModel or None.
+        """
+        key = self.key(game_id)
+        game = self.backend.get(key) if key else None
+        with self._lock:
+            if game is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return game
+
+    async def aget(self, game_id) -> GamesModel:
+        """
+        Get a game from the cache without blocking the event loop.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Cached game or None on a miss.
+        :rtype: GamesModel or None.
+        """
+        key = self.key(game_id)
+        game = await self.backend.aget(key) if key else None
+        with self._lock:
+            if game is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return game
+
+    def fetch(self, game_id) -> GamesModel:
+        """
+        Get a game from the cache once its version is checked, loading it from the database on a
+        miss or when it is behind.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Game or None if it does not exist.
+        :rtype: GamesModel or None.
+        """
+        game = self.get(game_id)
+        checked = _checked.get()
+        if game is not None and checked is not None and self.key(game_id) in checked:
+            return game
+        if game is None or _version(game.id).first() != game.version:
+            game = self.load(game_id)
+        if game is not None and checked is not None:
+            checked.add(self.key(game_id))
+        return game
+
+    async def afetch(self, game_id) -> GamesModel:
+        """
+        Get a game from the cache once its version is checked, loading it from the database on a
+        miss or when it is behind, without blocking the event loop.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Game or None if it does not exist.
+        :rtype: GamesModel or None.
+        """
+        game = await self.aget(game_id)
+        checked = _checked.get()
+        if game is not None and checked is not None and self.key(game_id) in checked:
+            return game
+        if game is None or await _version(game.id).afirst() != game.version:
+            game = await self.aload(game_id)
+        if game is not None and checked is not None:
+            checked.add(self.key(game_id))
+        return game
+
+    def load(self, game_id) -> GamesModel:
+        """
+        Read a game and its players from the database and cache it.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Game or None if it does not exist.
+        :rtype: GamesModel or None.
+        """
+        if self.key(game_id) is None:
+            return None
+        game = _games().filter(id=game_id).first()
+        if game is not None:
+            self.set(game)
+        return game
+
+    async def aload(self, game_id) -> GamesModel:
+        """
+        Read a game and its players from the database and cache it, without blocking the event
+        loop.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        :return: Game or None if it does not exist.
+        :rtype: GamesModel or None.
+        """
+        if self.key(game_id) is None:
+            return None
+        game = await _games().filter(id=game_id).afirst()
+        if game is not None:
+            await self.aset(game)
+        return game
+
+    def set(self, game: GamesModel):
+        """
+        Cache a game unless a newer version of it is already cached.
+
+        :param game: Game with its players loaded.
+        :type game: GamesModel.
+        """
+        key = self.key(game.id)
+        cached = self.backend.get(key)
+        if cached is not None and cached.version > game.version:
+            return
+        self.backend.set(key, game)
+
+    async def aset(self, game: GamesModel):
+        """
+        Cache a game unless a newer version of it is already cached, without blocking the event
+        loop.
+
+        :param game: Game with its players loaded.
+        :type game: GamesModel.
+        """
+        key = self.key(game.id)
+        cached = await self.backend.aget(key)
+        if cached is not None and cached.version > game.version:
+            return
+        await self.backend.aset(key, game)
+
+    def delete(self, game_id):
+        """
+        Drop a game from the cache.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        """
+        key = self.key(game_id)
+        if key:
+            self.backend.delete(key)
+
+    async def adelete(self, game_id):
+        """
+        Drop a game from the cache without blocking the event loop.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str or UUID.
+        """
+        key = self.key(game_id)
+        if key:
+            await self.backend.adelete(key)
+
+    @staticmethod
+    def start_request():
+        """
+        Check each game against the database only once until the request ends, the first fetch
+        of a game in the request checks it and the later ones trust it.
+
+        :return: Token to hand to end_request.
+        :rtype: contextvars.Token.
+        """
+        return _checked.set(set())
+
+    @staticmethod
+    def end_request(token):
+        """
+        Go back to checking every fetch once the request is served.
+
+        :param token: Token returned by start_request.
+        :type token: contextvars.Token.
+        """
+        _checked.reset(token)
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counters for this worker.
+
+        :return: hits, misses and hit ratio.
+        :rtype: dict.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend": self.backend.__class__.__name__,
+            "hits": hits,
+            "misses": misses,
+            "ratio": hits / total if total else 0.0,
+        }
+
+
+game_cache = GameCache()
@@ -0,0 +1,281 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from functools import lru_cache
+
+SIZE = 3
+MIN_SIZE = 3
+MAX_SIZE = 19
+
+# Directions a winning line can run in: across, down and both diagonals.
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (-1, 1))
+
+# Encoded boards are one character per cell, row by row: "x", "o" or "-" for empty.
+EMPTY = "-"
+_X_BITS = str.maketrans({"x": "1", "o": "0", EMPTY: "0"})
+_O_BITS = str.maketrans({"x": "0", "o": "1", EMPTY: "0"})
+
+
+class LineIndex:
+    """
+    Every winning segment for a board size and win length.
+    """
+
+    __slots__ = ("size", "win_length", "cells", "lines", "cell_lines")
+
+    def __init__(self, size: int, win_length: int):
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        lines = []
+        for y in range(size):
+            for x in range(size):
+                for dx, dy in DIRECTIONS:
+                    end_x = x + dx * (win_length - 1)
+                    end_y = y + dy * (win_length - 1)
+                    if not (0 <= end_x < size and end_y < size):
+                        continue
+                    line = 0
+                    for i in range(win_length):
+                        line |= 1 << ((y + dy * i) * size + x + dx * i)
+                    lines.append(line)
+        self.lines = tuple(lines)
+        self.cell_lines = tuple(
+            tuple(line for line in self.lines if line & (1 << i))
+            for i in range(self.cells)
+        )
+
+
+@lru_cache(maxsize=None)
+def line_index(size: int = SIZE, win_length: int = SIZE) -> LineIndex:
+    """
+    Build the line index for a board once and hand back the same one afterwards.
+
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: Line index for the board.
+    :rtype: LineIndex.
+    """
+    return LineIndex(size, win_length)
+
+
+class Board:
+    """
+    Tic-Tac-Toe board stored as one bit mask per player.
+    """
+
+    __slots__ = ("index", "x", "o", "count")
+
+    def __init__(
+        self, size: int = SIZE, win_length: int = SIZE, x: int = 0, o: int = 0
+    ):
+        self.index = line_index(size, win_length)
+        self.x = x
+        self.o = o
+        self.count = bin(x | o).count("1")
+
+    @property
+    def size(self) -> int:
+        """
+        Number of rows and columns on the board.
+        """
+        return self.index.size
+
+    @property
+    def win_length(self) -> int:
+        """
+        How many in a row are needed to win.
+        """
+        return self.index.win_length
+
+    @classmethod
+    def from_moves(cls, moves: list, win_length: int = SIZE) -> "Board":
+        """
+        Build a board from the moves[y][x] layout used by the API.
+
+        :param moves: Rows of "x", "o" or None.
+        :type moves: list.
+        :param win_length: How many in a row are needed to win.
+        :type win_length: int.
+        :return: Board holding the same moves.
+        :rtype: Board.
+        """
+        board = cls(len(moves), win_length)
+        for y, row in enumerate(moves):
+            for x, player in enumerate(row):
+                if player is not None:
+                    board.place(x, y, player)
+        return board
+
+    @classmethod
+    def decode(cls, encoded: str, size: int = SIZE, win_length: int = SIZE) -> "Board":
+        """
+        Build a board from its encoded string, an empty string is an empty board.
+
+        :param encoded: One character per cell, row by row.
+        :type encoded: str.
+        :param size: Number of rows and columns on the board.
+        :type size: int.
+        :param win_length: How many in a row are needed to win.
+        :type win_length: int.
+        :return: Board holding the same moves.
+        :rtype: Board.
+        """
+        if not encoded:
+            return cls(size, win_length)
+        cells = encoded[::-1]
+        return cls(
+            size,
+            win_length,
+            int(cells.translate(_X_BITS), 2),
+            int(cells.translate(_O_BITS), 2),
+        )
+
+    def encode(self) -> str:
+        """
+        Flatten the board into one character per cell, row by row.
+
+        :return: Encoded board.
+        :rtype: str.
+        """
+        cells = self.index.cells
+        xs = format(self.x, f"0{cells}b")[::-1]
+        os = format(self.o, f"0{cells}b")[::-1]
+        return "".join(
+            "x" if x == "1" else "o" if o == "1" else EMPTY for x, o in zip(xs, os)
+        )
+
+    def to_moves(self) -> list:
+        """
+        Expand the board into the moves[y][x] layout used by the API.
+
+        :return: Rows of "x", "o" or None.
+        :rtype: list.
+        """
+        size = self.index.size
+        moves = [[None] * size for _ in range(size)]
+        for y in range(size):
+            for x in range(size):
+                bit = 1 << (y * size + x)
+                if self.x & bit:
+                    moves[y][x] = "x"
+                elif self.o & bit:
+                    moves[y][x] = "o"
+        return moves
+
+    def copy(self) -> "Board":
+        """
+        Another board holding the same moves.
+
+        :return: Copy of the board.
+        :rtype: Board.
+        """
+        return Board(self.size, self.win_length, self.x, self.o)
+
+    def is_empty(self, x: int, y: int) -> bool:
+        """
+        See if nobody has played on a cell yet.
+
+        :param x: Column of the cell.
+        :type x: int.
+        :param y: Row of the cell.
+        :type y: int.
+        :return: Boolean.
+        :rtype: bool.
+        """
+        return not (self.x | self.o) & (1 << (y * self.index.size + x))
+
+    def is_full(self) -> bool:
+        """
+        See if every cell on the board has been played.
+
+        :return: Boolean.
+        :rtype: bool.
+        """
+        return self.count == self.index.cells
+
+    def place(self, x: int, y: int, player: str):
+        """
+        Put a player's symbol on a cell.
+
+        :param x: Column of the cell.
+        :type x: int.
+        :param y: Row of the cell.
+        :type y: int.
+        :param player: Either "x" or "o".
+        :type player: str.
+        """
+        bit = 1 << (y * self.index.size + x)
+        if player == "x":
+            self.x |= bit
+        else:
+            self.o |= bit
+        self.count += 1
+
+    def clear(self, x: int, y: int):
+        """
+        Take a symbol back off a cell, an empty cell is left as it is.
+
+        :param x: Column of the cell.
+        :type x: int.
+        :param y: Row of the cell.
+        :type y: int.
+        """
+        bit = 1 << (y * self.index.size + x)
+        if (self.x | self.o) & bit:
+            self.x &= ~bit
+            self.o &= ~bit
+            self.count -= 1
+
+    def play(self, x: int, y: int, player: str):
+        """
+        Put a player's symbol on a cell and only check the lines through that cell.
+
+        :param x: Column of the cell.
+        :type x: int.
+        :param y: Row of the cell.
+        :type y: int.
+        :param player: Either "x" or "o".
+        :type player: str.
+        :return: The winning player, tie or None if the match is still playing.
+        :rtype: str or None.
+        """
+        self.place(x, y, player)
+        mask = self.x if player == "x" else self.o
+        for line in self.index.cell_lines[y * self.index.size + x]:
+            if mask & line == line:
+                return player
+        if self.count == self.index.cells:
+            return "tie"
+        return None
+
+    def winner(self):
+        """
+        Determine if there is a winner on the board.
+
+        :return: The winning player, tie or None if the match is still playing.
+        :rtype: str or None.
+        """
+        for line in self.index.lines:
+            if self.x & line == line:
+                return "x"
+            if self.o & line == line:
+                return "o"
+        if self.is_full():
+            return "tie"
+        return None
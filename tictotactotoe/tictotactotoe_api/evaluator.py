@@ -0,0 +1,171 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from functools import lru_cache
+import numpy as np
+from .engine import EMPTY, SIZE, line_index
+
+# Cell values of a board array, anything else makes the board illegal.
+X = 1
+O = -1
+# Outcome codes handed back by evaluate, named by the game state they match.
+TURN_X = 0
+TURN_O = 1
+WINNER_X = 2
+WINNER_O = 3
+TIE = 4
+ILLEGAL = 5
+OUTCOMES = ("turn_x", "turn_o", "winner_x", "winner_o", "tie", "illegal")
+
+# Cell value of each character of an encoded board, characters that are not a cell are illegal.
+_CELLS = np.full(256, 127, dtype=np.int8)
+_CELLS[ord("x")] = X
+_CELLS[ord("o")] = O
+_CELLS[ord(EMPTY)] = 0
+# Boards with at most this many cells are looked up in a table of every board instead of scored.
+TABLE_CELLS = 9
+
+
+@lru_cache(maxsize=None)
+def line_matrix(size: int = SIZE, win_length: int = SIZE) -> np.ndarray:
+    """
+    Every winning segment of a board as a row of ones over its cells.
+
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: Lines by cells matrix.
+    :rtype: np.ndarray.
+    """
+    index = line_index(size, win_length)
+    cells = np.arange(index.cells)
+    lines = np.array(index.lines, dtype=object)[:, None]
+    matrix = ((lines >> cells) & 1).astype(np.float32)
+    matrix.flags.writeable = False
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def outcome_table(size: int = SIZE, win_length: int = SIZE) -> np.ndarray:
+    """
+    Outcome of every possible board of a size, indexed by the board read as a base 3 number.
+
+    The entry past the last board is ILLEGAL so boards holding other values can be pointed at it.
+
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: Outcome codes, see OUTCOMES.
+    :rtype: np.ndarray.
+    """
+    cells = size * size
+    codes = np.arange(3**cells)
+    boards = (codes[:, None] // 3 ** np.arange(cells) % 3 - 1).astype(np.int8)
+    table = np.append(_score(boards, size, win_length), np.int8(ILLEGAL))
+    table.flags.writeable = False
+    return table
+
+
+def decode(encoded: list, size: int = SIZE) -> np.ndarray:
+    """
+    Turn encoded boards into a board array without a Python loop over the cells.
+
+    :param encoded: Boards with one character per cell, row by row.
+    :type encoded: list.
+    :param size: Number of rows and columns on the boards.
+    :type size: int.
+    :return: Boards by cells array of X, O and 0 for empty cells.
+    :rtype: np.ndarray.
+    """
+    cells = size * size
+    if any(len(board) != cells for board in encoded):
+        raise ValueError(f"Every board needs {cells} cells!")
+    raw = np.frombuffer("".join(encoded).encode("latin-1", "replace"), dtype=np.uint8)
+    return _CELLS[raw].reshape(len(encoded), cells)
+
+
+def evaluate(boards, size: int = SIZE, win_length: int = SIZE) -> np.ndarray:
+    """
+    Classify many boards at once, every line of every board is checked in a few array operations.
+
+    A board is illegal when it holds anything but X, O and 0, when the move counts could not
+    happen with x going first, when both players have a line or when the winner did not make the
+    last move.
+
+    :param boards: Boards by cells array of X, O and 0 for empty cells.
+    :type boards: np.ndarray.
+    :param size: Number of rows and columns on the boards.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: One outcome code per board, see OUTCOMES.
+    :rtype: np.ndarray.
+    """
+    boards = np.asarray(boards)
+    cells = size * size
+    if boards.ndim != 2 or boards.shape[1] != cells:
+        raise ValueError(f"Boards need to be an (N, {cells}) array!")
+    if cells > TABLE_CELLS or not len(boards):
+        return _score(boards, size, win_length)
+
+    # x, empty and o are the digits 2, 1 and 0, a float32 product is exact for these few cells
+    table = outcome_table(size, win_length)
+    digits = 3 ** np.arange(cells, dtype=np.float32)
+    codes = (boards.astype(np.float32) @ digits + digits.sum()).astype(np.intp)
+    if boards.min() < O or boards.max() > X:
+        codes[((boards < O) | (boards > X)).any(axis=1)] = len(table) - 1
+    return table[codes]
+
+
+def _score(boards: np.ndarray, size: int, win_length: int) -> np.ndarray:
+    """
+    Classify boards by multiplying them with the line matrix, used for boards too big to tabulate.
+
+    :param boards: Boards by cells array.
+    :type boards: np.ndarray.
+    :param size: Number of rows and columns on the boards.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: One outcome code per board, see OUTCOMES.
+    :rtype: np.ndarray.
+    """
+    cells = size * size
+    xs = boards == X
+    os = boards == O
+    lines = line_matrix(size, win_length).T
+    x_won = ((xs.astype(np.float32) @ lines) == win_length).any(axis=1)
+    o_won = ((os.astype(np.float32) @ lines) == win_length).any(axis=1)
+    x_count = xs.sum(axis=1)
+    o_count = os.sum(axis=1)
+    lead = x_count - o_count
+
+    outcomes = np.where(lead == 0, TURN_X, TURN_O).astype(np.int8)
+    outcomes[x_count + o_count == cells] = TIE
+    outcomes[x_won] = WINNER_X
+    outcomes[o_won] = WINNER_O
+    illegal = (
+        (~(xs | os | (boards == 0))).any(axis=1)
+        | (lead < 0)
+        | (lead > 1)
+        | (x_won & o_won)
+        | (x_won & (lead != 1))
+        | (o_won & (lead != 0))
+    )
+    outcomes[illegal] = ILLEGAL
+    return outcomes
@@ -0,0 +1,140 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+log = logging.getLogger("api")
+
+# Events waiting for a slow listener before newer ones are dropped, the client resyncs on reconnect.
+EVENTS_QUEUE_SIZE = 64
+
+
+class GameEventHub:
+    """
+    In-process fan out of game events to the listeners of each game.
+
+    Listeners live on an event loop while publishers are usually sync views running in a thread,
+    so events are handed over with call_soon_threadsafe. Only listeners in the same worker process
+    hear an event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}
+
+    def subscribe(self, game_id: str) -> asyncio.Queue:
+        """
+        Start listening to a game, must be called from the listener's event loop.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str.
+        :return: Queue the game's events will be put on, as the version of the game they bring
+            it to, None when they do not change it, and the formatted event.
+        :rtype: asyncio.Queue.
+        """
+        queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        listener = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._listeners.setdefault(game_id, set()).add(listener)
+        return queue
+
+    def unsubscribe(self, game_id: str, queue: asyncio.Queue):
+        """
+        Stop listening to a game.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str.
+        :param queue: Queue handed out by subscribe.
+        :type queue: asyncio.Queue.
+        """
+        with self._lock:
+            listeners = self._listeners.get(game_id, set())
+            for listener in [
+                listener for listener in listeners if listener[1] is queue
+            ]:
+                listeners.discard(listener)
+            if not listeners:
+                self._listeners.pop(game_id, None)
+
+    def listeners(self, game_id: str) -> int:
+        """
+        Count the listeners of a game.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str.
+        :return: Number of listeners.
+        :rtype: int.
+        """
+        with self._lock:
+            return len(self._listeners.get(game_id, ()))
+
+    def publish(self, game_id: str, event: str, data: dict):
+        """
+        Send an event to everyone listening to a game, safe to call from any thread.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str.
+        :param event: Event name such as move or seat.
+        :type event: str.
+        :param data: Event payload.
+        :type data: dict.
+        """
+        with self._lock:
+            listeners = list(self._listeners.get(game_id, ()))
+        if not listeners:
+            return
+        message = (data.get("version"), format_event(event, data))
+        for loop, queue in listeners:
+            try:
+                loop.call_soon_threadsafe(_put, queue, message)
+            except RuntimeError:
+                # the listener's loop has already closed, it will unsubscribe on its way out
+                pass
+
+
+def _put(queue: asyncio.Queue, message: tuple):
+    """
+    Put a message on a listener's queue, dropping it if the listener has fallen behind.
+
+    :param queue: Listener queue.
+    :type queue: asyncio.Queue.
+    :param message: Version of the game after the event and the formatted event.
+    :type message: tuple.
+    """
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        log.debug("Dropped a game event for a slow listener.")
+
+
+def format_event(event: str, data: dict) -> str:
+    """
+    Format an event for a text/event-stream response.
+
+    :param event: Event name.
+    :type event: str.
+    :param data: Event payload.
+    :type data: dict.
+    :return: Server-sent event.
+    :rtype: str.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+hub = GameEventHub()
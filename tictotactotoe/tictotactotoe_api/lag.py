@@ -0,0 +1,97 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import logging
+import threading
+from weakref import WeakKeyDictionary
+
+log = logging.getLogger("api")
+
+# Seconds between probes of the event loop.
+LOOP_LAG_INTERVAL = 0.5
+# Lag in seconds past which a blocked event loop is logged.
+LOOP_LAG_WARNING = 0.1
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a task that asked to sleep for a fixed interval.
+
+    Anything running on the loop without awaiting, a sync database call or a slow computation,
+    shows up as lag, so a loop that stays free reads close to zero. One probe runs per event loop
+    and it is started by the first async request served on that loop.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._probes = WeakKeyDictionary()
+        self.samples = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+
+    def start(self):
+        """
+        Start probing the running event loop, does nothing if it is already being probed.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop in self._probes:
+                return
+            self._probes[loop] = loop.create_task(self._probe())
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - start - self.interval)
+
+    def record(self, lag: float):
+        """
+        Add a lag sample.
+
+        :param lag: Seconds the loop woke up late.
+        :type lag: float.
+        """
+        lag = max(lag, 0.0)
+        if lag > LOOP_LAG_WARNING:
+            log.warning("Event loop lagged %.3f seconds!", lag)
+        with self._lock:
+            self.samples += 1
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.total += lag
+
+    def stats(self) -> dict:
+        """
+        Lag of the event loops in this worker, in seconds.
+
+        :return: samples, last, max and mean lag.
+        :rtype: dict.
+        """
+        with self._lock:
+            return {
+                "samples": self.samples,
+                "last": self.last,
+                "max": self.max,
+                "mean": self.total / self.samples if self.samples else 0.0,
+            }
+
+
+loop_lag = LoopLagMonitor()
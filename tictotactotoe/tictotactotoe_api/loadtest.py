@@ -0,0 +1,452 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.cookies import SimpleCookie
+from uuid import uuid4
+import django
+from django.conf import settings
+from .engine import SIZE, Board
+
+# Requests the load test makes, in the order a game makes them.
+ENDPOINTS = ("register", "login", "games_post", "game_put", "moves_post")
+# Passwords are hashed with a cheap hasher unless asked otherwise, so signing up players does not
+# drown out the games being measured.
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+LOCKED = "is locked"
+
+
+class AsgiClient:
+    """
+    Talks to an ASGI application in the same process, keeping cookies like a browser would.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.cookies = {}
+
+    async def request(self, method: str, path: str, data: dict = None) -> tuple:
+        """
+        Send one request straight to the application.
+
+        :param method: HTTP method.
+        :type method: str.
+        :param path: Path of the request.
+        :type path: str.
+        :param data: JSON body.
+        :type data: dict or None.
+        :return: status code and decoded JSON body, None when the body is not JSON.
+        :rtype: tuple.
+        """
+        body = json.dumps(data).encode() if data is not None else b""
+        headers = [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if self.cookies:
+            cookie = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+            headers.append((b"cookie", cookie.encode()))
+        if "csrftoken" in self.cookies and method not in ("GET", "HEAD", "OPTIONS"):
+            headers.append((b"x-csrftoken", self.cookies["csrftoken"].encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        finished = asyncio.Event()
+        sent = False
+        response = {"status": None, "headers": [], "body": []}
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # the client only goes away once the whole response is in
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        await self.application(scope, receive, send)
+        finished.set()
+        self._keep_cookies(response["headers"])
+        try:
+            content = json.loads(b"".join(response["body"]) or b"null")
+        except ValueError:
+            content = None
+        return response["status"], content
+
+    def _keep_cookies(self, headers: list):
+        for name, value in headers:
+            if name.lower() != b"set-cookie":
+                continue
+            cookie = SimpleCookie()
+            cookie.load(value.decode("latin-1"))
+            for key, morsel in cookie.items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[key] = morsel.value
+                else:
+                    self.cookies.pop(key, None)
+
+
+class LoadStats(logging.Handler):
+    """
+    Latency of every request by endpoint, plus the database lock errors the app logged meanwhile.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors = {endpoint: 0 for endpoint in ENDPOINTS}
+        self.locked = 0
+        self.games = 0
+        self.abandoned = 0
+        self.seconds = 0.0
+
+    def emit(self, record):
+        error = record.exc_info[1] if record.exc_info else None
+        if LOCKED in record.getMessage() or (
+            error is not None and LOCKED in str(error)
+        ):
+            self.locked += 1
+
+    def add(self, endpoint: str, seconds: float, ok: bool):
+        """
+        Count one request.
+
+        :param endpoint: One of ENDPOINTS.
+        :type endpoint: str.
+        :param seconds: How long the request took.
+        :type seconds: float.
+        :param ok: Whether the request succeeded.
+        :type ok: bool.
+        """
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def merge(self, other: "LoadStats"):
+        """
+        Add up the counts of another worker.
+
+        :param other: Stats of the other worker.
+        :type other: LoadStats.
+        """
+        for endpoint in ENDPOINTS:
+            self.latencies[endpoint].extend(other.latencies[endpoint])
+            self.errors[endpoint] += other.errors[endpoint]
+        self.locked += other.locked
+        self.games += other.games
+        self.abandoned += other.abandoned
+        # the workers play side by side, so the slowest one sets the pace
+        self.seconds = max(self.seconds, other.seconds)
+
+    def __getstate__(self):
+        # only the counts cross the process boundary, the handler lock stays behind
+        return {
+            key: getattr(self, key)
+            for key in (
+                "latencies",
+                "errors",
+                "locked",
+                "games",
+                "abandoned",
+                "seconds",
+            )
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+
+async def _call(
+    client: AsgiClient, stats: LoadStats, endpoint: str, method, path, data=None
+):
+    started = time.perf_counter()
+    status_code, content = await client.request(method, path, data)
+    ok = status_code is not None and status_code < 400
+    stats.add(endpoint, time.perf_counter() - started, ok)
+    return ok, content
+
+
+async def _player(application, stats: LoadStats):
+    """
+    Sign up a new player and log them in.
+    """
+    client = AsgiClient(application)
+    name = uuid4().hex[:20]
+    password = uuid4().hex + "Aa1!"
+    await _call(
+        client,
+        stats,
+        "register",
+        "POST",
+        "/api/v1/register",
+        {
+            "username": name,
+            "password": password,
+            "password2": password,
+            "email": f"{name}@load.test",
+            "first_name": "load",
+            "last_name": "test",
+        },
+    )
+    await _call(
+        client,
+        stats,
+        "login",
+        "POST",
+        "/api/v1/login",
+        {"username": name, "password": password},
+    )
+    return client
+
+
+async def _game(clients: dict, stats: LoadStats, size: int, rng: random.Random):
+    """
+    Play one game from creating it to its last move, picking random empty cells.
+    """
+    ok, content = await _call(
+        clients["x"],
+        stats,
+        "games_post",
+        "POST",
+        "/api/v1/games",
+        {"name": "load", "size": size, "win_length": size},
+    )
+    if not ok:
+        stats.abandoned += 1
+        return
+    uri = f"/api/v1/games/{content['data']['id']}"
+    for player in ["x", "o"]:
+        ok, _ = await _call(
+            clients[player], stats, "game_put", "PUT", uri, {"player": player}
+        )
+        if not ok:
+            stats.abandoned += 1
+            return
+
+    board = Board(size, size)
+    cells = list(range(size * size))
+    rng.shuffle(cells)
+    player = "x"
+    for cell in cells:
+        x, y = cell % size, cell // size
+        ok, _ = await _call(
+            clients[player],
+            stats,
+            "moves_post",
+            "POST",
+            f"{uri}/moves",
+            {"x": x, "y": y},
+        )
+        if not ok:
+            stats.abandoned += 1
+            return
+        if board.play(x, y, player) is not None:
+            break
+        player = "o" if player == "x" else "x"
+    stats.games += 1
+
+
+async def play(
+    games: int, concurrency: int, size: int = SIZE, seed: int = None
+) -> LoadStats:
+    """
+    Play games against the ASGI app on the running loop, concurrency of them at any one time.
+
+    Every concurrent slot signs up its own pair of players first, then the slots play the games
+    one after another until there are none left. Only the games are timed.
+
+    :param games: Number of games to play.
+    :type games: int.
+    :param concurrency: Games being played at the same time.
+    :type concurrency: int.
+    :param size: Number of rows and columns on the boards, the win length is the same.
+    :type size: int.
+    :param seed: Seed for the cells played.
+    :type seed: int or None.
+    :return: Stats of the run.
+    :rtype: LoadStats.
+    """
+    from tictotactotoe.asgi import application  # pylint: disable=C0415
+
+    stats = LoadStats()
+    loggers = [logging.getLogger("api"), logging.getLogger("django")]
+    for logger in loggers:
+        logger.addHandler(stats)
+    remaining = games
+
+    async def slot(clients: dict, rng: random.Random):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await _game(clients, stats, size, rng)
+
+    try:
+        slots = min(concurrency, games)
+        signing_up = asyncio.Semaphore(concurrency)
+
+        async def player():
+            async with signing_up:
+                return await _player(application, stats)
+
+        players = await asyncio.gather(*(player() for _ in range(slots * 2)))
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                slot(
+                    {"x": players[number * 2], "o": players[number * 2 + 1]},
+                    random.Random(None if seed is None else seed * 100003 + number),
+                )
+                for number in range(slots)
+            )
+        )
+        stats.seconds = time.perf_counter() - started
+    finally:
+        for logger in loggers:
+            logger.removeHandler(stats)
+    return stats
+
+
+def _worker(
+    games: int, concurrency: int, size: int, seed, database: str, hashers: list
+):
+    """
+    Play a worker's share of the games in a process of its own.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tictotactotoe.settings")
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = database
+    settings.PASSWORD_HASHERS = hashers
+    return asyncio.run(play(games, concurrency, size, seed))
+
+
+def run(
+    games: int,
+    concurrency: int,
+    workers: int = 1,
+    size: int = SIZE,
+    seed: int = None,
+) -> dict:
+    """
+    Play games against the ASGI app and report throughput and latency by endpoint.
+
+    With more than one worker every worker is a process of its own playing its share of the
+    games with concurrency games at a time, all of them sharing the current database.
+
+    :param games: Number of games to play.
+    :type games: int.
+    :param concurrency: Games being played at the same time by each worker.
+    :type concurrency: int.
+    :param workers: Processes to play in.
+    :type workers: int.
+    :param size: Number of rows and columns on the boards, the win length is the same.
+    :type size: int.
+    :param seed: Seed for the cells played.
+    :type seed: int or None.
+    :return: Throughput of the games, p50, p95 and p99 in milliseconds by endpoint and error
+        counts.
+    :rtype: dict.
+    """
+    if workers > 1:
+        from django.db import connections  # pylint: disable=C0415
+
+        connections.close_all()
+        shares = [
+            games // workers + (worker < games % workers) for worker in range(workers)
+        ]
+        database = str(settings.DATABASES["default"]["NAME"])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _worker,
+                    share,
+                    concurrency,
+                    size,
+                    None if seed is None else seed * 1009 + worker,
+                    database,
+                    list(settings.PASSWORD_HASHERS),
+                )
+                for worker, share in enumerate(shares)
+                if share
+            ]
+            stats = LoadStats()
+            for future in futures:
+                stats.merge(future.result())
+    else:
+        stats = asyncio.run(play(games, concurrency, size, seed))
+    seconds = stats.seconds or float("inf")
+
+    endpoints = {}
+    for endpoint, latencies in stats.latencies.items():
+        if not latencies:
+            continue
+        latencies = sorted(latencies)
+        percentiles = (
+            statistics.quantiles(latencies, n=100, method="inclusive")
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        endpoints[endpoint] = {
+            "requests": len(latencies),
+            "errors": stats.errors[endpoint],
+            "p50": percentiles[49] * 1000,
+            "p95": percentiles[94] * 1000,
+            "p99": percentiles[98] * 1000,
+        }
+    requests = sum(
+        len(latencies)
+        for endpoint, latencies in stats.latencies.items()
+        if endpoint not in ("register", "login")
+    )
+    return {
+        "workers": workers,
+        "concurrency": concurrency,
+        "games": stats.games,
+        "abandoned": stats.abandoned,
+        "locked": stats.locked,
+        "seconds": seconds,
+        "games_per_second": stats.games / seconds,
+        "requests_per_second": requests / seconds,
+        "endpoints": endpoints,
+    }
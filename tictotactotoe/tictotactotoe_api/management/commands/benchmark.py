@@ -0,0 +1,99 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from ...benchmarks import BENCHMARKS, compare, measure
+
+
+class Command(BaseCommand):
+    """
+    Time the hot paths of the engine, serializers and views and compare them with a baseline.
+    """
+
+    help = "Run the micro benchmarks and compare them with the stored baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names", nargs="*", help="Benchmarks to run, all of them by default."
+        )
+        parser.add_argument(
+            "--seconds", type=float, default=1.0, help="Time spent per benchmark."
+        )
+        parser.add_argument(
+            "--baseline",
+            default=str(Path(settings.BASE_DIR) / "benchmarks.json"),
+            help="File holding the baseline results.",
+        )
+        parser.add_argument(
+            "--save", action="store_true", help="Store the results as the baseline."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.1,
+            help="Change in speed put down to noise.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmarks {', '.join(unknown)}!")
+        baseline_path = Path(options["baseline"])
+        baseline = {}
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+        results = {}
+        database = any(BENCHMARKS[name][1] for name in names)
+        if database:
+            # database benchmarks run against a fresh test database, never the real one
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+        try:
+            for name in names:
+                results[name] = measure(name, options["seconds"])
+        finally:
+            if database:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        changes = compare(results, baseline, options["tolerance"])
+        self.stdout.write(
+            f"{'Benchmark':<24} {'ops/s':>12} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} "
+            f"{'alloc B':>10}  baseline"
+        )
+        for name, result in results.items():
+            change = changes.get(name)
+            verdict = f"{change['speedup']:.2f}x {change['verdict']}" if change else "-"
+            self.stdout.write(
+                f"{name:<24} {result['ops']:>12.1f} {result['p50']:>10.1f} {result['p95']:>10.1f} "
+                f"{result['p99']:>10.1f} {result['allocated']:>10}  {verdict}"
+            )
+
+        if options["save"]:
+            baseline.update(results)
+            baseline_path.write_text(
+                json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            self.stdout.write(f"Stored the baseline in {baseline_path}.")
@@ -0,0 +1,137 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from ...engine import MAX_SIZE, MIN_SIZE, SIZE
+from ...loadtest import FAST_HASHERS, run
+
+
+def _counts(value: str) -> list:
+    try:
+        counts = [int(count) for count in value.split(",")]
+    except ValueError as error:
+        raise CommandError(
+            f"{value} is not a comma separated list of counts!"
+        ) from error
+    if any(count < 1 for count in counts):
+        raise CommandError("Counts need to be at least 1!")
+    return counts
+
+
+class Command(BaseCommand):
+    """
+    Play games against the ASGI application in process and report how well it keeps up.
+    """
+
+    help = (
+        "Play games against the ASGI app in process, sweeping workers and concurrency, and report "
+        "throughput, latency by endpoint and database lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=200, help="Games per run.")
+        parser.add_argument(
+            "--concurrency",
+            default="10",
+            help="Games at a time per worker, comma separated.",
+        )
+        parser.add_argument(
+            "--workers", default="1", help="Worker processes, comma separated."
+        )
+        parser.add_argument("--size", type=int, default=SIZE)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--real-passwords",
+            action="store_true",
+            help="Hash passwords with the configured hashers instead of a cheap one.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the reports as JSON."
+        )
+
+    def handle(self, *args, **options):
+        if not MIN_SIZE <= options["size"] <= MAX_SIZE:
+            raise CommandError(f"Boards are {MIN_SIZE} to {MAX_SIZE} wide!")
+        if options["games"] < 1:
+            raise CommandError("Play at least one game!")
+        workers = _counts(options["workers"])
+        concurrency = _counts(options["concurrency"])
+
+        hashers = (
+            {} if options["real_passwords"] else {"PASSWORD_HASHERS": FAST_HASHERS}
+        )
+        reports = []
+        with tempfile.TemporaryDirectory() as directory, override_settings(**hashers):
+            # a database file of its own, shared by the workers, so locking behaves as deployed
+            connection.settings_dict["TEST"]["NAME"] = str(
+                Path(directory) / "loadtest.sqlite3"
+            )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                for worker_count in workers:
+                    for slots in concurrency:
+                        reports.append(
+                            run(
+                                options["games"],
+                                slots,
+                                worker_count,
+                                options["size"],
+                                options["seed"],
+                            )
+                        )
+                        if not options["json"]:
+                            self._write(reports[-1])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports))
+        elif len(reports) > 1:
+            self.stdout.write(
+                "Workers Concurrency    games/s   requests/s  moves p99 ms  locked"
+            )
+            for report in reports:
+                moves = report["endpoints"].get("moves_post", {})
+                self.stdout.write(
+                    f"{report['workers']:>7} {report['concurrency']:>11} "
+                    f"{report['games_per_second']:>10.1f} {report['requests_per_second']:>12.1f} "
+                    f"{moves.get('p99', 0):>13.1f} {report['locked']:>7}"
+                )
+
+    def _write(self, report: dict):
+        self.stdout.write(
+            f"{report['workers']} workers x {report['concurrency']} games at a time: "
+            f"{report['games']} games in {report['seconds']:.2f}s, "
+            f"{report['games_per_second']:.1f} games/s, "
+            f"{report['requests_per_second']:.1f} requests/s, "
+            f"{report['abandoned']} abandoned, {report['locked']} database locked errors."
+        )
+        self.stdout.write(
+            f"  {'Endpoint':<12} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9}"
+        )
+        for endpoint, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"  {endpoint:<12} {stats['requests']:>9} {stats['errors']:>7} "
+                f"{stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}"
+            )
@@ -0,0 +1,91 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from ...engine import MAX_SIZE, MIN_SIZE, SIZE
+from ...simulator import OUTCOMES, POLICIES, RANDOM, simulate
+from ...solver import MAX_LEVEL
+
+
+class Command(BaseCommand):
+    """
+    Play games between two policies in memory and report how they went.
+    """
+
+    help = "Play many games in memory and report outcomes, first move advantage and game lengths."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=100000)
+        parser.add_argument("--size", type=int, default=SIZE)
+        parser.add_argument("--win-length", type=int, default=None)
+        parser.add_argument("--x", choices=POLICIES, default=RANDOM)
+        parser.add_argument("--o", choices=POLICIES, default=RANDOM)
+        parser.add_argument("--level", type=int, default=MAX_LEVEL)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        size = options["size"]
+        win_length = options["win_length"] or size
+        if not MIN_SIZE <= win_length <= size <= MAX_SIZE:
+            raise CommandError(
+                f"Boards are {MIN_SIZE} to {MAX_SIZE} wide and fit a win!"
+            )
+        try:
+            report = simulate(
+                options["games"],
+                size,
+                win_length,
+                options["x"],
+                options["o"],
+                options["level"],
+                options["workers"],
+                options["seed"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        games = report["games"]
+        self.stdout.write(
+            f"{games} games of {size}x{size}, {win_length} to win, x {report['x']} against "
+            f"o {report['o']} in {report['seconds']:.2f}s ({games / report['seconds']:.0f}/s)."
+        )
+        for outcome in OUTCOMES:
+            count = report["outcomes"][outcome]
+            self.stdout.write(f"  {outcome:<9} {count:>10} {count / games:7.2%}")
+        self.stdout.write(f"First move advantage {report['advantage']:+.4f}")
+        self.stdout.write(
+            "Opening      " + " ".join(f"{outcome:>9}" for outcome in OUTCOMES)
+        )
+        for opening in report["openings"]:
+            played = sum(opening[outcome] for outcome in OUTCOMES)
+            self.stdout.write(
+                f"  ({opening['x']:>2}, {opening['y']:>2}) "
+                + " ".join(f"{opening[outcome] / played:9.2%}" for outcome in OUTCOMES)
+            )
+        self.stdout.write("Moves    Games")
+        for plies, count in report["lengths"].items():
+            bar = "#" * round(count / games * 50)
+            self.stdout.write(f"  {plies:>4} {count / games:7.2%} {bar}")
@@ -0,0 +1,34 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...solver import save
+
+
+class Command(BaseCommand):
+    """
+    Solve every 3x3 position for the computer opponent and write the table the workers map.
+    """
+
+    help = "Solve every 3x3 position and write the computer opponent's table to SOLVER_TABLE."
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        path = Path(settings.SOLVER_TABLE)
+        save(path)
+        self.stdout.write(f"Wrote the solver table to {path}.")
@@ -0,0 +1,369 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from .cache import game_cache
+from .lag import loop_lag
+
+# Bucket upper bounds, every histogram gets one more bucket for anything above the last bound.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Methods get their own label, anything else is counted as other so clients cannot add labels.
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+# Why game_post turned a move away, see MOVE_ACCEPTED for the moves it took.
+MOVE_ACCEPTED = "accepted"
+MOVE_OUTCOMES = (
+    MOVE_ACCEPTED,
+    "invalid",
+    "not_found",
+    "not_ready",
+    "not_player",
+    "game_over",
+    "off_board",
+    "not_your_turn",
+    "taken",
+    "changed",
+)
+GAME_OUTCOMES = ("winner_x", "winner_o", "tie")
+PREFIX = "tictotactotoe"
+
+
+class Histogram:
+    """
+    Counts of observations by bucket, allocated once so observing does not allocate.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        """
+        Count a value in the first bucket whose bound it does not exceed.
+
+        :param value: Observed value.
+        :type value: int or float.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    """
+    Everything recorded for one URL pattern and method.
+    """
+
+    __slots__ = ("latency", "size", "queries", "query_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.query_seconds = 0.0
+        self.statuses = {}
+
+
+class QueryCounter:
+    """
+    Queries run while serving one request, wherever the ORM happened to run them.
+    """
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# The counter of the request being served, sync_to_async copies it into the thread running the ORM.
+_queries = ContextVar("queries", default=None)
+
+
+def _count_queries(execute, sql, params, many, context):
+    counter = _queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.count += 1
+        counter.seconds += time.perf_counter() - started
+
+
+def _watch_queries(sender, connection, **kwargs):
+    """
+    Count the queries of every database connection, whichever thread opened it.
+    """
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+connection_created.connect(_watch_queries)
+
+
+class Metrics:
+    """
+    Request and game counters of this worker, written out in the Prometheus text format.
+
+    Routes get their histograms the first time they are seen, after that recording a request
+    only bumps preallocated counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = {}
+        self.moves = dict.fromkeys(MOVE_OUTCOMES, 0)
+        self.games_created = 0
+        self.games_finished = dict.fromkeys(GAME_OUTCOMES, 0)
+
+    def _route(self, route: str, method: str) -> RouteMetrics:
+        methods = self.routes.get(route)
+        if methods is None:
+            methods = self.routes.setdefault(route, {})
+        metrics = methods.get(method)
+        if metrics is None:
+            metrics = methods.setdefault(method, RouteMetrics())
+        return metrics
+
+    def request(self, request, response, seconds: float, counter: QueryCounter):
+        """
+        Record a request once its response is ready.
+
+        :param request: Django request object.
+        :param response: Django response object.
+        :param seconds: Time taken to build the response.
+        :type seconds: float.
+        :param counter: Queries run for the request.
+        :type counter: QueryCounter.
+        """
+        match = request.resolver_match
+        route = match.route if match is not None else "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        size = None if response.streaming else len(response.content)
+        with self._lock:
+            metrics = self._route(route, method)
+            metrics.latency.observe(seconds)
+            if size is not None:
+                metrics.size.observe(size)
+            metrics.queries.observe(counter.count)
+            metrics.query_seconds += counter.seconds
+            metrics.statuses[response.status_code] = (
+                metrics.statuses.get(response.status_code, 0) + 1
+            )
+
+    def move(self, outcome: str):
+        """
+        Count a move game_post accepted or turned away.
+
+        :param outcome: MOVE_ACCEPTED or the reason the move was turned away, see MOVE_OUTCOMES.
+        :type outcome: str.
+        """
+        with self._lock:
+            self.moves[outcome] += 1
+
+    def game_created(self, count: int = 1):
+        """
+        Count new games.
+
+        :param count: Number of games created.
+        :type count: int.
+        """
+        with self._lock:
+            self.games_created += count
+
+    def game_finished(self, state: str):
+        """
+        Count a game that has just ended.
+
+        :param state: Final state of the game, see GAME_OUTCOMES.
+        :type state: str.
+        """
+        with self._lock:
+            self.games_finished[state] += 1
+
+    def render(self) -> str:
+        """
+        Write out every metric in the Prometheus text exposition format.
+
+        :return: Metrics text.
+        :rtype: str.
+        """
+        lines = []
+        with self._lock:
+            routes = [
+                (route, method, metrics)
+                for route, methods in sorted(self.routes.items())
+                for method, metrics in sorted(methods.items())
+            ]
+            _family(lines, "http_requests_total", "counter", "Requests by status code.")
+            for route, method, metrics in routes:
+                for code, count in sorted(metrics.statuses.items()):
+                    labels = _labels(route=route, method=method, status=str(code))
+                    lines.append(f"{PREFIX}_http_requests_total{{{labels}}} {count}")
+            for name, attribute, help_text in (
+                (
+                    "http_request_duration_seconds",
+                    "latency",
+                    "Time to build the response.",
+                ),
+                ("http_response_size_bytes", "size", "Size of the response body."),
+                (
+                    "http_request_queries",
+                    "queries",
+                    "Database queries run per request.",
+                ),
+            ):
+                _family(lines, name, "histogram", help_text)
+                for route, method, metrics in routes:
+                    _histogram(lines, name, getattr(metrics, attribute), route, method)
+            _family(
+                lines,
+                "http_request_query_seconds_total",
+                "counter",
+                "Time spent in queries.",
+            )
+            for route, method, metrics in routes:
+                labels = _labels(route=route, method=method)
+                lines.append(
+                    f"{PREFIX}_http_request_query_seconds_total{{{labels}}} "
+                    f"{metrics.query_seconds!r}"
+                )
+
+            _family(
+                lines,
+                "moves_total",
+                "counter",
+                "Moves accepted or turned away, by reason.",
+            )
+            for outcome, count in self.moves.items():
+                lines.append(
+                    f"{PREFIX}_moves_total{{{_labels(outcome=outcome)}}} {count}"
+                )
+            _family(lines, "games_created_total", "counter", "Games created.")
+            lines.append(f"{PREFIX}_games_created_total {self.games_created}")
+            _family(
+                lines, "games_finished_total", "counter", "Games finished, by outcome."
+            )
+            for outcome, count in self.games_finished.items():
+                lines.append(
+                    f"{PREFIX}_games_finished_total{{{_labels(outcome=outcome)}}} {count}"
+                )
+
+        cache = game_cache.stats()
+        _family(lines, "game_cache_requests_total", "counter", "Game cache lookups.")
+        lines.append(
+            f'{PREFIX}_game_cache_requests_total{{result="hit"}} {cache["hits"]}'
+        )
+        lines.append(
+            f'{PREFIX}_game_cache_requests_total{{result="miss"}} {cache["misses"]}'
+        )
+        lag = loop_lag.stats()
+        for key, help_text in (
+            ("last", "Lag of the latest event loop probe."),
+            ("max", "Largest event loop lag seen."),
+            ("mean", "Mean event loop lag."),
+        ):
+            _family(lines, f"loop_lag_{key}_seconds", "gauge", help_text)
+            lines.append(f"{PREFIX}_loop_lag_{key}_seconds {lag[key]!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _family(lines: list, name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+    lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+
+def _labels(**labels) -> str:
+    return ",".join(
+        f'{key}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels.items()
+    )
+
+
+def _histogram(lines: list, name: str, histogram: Histogram, route: str, method: str):
+    labels = _labels(route=route, method=method)
+    total = 0
+    for bound, count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+        total += count
+        lines.append(f'{PREFIX}_{name}_bucket{{{labels},le="{bound}"}} {total}')
+    lines.append(f"{PREFIX}_{name}_sum{{{labels}}} {histogram.sum!r}")
+    lines.append(f"{PREFIX}_{name}_count{{{labels}}} {total}")
+
+
+class MetricsMiddleware:
+    """
+    Time every request and count its queries and response size, for sync and async requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = _queries.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        metrics.request(request, response, time.perf_counter() - started, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _queries.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        metrics.request(request, response, time.perf_counter() - started, counter)
+        return response
+
+
+metrics = Metrics()
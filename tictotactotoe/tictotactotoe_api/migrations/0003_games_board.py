@@ -0,0 +1,105 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_board(apps, schema_editor):
+    """
+    Encode the board of every existing game from its moves, a batch of games at a time.
+
+    :param apps: Historical app registry.
+    :param schema_editor: Database schema editor.
+    """
+
+    games_model = apps.get_model("tictotactotoe_api", "Games")
+    moves_model = apps.get_model("tictotactotoe_api", "Moves")
+    alias = schema_editor.connection.alias
+
+    games = games_model.objects.using(alias).only("id", "size").order_by("id")
+    batch = []
+    for game in games.iterator(chunk_size=BATCH_SIZE):
+        batch.append(game)
+        if len(batch) == BATCH_SIZE:
+            _backfill_batch(games_model, moves_model, alias, batch)
+            batch = []
+    if batch:
+        _backfill_batch(games_model, moves_model, alias, batch)
+
+
+def _backfill_batch(games_model, moves_model, alias, games: list):
+    """
+    Encode the boards for a single batch of games with one query for their moves.
+
+    :param games_model: Historical Games model.
+    :param moves_model: Historical Moves model.
+    :param alias: Database alias being migrated.
+    :param games: Batch of games to encode.
+    :type games: list.
+    """
+
+    cells = {game.id: ["-"] * (game.size * game.size) for game in games}
+    sizes = {game.id: game.size for game in games}
+    moves = (
+        moves_model.objects.using(alias)
+        .filter(game_id__in=cells.keys())
+        .values_list("game_id", "x", "y", "player")
+    )
+    for game_id, x, y, player in moves:
+        cells[game_id][y * sizes[game_id] + x] = player
+    for game in games:
+        game.board = "".join(cells[game.id])
+        game.moves_count = game.board.count("x") + game.board.count("o")
+    games_model.objects.using(alias).bulk_update(
+        games,
+        ["board", "moves_count"],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Compact board and move counter on games so reads skip the moves table.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0002_games_size_win_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="games",
+            name="board",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=361,
+            ),
+        ),
+        migrations.AddField(
+            model_name="games",
+            name="moves_count",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+            ),
+        ),
+        migrations.RunPython(
+            backfill_board,
+            migrations.RunPython.noop,
+        ),
+    ]
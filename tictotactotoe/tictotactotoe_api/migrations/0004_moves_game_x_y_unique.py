@@ -0,0 +1,37 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    One move per cell of a game, enforced by the database.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0003_games_board"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="moves",
+            constraint=models.UniqueConstraint(
+                fields=("game", "x", "y"),
+                name="moves_game_x_y_unique",
+            ),
+        ),
+    ]
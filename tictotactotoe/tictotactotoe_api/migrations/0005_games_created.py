@@ -0,0 +1,81 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Creation time on games and the indexes behind the keyset games listing.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0004_moves_game_x_y_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="games",
+            name="created",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="games",
+            index=models.Index(
+                fields=["created", "id"],
+                name="games_created_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="games",
+            index=models.Index(
+                fields=["state", "created", "id"],
+                name="games_state_created_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="games",
+            index=models.Index(
+                fields=["player_x", "created", "id"],
+                name="games_player_x_created_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="games",
+            index=models.Index(
+                fields=["player_o", "created", "id"],
+                name="games_player_o_created_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="games",
+            index=models.Index(
+                condition=models.Q(
+                    ("player_x__isnull", True),
+                    ("player_o__isnull", True),
+                    _connector="OR",
+                ),
+                fields=["created", "id"],
+                name="games_open_created_id",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Version counter on games, bumped on every accepted move or seat change.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0005_games_created"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="games",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=0,
+            ),
+        ),
+    ]
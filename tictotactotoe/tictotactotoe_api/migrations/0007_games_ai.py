@@ -0,0 +1,52 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Seat for the computer opponent and how well it plays.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0006_games_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="games",
+            name="ai",
+            field=models.CharField(
+                blank=True,
+                choices=[("x", "x"), ("o", "o")],
+                default="",
+                max_length=1,
+            ),
+        ),
+        migrations.AddField(
+            model_name="games",
+            name="ai_level",
+            field=models.PositiveSmallIntegerField(
+                default=3,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(3),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,112 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import django.utils.timezone
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_ply(apps, schema_editor):
+    """
+    Number the moves of every existing game, a batch of games at a time.
+
+    The order the moves were played in was never stored, so x's moves get the odd plies and o's
+    the even ones, each player's in row by row order. That rebuilds the final board at the last
+    ply and a board with the right number of moves at every other one.
+
+    :param apps: Historical app registry.
+    :param schema_editor: Database schema editor.
+    """
+    games_model = apps.get_model("tictotactotoe_api", "Games")
+    moves_model = apps.get_model("tictotactotoe_api", "Moves")
+    alias = schema_editor.connection.alias
+    games = games_model.objects.using(alias).values_list("id", flat=True).order_by("id")
+    batch = []
+    for game_id in games.iterator(chunk_size=BATCH_SIZE):
+        batch.append(game_id)
+        if len(batch) == BATCH_SIZE:
+            _backfill_batch(moves_model, alias, batch)
+            batch = []
+    if batch:
+        _backfill_batch(moves_model, alias, batch)
+
+
+def _backfill_batch(moves_model, alias, games: list):
+    """
+    Number the moves for a single batch of games with one query for their moves.
+
+    :param moves_model: Historical Moves model.
+    :param alias: Database alias being migrated.
+    :param games: Batch of game ids to number.
+    :type games: list.
+    """
+    moves = (
+        moves_model.objects.using(alias)
+        .filter(game_id__in=games)
+        .only("id", "game_id", "player")
+        .order_by("game_id", "y", "x")
+    )
+    plies = {}
+    numbered = []
+    for move in moves:
+        first = 1 if move.player == "x" else 2
+        move.ply = plies.get((move.game_id, move.player), first)
+        plies[(move.game_id, move.player)] = move.ply + 2
+        numbered.append(move)
+    moves_model.objects.using(alias).bulk_update(
+        numbered, ["ply"], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Ply numbers and creation times on moves so games can be replayed in order.
+    """
+
+    dependencies = [
+        ("tictotactotoe_api", "0007_games_ai"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="moves",
+            name="ply",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="moves",
+            name="created",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+            ),
+        ),
+        migrations.RunPython(
+            backfill_ply,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="moves",
+            constraint=models.UniqueConstraint(
+                fields=("game", "ply"),
+                name="moves_game_ply_unique",
+            ),
+        ),
+    ]
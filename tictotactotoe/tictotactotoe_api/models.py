@@ -16,7 +16,11 @@ limitations under the License.
 
 from uuid import uuid4
 from django.contrib.auth.models import User
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
+from .engine import MAX_SIZE, MIN_SIZE, SIZE
+from .solver import MAX_LEVEL
 
 
 class BaseModel(models.Model):
@@ -39,6 +43,10 @@ class Games(BaseModel):
     Tic-Tac-Toe games.
     """
 
+    AI_CHOICES = (
+        ("x", "x"),
+        ("o", "o"),
+    )
     id = models.UUIDField(
         primary_key=True,
         default=uuid4,
@@ -53,6 +61,25 @@ class Games(BaseModel):
         blank=False,
         default="turn_x",
     )
+    size = models.PositiveSmallIntegerField(
+        default=SIZE,
+        validators=[MinValueValidator(MIN_SIZE), MaxValueValidator(MAX_SIZE)],
+    )
+    win_length = models.PositiveSmallIntegerField(
+        default=SIZE,
+        validators=[MinValueValidator(MIN_SIZE), MaxValueValidator(MAX_SIZE)],
+    )
+    board = models.CharField(
+        max_length=MAX_SIZE * MAX_SIZE,
+        blank=True,
+        default="",
+    )
+    moves_count = models.PositiveSmallIntegerField(
+        default=0,
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+    )
     player_o = models.ForeignKey(
         User,
         to_field="id",
@@ -67,6 +94,50 @@ class Games(BaseModel):
         on_delete=models.DO_NOTHING,
         null=True,
     )
+    ai = models.CharField(
+        max_length=1,
+        blank=True,
+        default="",
+        choices=AI_CHOICES,
+    )
+    ai_level = models.PositiveSmallIntegerField(
+        default=MAX_LEVEL,
+        validators=[MinValueValidator(1), MaxValueValidator(MAX_LEVEL)],
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+    )
+
+    class Meta:
+        """
+        Indexes match the keyset ordering of the games listing and its filters.
+        """
+
+        indexes = [
+            models.Index(
+                fields=["created", "id"],
+                name="games_created_id",
+            ),
+            models.Index(
+                fields=["state", "created", "id"],
+                name="games_state_created_id",
+            ),
+            models.Index(
+                fields=["player_x", "created", "id"],
+                name="games_player_x_created_id",
+            ),
+            models.Index(
+                fields=["player_o", "created", "id"],
+                name="games_player_o_created_id",
+            ),
+            models.Index(
+                fields=["created", "id"],
+                condition=models.Q(player_x__isnull=True)
+                | models.Q(player_o__isnull=True),
+                name="games_open_created_id",
+            ),
+        ]
 
 
 class Moves(BaseModel):
@@ -100,3 +171,25 @@ class Moves(BaseModel):
     y = models.IntegerField(
         blank=False,
     )
+    ply = models.PositiveSmallIntegerField()
+    created = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+    )
+
+    class Meta:
+        """
+        Only one move can ever land on a cell of a game and each ply of a game has one move, the
+        index behind the plies serves replays as a range scan.
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game", "x", "y"],
+                name="moves_game_x_y_unique",
+            ),
+            models.UniqueConstraint(
+                fields=["game", "ply"],
+                name="moves_game_ply_unique",
+            ),
+        ]
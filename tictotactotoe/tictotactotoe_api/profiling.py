@@ -0,0 +1,294 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+from django.utils import timezone
+
+log = logging.getLogger("api")
+
+# Header a staff user sends to have their request profiled and the one its profile id comes in.
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Header holding the id the proxy gave the request, profiles are stored under it when it is there.
+REQUEST_ID_HEADER = "HTTP_X_REQUEST_ID"
+# Profiles kept per worker, the oldest goes first, and functions kept per profile.
+PROFILE_KEEP = 100
+PROFILE_TOP = 30
+# Seconds between stack samples and the deepest stack kept, counting from the innermost frame.
+SAMPLER_INTERVAL = 0.01
+SAMPLER_DEPTH = 128
+
+
+class RequestProfile:
+    """
+    A request running under cProfile, stored with the profiler once it stops.
+    """
+
+    def __init__(self, profiler: "RequestProfiler", request):
+        self.profiler = profiler
+        self.request = request
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self, response=None):
+        """
+        Stop profiling, store the profile and tag the response with its id.
+
+        :param response: Response of the request, None when the request raised.
+        """
+        self.profile.disable()
+        seconds = time.perf_counter() - self.started
+        self.profiler.store(self, response, seconds)
+
+
+class RequestProfiler:
+    """
+    Runs requests under cProfile when a staff user asks for it and keeps their hottest functions.
+
+    It is off until enabled, then only requests sent with the X-Profile header by a staff user are
+    profiled. One request is profiled at a time per worker since cProfile watches a single thread;
+    on the event loop whatever else runs on the loop meanwhile is counted too, while the queries
+    run in worker threads are not, the stack sampler covers those.
+    """
+
+    def __init__(self, keep: int = PROFILE_KEEP, top: int = PROFILE_TOP):
+        self.enabled = False
+        self.keep = keep
+        self.top = top
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self.profiles = OrderedDict()
+
+    def start(self, request) -> RequestProfile:
+        """
+        Start profiling a request if it asked to be and may be.
+
+        :param request: Django request object with its user loaded.
+        :return: The running profile, None when the request is not profiled.
+        :rtype: RequestProfile or None.
+        """
+        if not self.enabled or PROFILE_HEADER not in request.META:
+            return None
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return None
+        if not self._busy.acquire(blocking=False):
+            log.info("Already profiling a request, %s is not profiled!", request.path)
+            return None
+        try:
+            return RequestProfile(self, request)
+        except Exception:
+            self._busy.release()
+            raise
+
+    def store(self, running: RequestProfile, response, seconds: float):
+        """
+        Keep the hottest functions of a profiled request, called by RequestProfile.stop.
+
+        :param running: Profile that just stopped.
+        :type running: RequestProfile.
+        :param response: Response of the request, None when the request raised.
+        :param seconds: Time the request ran for.
+        :type seconds: float.
+        """
+        self._busy.release()
+        request = running.request
+        profile_id = request.META.get(REQUEST_ID_HEADER, "")[:64] or uuid4().hex
+        stats = pstats.Stats(running.profile)
+        hottest = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        profile = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.path,
+            "user": request.user.username,
+            "status": getattr(response, "status_code", None),
+            "seconds": seconds,
+            "created": timezone.now(),
+            "rows": [
+                {
+                    "function": pstats.func_std_string(function),
+                    "calls": calls,
+                    "primitive_calls": primitive_calls,
+                    "tottime": tottime,
+                    "cumtime": cumtime,
+                }
+                for function, (primitive_calls, calls, tottime, cumtime, _) in hottest[
+                    : self.top
+                ]
+            ],
+        }
+        with self._lock:
+            self.profiles[profile_id] = profile
+            self.profiles.move_to_end(profile_id)
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+        if response is not None:
+            response[PROFILE_ID_HEADER] = profile_id
+
+    def get(self, profile_id: str) -> dict:
+        """
+        Look up a stored profile.
+
+        :param profile_id: Request id the profile was stored under.
+        :type profile_id: str.
+        :return: Profile or None when there is none with that id.
+        :rtype: dict or None.
+        """
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+    def stats(self) -> dict:
+        """
+        Whether requests can be profiled and the stored profiles, newest first, without their rows.
+
+        :return: enabled and profiles.
+        :rtype: dict.
+        """
+        with self._lock:
+            profiles = [
+                {key: value for key, value in profile.items() if key != "rows"}
+                for profile in reversed(self.profiles.values())
+            ]
+        return {"enabled": self.enabled, "profiles": profiles}
+
+
+class StackSampler:
+    """
+    Samples the stack of every thread of the worker from a background thread.
+
+    Stacks are counted in the folded format flame graph tools read, one line per distinct stack
+    with its frames from the thread down to the innermost one separated by semicolons. The samples
+    are wall clock, threads waiting on a lock or a socket are counted like busy ones. Nothing runs
+    until the sampler is started.
+    """
+
+    def __init__(self, interval: float = SAMPLER_INTERVAL, depth: int = SAMPLER_DEPTH):
+        self.interval = interval
+        self.depth = depth
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.stacks = {}
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the sampler thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = None):
+        """
+        Start sampling from scratch, does nothing if the sampler is already running.
+
+        :param interval: Seconds between samples, the current interval when None.
+        :type interval: float or None.
+        """
+        with self._lock:
+            if self.running:
+                return
+            if interval is not None:
+                self.interval = interval
+            self.samples = 0
+            self.stacks = {}
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="stack-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling, the stacks counted so far are kept.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            self.sample(skip=own)
+
+    def sample(self, skip: int = None):
+        """
+        Count the current stack of every thread once.
+
+        :param skip: Ident of a thread to leave out, the sampler's own.
+        :type skip: int or None.
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()  # pylint: disable=W0212
+        folded = []
+        for ident, frame in frames.items():
+            if ident == skip:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.depth:
+                code = frame.f_code
+                stack.append(
+                    f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}"
+                )
+                frame = frame.f_back
+            stack.append(
+                names.get(ident, str(ident)).replace(";", ":").replace(" ", "_")
+            )
+            folded.append(";".join(reversed(stack)))
+        with self._lock:
+            self.samples += 1
+            for stack in folded:
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def folded(self) -> str:
+        """
+        Stacks counted so far in the folded format, the most sampled first.
+
+        :return: A "frame;frame;frame count" line per stack.
+        :rtype: str.
+        """
+        with self._lock:
+            stacks = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def stats(self) -> dict:
+        """
+        State of the sampler and its stacks.
+
+        :return: running, interval, samples and folded stacks.
+        :rtype: dict.
+        """
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "folded": self.folded(),
+        }
+
+
+request_profiler = RequestProfiler()
+stack_sampler = StackSampler()
@@ -19,7 +19,10 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.models import User
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth.password_validation import validate_password
+from .engine import MAX_SIZE, MIN_SIZE, SIZE
+from .evaluator import OUTCOMES
 from .models import Games, Moves
+from .solver import SOLVER_SIZE
 
 
 class MoveSerializer(serializers.ModelSerializer):
@@ -27,6 +30,9 @@ class MoveSerializer(serializers.ModelSerializer):
     Moves that happened in a Tic-Tac-Toe game.
     """
 
+    x = serializers.IntegerField(min_value=0, max_value=MAX_SIZE - 1)
+    y = serializers.IntegerField(min_value=0, max_value=MAX_SIZE - 1)
+
     class Meta:
         """
         Move meta data.
@@ -37,7 +43,104 @@ class MoveSerializer(serializers.ModelSerializer):
             "player",
             "x",
             "y",
+            "ply",
+            "created",
         ]
+        read_only_fields = ["player", "ply", "created"]
+
+
+class MoveBatchSerializer(MoveSerializer):
+    """
+    A move in a batch, naming the game it is made in.
+    """
+
+    game_id = serializers.UUIDField()
+
+    class Meta(MoveSerializer.Meta):
+        """
+        Batch move meta data.
+        """
+
+        fields = [
+            "game_id",
+            "player",
+            "x",
+            "y",
+        ]
+
+
+class MovesBatchSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Moves sent together, possibly across many games.
+    """
+
+    moves = MoveBatchSerializer(many=True)
+
+
+class CellAnalysisSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Result of playing a cell and how many moves away it is.
+    """
+
+    x = serializers.IntegerField(read_only=True)
+    y = serializers.IntegerField(read_only=True)
+    result = serializers.ChoiceField(choices=["win", "draw", "loss"], read_only=True)
+    distance = serializers.IntegerField(read_only=True)
+
+
+class AnalysisSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Every empty cell of a game evaluated for the player to move.
+    """
+
+    player = serializers.CharField(read_only=True, allow_null=True)
+    cells = CellAnalysisSerializer(many=True, read_only=True)
+
+
+class ReplaySerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    A game as it stood after one of its plies.
+    """
+
+    ply = serializers.IntegerField(read_only=True)
+    moves_count = serializers.IntegerField(read_only=True)
+    state = serializers.CharField(read_only=True)
+    move = MoveSerializer(read_only=True, allow_null=True)
+    moves = serializers.ListField(
+        child=serializers.ListField(child=serializers.CharField(allow_null=True)),
+        read_only=True,
+    )
+
+
+class EvaluateSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Boards classified in one go, each as an encoded string or a list of 1 for x, -1 for o and 0.
+    """
+
+    size = serializers.IntegerField(
+        min_value=MIN_SIZE, max_value=MAX_SIZE, default=SIZE
+    )
+    win_length = serializers.IntegerField(
+        min_value=MIN_SIZE, max_value=MAX_SIZE, default=SIZE
+    )
+    boards = serializers.ListField(allow_empty=False, write_only=True)
+    results = serializers.ListField(
+        child=serializers.ChoiceField(choices=OUTCOMES), read_only=True
+    )
+
+    def validate(self, attrs):
+        if attrs["win_length"] > attrs["size"]:
+            raise serializers.ValidationError(
+                {
+                    "win_length": "win_length cannot be longer than the board size.",
+                }
+            )
+        return attrs
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -156,13 +259,31 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class PlayerSerializer(serializers.ModelSerializer):
+    """
+    Just enough of a user to show who is seated at a game.
+    """
+
+    class Meta:
+        """
+        Player meta data.
+        """
+
+        model = User
+        fields = (
+            "id",
+            "username",
+        )
+        read_only_fields = fields
+
+
 class GameSerializer(serializers.ModelSerializer):
     """
     Tic-Tac-Toe games.
     """
 
-    player_o = UserSerializer(read_only=True)
-    player_x = UserSerializer(read_only=True)
+    player_o = PlayerSerializer(read_only=True)
+    player_x = PlayerSerializer(read_only=True)
 
     class Meta:
         """
@@ -174,10 +295,75 @@ class GameSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "state",
+            "size",
+            "win_length",
+            "version",
+            "player_o",
+            "player_x",
+            "ai",
+            "ai_level",
+        )
+        read_only_fields = ("version",)
+
+    def validate(self, attrs):
+        if attrs.get("win_length", SIZE) > attrs.get("size", SIZE):
+            raise serializers.ValidationError(
+                {
+                    "win_length": "win_length cannot be longer than the board size.",
+                }
+            )
+        if attrs.get("ai") and (
+            attrs.get("size", SIZE) != SOLVER_SIZE
+            or attrs.get("win_length", SIZE) != SOLVER_SIZE
+        ):
+            raise serializers.ValidationError(
+                {
+                    "ai": "The computer only plays 3x3 games.",
+                }
+            )
+        return attrs
+
+
+class GameBulkSerializer(GameSerializer):
+    """
+    A game created in bulk with both players already seated.
+    """
+
+    player_o = serializers.IntegerField(source="player_o_id")
+    player_x = serializers.IntegerField(source="player_x_id")
+
+    class Meta(GameSerializer.Meta):
+        """
+        Bulk game meta data.
+        """
+
+        fields = (
+            "name",
+            "size",
+            "win_length",
             "player_o",
             "player_x",
         )
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["player_o_id"] == attrs["player_x_id"]:
+            raise serializers.ValidationError(
+                {
+                    "player_o": "Cannot be the same user for both players!",
+                }
+            )
+        return attrs
+
+
+class GamesBulkSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Games created together, such as a round of a tournament.
+    """
+
+    games = GameBulkSerializer(many=True, allow_empty=False)
+
 
 class LoginSerializer(serializers.Serializer):
     # pylint: disable=W0223
@@ -194,3 +380,86 @@ class LogoutSerializer(serializers.Serializer):
     """
     User logging out of the application.
     """
+
+
+class CacheStatsSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Game cache counters of a worker.
+    """
+
+    backend = serializers.CharField(read_only=True)
+    hits = serializers.IntegerField(read_only=True)
+    misses = serializers.IntegerField(read_only=True)
+    ratio = serializers.FloatField(read_only=True)
+
+
+class LoopStatsSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Event loop lag of a worker, in seconds.
+    """
+
+    samples = serializers.IntegerField(read_only=True)
+    last = serializers.FloatField(read_only=True)
+    max = serializers.FloatField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+
+
+class ProfileRowSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    A function of a profiled request, times in seconds.
+    """
+
+    function = serializers.CharField(read_only=True)
+    calls = serializers.IntegerField(read_only=True)
+    primitive_calls = serializers.IntegerField(read_only=True)
+    tottime = serializers.FloatField(read_only=True)
+    cumtime = serializers.FloatField(read_only=True)
+
+
+class ProfileSummarySerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    A profiled request.
+    """
+
+    id = serializers.CharField(read_only=True)
+    method = serializers.CharField(read_only=True)
+    path = serializers.CharField(read_only=True)
+    user = serializers.CharField(read_only=True)
+    status = serializers.IntegerField(read_only=True, allow_null=True)
+    seconds = serializers.FloatField(read_only=True)
+    created = serializers.DateTimeField(read_only=True)
+
+
+class ProfileSerializer(ProfileSummarySerializer):
+    # pylint: disable=W0223
+    """
+    A profiled request with its hottest functions by cumulative time.
+    """
+
+    rows = ProfileRowSerializer(many=True, read_only=True)
+
+
+class ProfilesSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Request profiling switch of a worker and the requests it profiled, newest first.
+    """
+
+    enabled = serializers.BooleanField()
+    profiles = ProfileSummarySerializer(many=True, read_only=True)
+
+
+class SamplerSerializer(serializers.Serializer):
+    # pylint: disable=W0223
+    """
+    Stack sampler of a worker and the stacks it counted, in the folded flame graph format.
+    """
+
+    running = serializers.BooleanField()
+    interval = serializers.FloatField(min_value=0.001, max_value=1.0, required=False)
+    samples = serializers.IntegerField(read_only=True)
+    folded = serializers.CharField(read_only=True)
@@ -0,0 +1,228 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
+from .engine import SIZE, line_index
+from .solver import LEVELS, MAX_LEVEL, SOLVER_SIZE, score_array
+
+# Policies a player can follow, the solver only knows the classic board.
+RANDOM = "random"
+SOLVER = "solver"
+POLICIES = (RANDOM, SOLVER)
+# Games played side by side in one set of board arrays, bigger batches trade memory for speed.
+SIMULATE_BATCH = 50000
+# Columns of the outcome counts.
+WINNER_X = 0
+WINNER_O = 1
+TIE = 2
+OUTCOMES = ("winner_x", "winner_o", "tie")
+
+X = 1
+O = -1
+
+
+@lru_cache(maxsize=None)
+def line_cells(size: int = SIZE, win_length: int = SIZE) -> tuple:
+    """
+    The engine's winning lines as arrays of cells, and the lines running through each cell.
+
+    Cells with fewer lines than the busiest cell are padded with a line over the spare cell past
+    the end of the board, which stays empty, so every cell has the same number of lines.
+
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :return: Lines by win_length cells, cells by lines through them.
+    :rtype: tuple.
+    """
+    index = line_index(size, win_length)
+    lines = [
+        [cell for cell in range(index.cells) if line & (1 << cell)]
+        for line in index.lines
+    ]
+    lines.append([index.cells] * win_length)
+    spare = len(lines) - 1
+    widest = max(len(cell_lines) for cell_lines in index.cell_lines)
+    through = [
+        [index.lines.index(line) for line in cell_lines]
+        + [spare] * (widest - len(cell_lines))
+        for cell_lines in index.cell_lines
+    ]
+    return np.array(lines, dtype=np.intp), np.array(through, dtype=np.intp)
+
+
+def _choose(boards, codes, policy, level, scores, rng):
+    """
+    Pick a cell on every board for the player to move.
+
+    :param boards: Boards by cells array, the spare cell included.
+    :param codes: Solver position index of every board, only used by the solver.
+    :param policy: RANDOM or SOLVER.
+    :param level: Solver difficulty from 1 to MAX_LEVEL.
+    :param scores: Solver score array or None.
+    :param rng: numpy Generator.
+    :return: One cell per board.
+    """
+    empty = boards[:, :-1] == 0
+    noise = rng.random(empty.shape, dtype=np.float32)
+    if policy == RANDOM:
+        return (noise + empty).argmax(axis=1)
+
+    cell_scores = scores[codes]
+    best = cell_scores.max(axis=1, keepdims=True)
+    moves = cell_scores == best
+    mistakes = empty & (cell_scores < best)
+    mistaken = mistakes.any(axis=1) & (rng.random(len(boards)) < LEVELS[level - 1])
+    moves[mistaken] = mistakes[mistaken]
+    return (noise + moves).argmax(axis=1)
+
+
+def _play(games, size, win_length, policies, level, scores, seed):
+    """
+    Play a batch of games to the end, every game moving at once on each ply.
+
+    Finished games are dropped from the arrays as they end so later plies only touch live games.
+
+    :return: outcomes, openings and lengths counts for the batch.
+    """
+    rng = np.random.default_rng(seed)
+    cells = size * size
+    lines, through = line_cells(size, win_length)
+    boards = np.zeros((games, cells + 1), dtype=np.int8)
+    codes = np.zeros(games, dtype=np.intp)
+    openings = np.zeros(games, dtype=np.intp)
+    outcomes = np.zeros(3, dtype=np.int64)
+    opening_outcomes = np.zeros((cells, 3), dtype=np.int64)
+    lengths = np.zeros(cells + 1, dtype=np.int64)
+    digits = 3 ** np.arange(cells, dtype=np.intp)
+
+    for ply in range(cells):
+        player = X if ply % 2 == 0 else O
+        rows = np.arange(len(boards))
+        cell = _choose(boards, codes, policies[ply % 2], level, scores, rng)
+        boards[rows, cell] = player
+        if scores is not None:
+            codes += digits[cell] * (1 if player == X else 2)
+        if ply == 0:
+            openings = cell
+
+        if ply < 2 * win_length - 2:
+            continue
+        won = (
+            (boards[rows[:, None, None], lines[through[cell]]] == player)
+            .all(axis=2)
+            .any(axis=1)
+        )
+        column = WINNER_X if player == X else WINNER_O
+        outcomes[column] += won.sum()
+        lengths[ply + 1] += won.sum()
+        np.add.at(opening_outcomes[:, column], openings[won], 1)
+        playing = ~won
+        boards, codes, openings = boards[playing], codes[playing], openings[playing]
+        if not len(boards):
+            break
+
+    outcomes[TIE] += len(boards)
+    lengths[cells] += len(boards)
+    np.add.at(opening_outcomes[:, TIE], openings, 1)
+    return outcomes, opening_outcomes, lengths
+
+
+def simulate(
+    games: int,
+    size: int = SIZE,
+    win_length: int = SIZE,
+    x: str = RANDOM,
+    o: str = RANDOM,
+    level: int = MAX_LEVEL,
+    workers: int = 1,
+    seed: int = None,
+) -> dict:
+    """
+    Play many games between two policies entirely in memory and count how they went.
+
+    Games are played in batches of SIMULATE_BATCH, spread over a process pool when there is more
+    than one worker. The same seed gives the same counts whatever the number of workers.
+
+    :param games: Number of games to play.
+    :type games: int.
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :param win_length: How many in a row are needed to win.
+    :type win_length: int.
+    :param x: Policy x plays by, see POLICIES.
+    :type x: str.
+    :param o: Policy o plays by, see POLICIES.
+    :type o: str.
+    :param level: Solver difficulty from 1 to MAX_LEVEL.
+    :type level: int.
+    :param workers: Processes to play in.
+    :type workers: int.
+    :param seed: Seed for reproducible games.
+    :type seed: int or None.
+    :return: Outcome counts, first move advantage, outcomes by opening cell and game lengths.
+    :rtype: dict.
+    """
+    if x not in POLICIES or o not in POLICIES:
+        raise ValueError(f"Policies are one of {', '.join(POLICIES)}!")
+    if SOLVER in (x, o) and (size != SOLVER_SIZE or win_length != SOLVER_SIZE):
+        raise ValueError("The solver only plays 3x3 games!")
+    if not 1 <= level <= MAX_LEVEL:
+        raise ValueError(f"Level is between 1 and {MAX_LEVEL}!")
+    if games < 1:
+        raise ValueError("Play at least one game!")
+
+    scores = score_array() if SOLVER in (x, o) else None
+    batches = [SIMULATE_BATCH] * (games // SIMULATE_BATCH)
+    if games % SIMULATE_BATCH:
+        batches.append(games % SIMULATE_BATCH)
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    jobs = [
+        (batch, size, win_length, (x, o), level, scores, batch_seed)
+        for batch, batch_seed in zip(batches, seeds)
+    ]
+
+    started = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play, *zip(*jobs)))
+    else:
+        results = [_play(*job) for job in jobs]
+    seconds = time.perf_counter() - started
+
+    outcomes, openings, lengths = (sum(counts) for counts in zip(*results))
+    return {
+        "games": games,
+        "size": size,
+        "win_length": win_length,
+        "x": x,
+        "o": o,
+        "outcomes": dict(zip(OUTCOMES, outcomes.tolist())),
+        "advantage": float(outcomes[WINNER_X] - outcomes[WINNER_O]) / games,
+        "openings": [
+            {"x": cell % size, "y": cell // size, **dict(zip(OUTCOMES, counts))}
+            for cell, counts in enumerate(openings.tolist())
+            if sum(counts)
+        ],
+        "lengths": {
+            plies: count for plies, count in enumerate(lengths.tolist()) if count
+        },
+        "seconds": seconds,
+    }
@@ -0,0 +1,329 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import logging
+import mmap
+import random
+from array import array
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from .engine import Board, line_index
+
+log = logging.getLogger("api")
+
+# The solver only covers the classic board, every reachable position of it fits in the table.
+SOLVER_SIZE = 3
+SOLVER_CELLS = SOLVER_SIZE * SOLVER_SIZE
+SOLVER_POSITIONS = 3**SOLVER_CELLS
+# Score stored for a cell that cannot be played.
+ILLEGAL = -128
+# Index entry of a position that cannot be reached, or where the game is already over.
+UNREACHABLE = 0xFFFF
+# Chance of passing over the best moves for each difficulty level, the last level plays perfectly.
+LEVELS = (0.6, 0.3, 0.0)
+MAX_LEVEL = len(LEVELS)
+
+# Position index of each player mask, a position is x's value plus twice o's.
+_TERNARY = tuple(
+    sum(3**cell for cell in range(SOLVER_CELLS) if mask & (1 << cell))
+    for mask in range(1 << SOLVER_CELLS)
+)
+
+
+def _symmetries() -> tuple:
+    """
+    The eight rotations and reflections of the board, as the cell each cell is moved to.
+
+    :return: One tuple of cells per symmetry, the identity first.
+    :rtype: tuple.
+    """
+    last = SOLVER_SIZE - 1
+    transforms = (
+        lambda x, y: (x, y),
+        lambda x, y: (last - y, x),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - x, y),
+        lambda x, y: (x, last - y),
+        lambda x, y: (y, x),
+        lambda x, y: (last - y, last - x),
+    )
+    symmetries = []
+    for transform in transforms:
+        cells = []
+        for cell in range(SOLVER_CELLS):
+            x, y = transform(cell % SOLVER_SIZE, cell // SOLVER_SIZE)
+            cells.append(y * SOLVER_SIZE + x)
+        symmetries.append(tuple(cells))
+    return tuple(symmetries)
+
+
+_SYMMETRIES = _symmetries()
+# Each player mask moved by each symmetry.
+_SYMMETRIC_MASKS = tuple(
+    tuple(
+        sum(1 << symmetry[cell] for cell in range(SOLVER_CELLS) if mask & (1 << cell))
+        for mask in range(1 << SOLVER_CELLS)
+    )
+    for symmetry in _SYMMETRIES
+)
+
+
+def position(board: Board) -> int:
+    """
+    Index of a 3x3 board in the solver table.
+
+    :param board: Board to look up.
+    :type board: Board.
+    :return: Position index.
+    :rtype: int.
+    """
+    return _TERNARY[board.x] + 2 * _TERNARY[board.o]
+
+
+def _canonical(xs: int, os: int) -> tuple:
+    """
+    The smallest position among the rotations and reflections of a position.
+
+    :param xs: Cells taken by x.
+    :type xs: int.
+    :param os: Cells taken by o.
+    :type os: int.
+    :return: symmetry, xs, os of the canonical position.
+    :rtype: tuple.
+    """
+    return min(
+        (
+            _TERNARY[masks[xs]] + 2 * _TERNARY[masks[os]],
+            symmetry,
+            masks[xs],
+            masks[os],
+        )
+        for symmetry, masks in enumerate(_SYMMETRIC_MASKS)
+    )[1:]
+
+
+def solve() -> bytes:
+    """
+    Score every move of every position reachable from the empty 3x3 board.
+
+    Negamax with a transposition table over the canonical positions, so the rotations and
+    reflections of a position share one row. A win scores more the sooner it happens and a draw
+    scores nothing, each row holds one signed byte per cell with the score of playing there for the
+    player to move, ILLEGAL for cells that cannot be played.
+
+    The table is an index of one unsigned short per position, the row of its canonical position
+    shifted left by three with the symmetry that leads there in the low bits, followed by the rows.
+
+    :return: Solver table.
+    :rtype: bytes.
+    """
+    lines = line_index(SOLVER_SIZE, SOLVER_SIZE).cell_lines
+    rows = {}
+    values = {}
+
+    def negamax(xs: int, os: int, count: int) -> int:
+        key = _TERNARY[xs] + 2 * _TERNARY[os]
+        if key in values:
+            return values[key]
+        mover, other = (xs, os) if count % 2 == 0 else (os, xs)
+        row = [ILLEGAL] * SOLVER_CELLS
+        for cell in range(SOLVER_CELLS):
+            bit = 1 << cell
+            if (mover | other) & bit:
+                continue
+            placed = mover | bit
+            if any(placed & line == line for line in lines[cell]):
+                row[cell] = SOLVER_CELLS - count
+            elif count + 1 == SOLVER_CELLS:
+                row[cell] = 0
+            else:
+                after = (placed, other) if count % 2 == 0 else (other, placed)
+                _, child_xs, child_os = _canonical(*after)
+                row[cell] = -negamax(child_xs, child_os, count + 1)
+        rows[key] = row
+        values[key] = max(row)
+        return values[key]
+
+    negamax(0, 0, 0)
+
+    numbers = {key: number for number, key in enumerate(sorted(rows))}
+    index = array("H", [UNREACHABLE]) * SOLVER_POSITIONS
+    for xs in range(1 << SOLVER_CELLS):
+        for os in range(1 << SOLVER_CELLS):
+            if xs & os:
+                continue
+            symmetry, canonical_xs, canonical_os = _canonical(xs, os)
+            number = numbers.get(_TERNARY[canonical_xs] + 2 * _TERNARY[canonical_os])
+            if number is not None:
+                index[_TERNARY[xs] + 2 * _TERNARY[os]] = number << 3 | symmetry
+    scores = array("b", (score for key in sorted(rows) for score in rows[key]))
+    return index.tobytes() + scores.tobytes()
+
+
+def save(path: Path):
+    """
+    Solve the board and write the table where the workers will map it from.
+
+    :param path: File to write the table to.
+    :type path: Path.
+    """
+    partial = path.with_suffix(".partial")
+    partial.write_bytes(solve())
+    partial.replace(path)
+
+
+class SolverTable:
+    """
+    Index and rows of a solver table laid out by solve.
+    """
+
+    __slots__ = ("index", "rows")
+
+    def __init__(self, buffer):
+        split = SOLVER_POSITIONS * array("H").itemsize
+        view = memoryview(buffer)
+        self.index = view[:split].cast("H")
+        self.rows = view[split:].cast("b")
+
+    def scores(self, board: Board) -> list:
+        """
+        Score of every cell for the player to move, ILLEGAL where the cell cannot be played.
+
+        :param board: 3x3 board.
+        :type board: Board.
+        :return: One score per cell, row by row.
+        :rtype: list.
+        """
+        entry = self.index[position(board)]
+        if entry == UNREACHABLE:
+            return [ILLEGAL] * SOLVER_CELLS
+        row = (entry >> 3) * SOLVER_CELLS
+        symmetry = _SYMMETRIES[entry & 7]
+        return [self.rows[row + symmetry[cell]] for cell in range(SOLVER_CELLS)]
+
+
+@lru_cache(maxsize=None)
+def table() -> SolverTable:
+    """
+    The solver table, memory mapped from SOLVER_TABLE so every worker shares one copy.
+
+    When the file is missing the table is solved in memory instead, run manage.py solve to write it.
+
+    :return: Solver table.
+    :rtype: SolverTable.
+    """
+    path = Path(settings.SOLVER_TABLE)
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if (len(mapped) - SOLVER_POSITIONS * array("H").itemsize) % SOLVER_CELLS == 0:
+            return SolverTable(mapped)
+        log.warning("Solver table %s has the wrong size, solving in memory.", path)
+    except (OSError, ValueError):
+        log.info("Solver table %s not found, solving in memory.", path)
+    return SolverTable(solve())
+
+
+@lru_cache(maxsize=None)
+def score_array() -> np.ndarray:
+    """
+    The solver table unfolded into one row of cell scores per position index, for scoring many
+    boards at once.
+
+    :return: Positions by cells array of scores, ILLEGAL where a cell cannot be played.
+    :rtype: np.ndarray.
+    """
+    solver_table = table()
+    index = np.frombuffer(solver_table.index, dtype=np.uint16)
+    rows = np.frombuffer(solver_table.rows, dtype=np.int8).reshape(-1, SOLVER_CELLS)
+    reachable = index != UNREACHABLE
+    entries = index[reachable]
+    symmetries = np.array(_SYMMETRIES)[entries & 7]
+    array_scores = np.full((SOLVER_POSITIONS, SOLVER_CELLS), ILLEGAL, dtype=np.int8)
+    array_scores[reachable] = np.take_along_axis(rows[entries >> 3], symmetries, axis=1)
+    array_scores.flags.writeable = False
+    return array_scores
+
+
+def scores(board: Board) -> list:
+    """
+    Score of every cell for the player to move, ILLEGAL where the cell cannot be played.
+
+    :param board: 3x3 board.
+    :type board: Board.
+    :return: One score per cell, row by row.
+    :rtype: list.
+    """
+    return table().scores(board)
+
+
+def analyse(board: Board) -> list:
+    """
+    Result and distance to it of playing each empty cell, for the player to move.
+
+    The distance counts the moves of both players until the game ends, this move included.
+
+    :param board: 3x3 board that is still being played.
+    :type board: Board.
+    :return: x, y, result (win, draw or loss) and distance for every empty cell.
+    :rtype: list.
+    """
+    cells = []
+    for cell, score in enumerate(scores(board)):
+        if score == ILLEGAL:
+            continue
+        if score > 0:
+            result, distance = "win", SOLVER_CELLS - score - board.count + 1
+        elif score < 0:
+            result, distance = "loss", SOLVER_CELLS + score - board.count + 1
+        else:
+            result, distance = "draw", SOLVER_CELLS - board.count
+        cells.append(
+            {
+                "x": cell % SOLVER_SIZE,
+                "y": cell // SOLVER_SIZE,
+                "result": result,
+                "distance": distance,
+            }
+        )
+    return cells
+
+
+def choose(board: Board, level: int = MAX_LEVEL, rng=random) -> tuple:
+    """
+    Pick the computer's move, lower levels sometimes pass over the best moves on purpose.
+
+    :param board: 3x3 board that is still being played.
+    :type board: Board.
+    :param level: Difficulty from 1 to MAX_LEVEL.
+    :type level: int.
+    :param rng: Source of randomness.
+    :return: x, y of the move.
+    :rtype: tuple.
+    """
+    cells = [
+        (score, cell) for cell, score in enumerate(scores(board)) if score != ILLEGAL
+    ]
+    best = max(score for score, _ in cells)
+    moves = [cell for score, cell in cells if score == best]
+    mistakes = [cell for score, cell in cells if score < best]
+    if mistakes and rng.random() < LEVELS[level - 1]:
+        moves = mistakes
+    cell = rng.choice(moves)
+    return cell % SOLVER_SIZE, cell // SOLVER_SIZE
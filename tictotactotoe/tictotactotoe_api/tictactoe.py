@@ -15,230 +15,647 @@ limitations under the License.
 """
 
 import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from functools import partial
+from uuid import UUID
+import numpy as np
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User as UserModel
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from .cache import game_cache
+from .engine import SIZE, Board
+from .evaluator import OUTCOMES, decode, evaluate
+from .events import hub
+from .metrics import GAME_OUTCOMES, MOVE_ACCEPTED, metrics
 from .models import Games as GamesModel
 from .models import Moves as MovesModel
-from .serializers import GameSerializer, MoveSerializer
+from .solver import SOLVER_SIZE, analyse, choose
+from .serializers import (
+    EvaluateSerializer,
+    GameSerializer,
+    GamesBulkSerializer,
+    MoveBatchSerializer,
+    MoveSerializer,
+)
 
 log = logging.getLogger("api")
 
+GAMES_PAGE_SIZE = 25
+GAMES_MAX_PAGE_SIZE = 100
+GAMES_BULK_SIZE = 1000
+MOVES_BATCH_SIZE = 100
+EVALUATE_MAX_BOARDS = 10000
 
-def _all_same(items: list) -> bool:
+
+async def agame_get(game_id: str) -> dict:
     """
-    See if all the items in a list are the same.
+    Based on the game ID get it from the cache or database along with its board.
 
-    :param items: Random list of items.
-    :type items: list.
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :return: Game details.
+    :rtype: dict.
+    """
+    try:
+        game = await game_cache.afetch(game_id)
+        if game is None:
+            return {}
+        data = GameSerializer(game, many=False).data
+        data["moves"] = get_board(game).to_moves()
+        return data
+    except Exception as e:
+        log.info("agame_get errored while getting GamesModel: %s", str(e))
+        return {}
+
+
+def _seated(game: GamesModel, player: str) -> bool:
+    """
+    See if a seat is taken, by a user or by the computer.
+
+    :param game: Snapshot of the game.
+    :type game: GamesModel.
+    :param player: Either "x" or "o".
+    :type player: str.
     :return: Boolean.
-    :rtype: bool
+    :rtype: bool.
     """
-    return len(set(items)) == 1
+
+    return getattr(game, f"player_{player}_id") is not None or game.ai == player
 
 
-def _check_diagonal(moves: list):
+def _move_judge(game: GamesModel, user, x: int, y: int):
     """
-    Check to see if the moves in the game have a winning diagonal line.
+    Judge a move against a snapshot of the game without writing anything.
+
+    :param game: Snapshot of the game.
+    :type game: GamesModel.
+    :param user: API Request user.
+    :type user: User.
+    :param x: Column of the move.
+    :type x: int.
+    :param y: Row of the move.
+    :type y: int.
+    :return: reason, error, move where reason says why the move was turned away, see
+        metrics.MOVE_OUTCOMES, error is a status_message, message, data tuple and both are None
+        when the move is accepted, move comes from _move_play.
+    :rtype: str or None, tuple or None, dict or None
+    """
+
+    if not (_seated(game, "x") and _seated(game, "o")):
+        return (
+            "not_ready",
+            ("error", "Not all players are ready. Please wait!", {}),
+            None,
+        )
+
+    player = None
+    if user.id == game.player_x_id:
+        player = "x"
+    elif user.id == game.player_o_id:
+        player = "o"
+    if player is None:
+        message = f"Sorry {user.username} is not apart of this game!"
+        return "not_player", ("error", message, {}), None
+
+    # check to see if the game is over or tied.
+    game_state = game.state
+    if not game_state.startswith("turn_"):
+        if game_state == "winner_x":
+            return (
+                "game_over",
+                ("error", "Game is over! Player X is the winner!", {}),
+                None,
+            )
+        if game_state == "winner_o":
+            return (
+                "game_over",
+                ("error", "Game is over! Player O is the winner!", {}),
+                None,
+            )
+        return "game_over", ("error", "Game is over! Ended in Tie!", {}), None
+
+    if not valid_move(x, y, game.size):
+        return (
+            "off_board",
+            ("error", "Move was not valid. Please try a different move!", {}),
+            None,
+        )
 
-    :param moves: All moves in the game.
+    if f"turn_{player}" != game_state:
+        return "not_your_turn", _not_your_turn(player), None
+
+    board = get_board(game)
+    if not board.is_empty(x, y):
+        return (
+            "taken",
+            ("error", "I am sorry a player already placed a move here!", {}),
+            None,
+        )
+    error, move = _move_play(board, player, x, y)
+    if error is not None:
+        return "invalid", error, None
+    return None, None, move
+
+
+def _move_play(board: Board, player: str, x: int, y: int):
+    """
+    Play a judged move on a board and work out the state of the game after it.
+
+    :param board: Board the move is played on, it is changed in place.
+    :type board: Board.
+    :param player: Either "x" or "o".
+    :type player: str.
+    :param x: Column of the move.
+    :type x: int.
+    :param y: Row of the move.
+    :type y: int.
+    :return: error, move where error is a status_message, message, data tuple or None and move
+        holds the player, x, y, the new state, the message and the board after the move.
+    :rtype: tuple or None, dict or None
+    """
+
+    other_player = "o" if player == "x" else "x"
+    winner = board.play(x, y, player)
+    if winner is None:
+        message = f"Move accepted! Now it is {other_player}'s turn."
+        state = f"turn_{other_player}"
+    elif winner in ["x", "o"]:
+        message = f"Congratulations {player} you are the winner!"
+        state = f"winner_{player}"
+    elif winner == "tie":
+        log.debug("We have a tie!")
+        message = "Full board! Game ended in a tie."
+        state = "tie"
+    else:
+        return ("error", f"Something went wrong! {winner}", {}), None
+    return None, {
+        "player": player,
+        "x": x,
+        "y": y,
+        "state": state,
+        "message": message,
+        "board": board,
+    }
+
+
+def _ai_move(game: GamesModel, state: str, board: Board):
+    """
+    The computer's move when it is playing and it is its turn, looked up in the solver table.
+
+    :param game: Snapshot of the game.
+    :type game: GamesModel.
+    :param state: State of the game before the move.
+    :type state: str.
+    :param board: Board before the move, it is left as it is.
+    :type board: Board.
+    :return: Move like _move_play's or None when it is not the computer's turn.
+    :rtype: dict or None.
+    """
+
+    if not game.ai or state != f"turn_{game.ai}":
+        return None
+    x, y = choose(board, game.ai_level)
+    _, move = _move_play(board.copy(), game.ai, x, y)
+    return move
+
+
+def _move_replies(game: GamesModel, move: dict) -> list:
+    """
+    A player's move followed by the computer's reply to it when the computer is playing.
+
+    :param game: Snapshot of the game the move was judged against.
+    :type game: GamesModel.
+    :param move: Move from _move_judge.
+    :type move: dict.
+    :return: Moves to commit together.
+    :rtype: list.
+    """
+
+    reply = _ai_move(game, move["state"], move["board"])
+    return [move] if reply is None else [move, reply]
+
+
+def _move_data(moves: list) -> dict:
+    """
+    Response data for a player's move and the computer's reply to it.
+
+    :param moves: Moves from _move_replies.
     :type moves: list.
-    :return: Either the winning or None
-    :rtype: str or None.
+    :return: player, x, y of the move and the reply if there was one.
+    :rtype: dict.
     """
 
-    n = len(moves)
-    line = []
-    for i in range(n):
-        line.append(moves[i][i])
-    if _all_same(line):
-        return line[0]
-    line = []
-    k = n - 1
-    for i in range(n):
-        line.append(moves[i][k])
-        k -= 1
-    if _all_same(line):
-        return line[0]
-    return None
+    data = {key: moves[0][key] for key in ["player", "x", "y"]}
+    if len(moves) > 1:
+        data["reply"] = {key: moves[1][key] for key in ["player", "x", "y"]}
+    return data
 
 
-def _check_full(moves: list) -> bool:
+def _move_apply(game: GamesModel, moves: list):
     """
-    Check to see if the moves in the game have been played.
+    Bring a snapshot of the game up to date with committed moves.
 
-    :param moves: All moves in the game.
+    :param game: Snapshot of the game.
+    :type game: GamesModel.
+    :param moves: Moves played in order.
+    :type moves: list.
+    """
+
+    board = moves[-1]["board"]
+    game.state = moves[-1]["state"]
+    game.board = board.encode()
+    game.moves_count = board.count
+    game.version += len(moves)
+
+
+def _move_commit(game_id, version: int, moves: list) -> bool:
+    """
+    Compare-and-set the game to the state after some moves, only if nobody changed it in between,
+    then insert the moves and tell the game's listeners about them once they are committed.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: UUID.
+    :param version: Version of the game the moves were judged against.
+    :type version: int.
+    :param moves: Moves played in order.
     :type moves: list.
     :return: Boolean.
     :rtype: bool.
     """
-    for e in moves:
-        fix = e.index(None) if None in e else None
-        if fix is not None:
-            return False
+
+    board = moves[-1]["board"]
+    updated = GamesModel.objects.filter(
+        id=game_id,
+        version=version,
+    ).update(
+        state=moves[-1]["state"],
+        board=board.encode(),
+        moves_count=board.count,
+        version=version + len(moves),
+    )
+    if not updated:
+        return False
+    MovesModel.objects.bulk_create(
+        [
+            MovesModel(
+                game_id=game_id,
+                player=move["player"],
+                x=move["x"],
+                y=move["y"],
+                ply=move["board"].count,
+            )
+            for move in moves
+        ]
+    )
+    for count, move in enumerate(moves, start=1):
+        _move_publish(game_id, move, version + count)
+    if moves[-1]["state"] in GAME_OUTCOMES:
+        transaction.on_commit(partial(metrics.game_finished, moves[-1]["state"]))
     return True
 
 
-def _check_horizontal(moves: list):
+@transaction.atomic
+def _move_save(game_id, version: int, moves: list) -> bool:
     """
-    Check to see if the moves in the game have a winning horizontal line.
+    Commit moves in a transaction of their own.
+
+    The async ORM cannot run transactions yet so this is called through sync_to_async.
 
-    :param moves: All moves in the game.
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: UUID.
+    :param version: Version of the game the moves were judged against.
+    :type version: int.
+    :param moves: Moves played in order.
     :type moves: list.
-    :return: Either the winning or None
-    :rtype: str or None.
+    :return: Boolean, False when the game changed since it was read.
+    :rtype: bool.
     """
-    for i in moves:
-        if i[0] is not None and _all_same(i):
-            return i[0]
 
+    return _move_commit(game_id, version, moves)
 
-def _check_vertical(moves: list):
+
+def _move_publish(game_id, move: dict, version: int):
     """
-    Check to see if the moves in the game have a winning vertical line.
+    Tell the game's listeners about a move once the transaction saving it commits.
 
-    :param moves: All moves in the game.
-    :type moves: list.
-    :return: Either the winning or None
-    :rtype: str or None.
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: UUID.
+    :param move: Move from _move_play.
+    :type move: dict.
+    :param version: Version of the game after the move.
+    :type version: int.
     """
-    max_x = 3
-    max_y = 3
-    for x in range(0, max_x):
-        line = []
-        for y in range(0, max_y):
-            line.append(moves[y][x])
-        if line[0] is not None and _all_same(line):
-            return line[0]
-    return None
+
+    transaction.on_commit(
+        partial(
+            hub.publish,
+            str(game_id),
+            "move",
+            {
+                "player": move["player"],
+                "x": move["x"],
+                "y": move["y"],
+                "state": move["state"],
+                "moves_count": move["board"].count,
+                "version": version,
+            },
+        )
+    )
 
 
-def game_get(game_id: str) -> dict:
+def _not_your_turn(player: str) -> tuple:
     """
-    Based on the game ID get it from the database.
+    Error for a player moving out of turn.
 
-    :param game_id: The ID that has been assigned to the game.
-    :type game_id: str.
-    :return: Game details.
-    :rtype: dict.
+    :param player: Player that tried to move.
+    :type player: str.
+    :return: status_message, message, data
+    :rtype: str, str, dict
     """
-    try:
-        game = GamesModel.objects.get(id=game_id)
-        serializer = GameSerializer(game, many=False)
-        return serializer.data
-    except GamesModel.DoesNotExist:
-        return {}
-    except Exception as e:
-        log.info("game_get errored while getting GamesModel: %s", str(e))
-        return {}
+
+    other_player = "o" if player == "x" else "x"
+    return (
+        "error",
+        f"It is not your turn {player}! Sorry, please wait for {other_player}.",
+        {},
+    )
 
 
-def game_post(game_id: str, username: str, data: dict):
+async def agame_post(game_id: str, user, data: dict):
     """
     A player is making a move on the board.
 
+    The coordinates are checked before the database is touched and the move is judged against the
+    cached game. It is committed with a compare-and-set on the game version so only one move can be
+    accepted per turn and never against a stale board; when the cached game turns out to be behind
+    the database the move is judged once more against a fresh read. A move on a taken cell is
+    turned away by the unique constraint on the moves table. When the computer is playing its
+    reply is looked up and committed along with the move.
+
     :param game_id: The ID that has been assigned to the game.
     :type game_id: str.
-    :param username: API Request username.
-    :type username: str.
+    :param user: API Request user.
+    :type user: User.
     :param data: Django request data.
     :type data: dict.
     :return: status_message, message, data
     :rtype: str, str, dict
     """
 
-    game = GamesModel.objects.get(id=game_id)
-
-    player = None
-    players = []
-    for i in ["x", "o"]:
-        players.append(str(getattr(game, f"player_{i}")))
-        if str(username) == str(getattr(game, f"player_{i}")):
-            player = i
-
-    if str(None) in players:
-        return "error", "Not all players are ready. Please wait!", {}
-
-    if player is None:
-        return "error", f"Sorry {username} is not apart of this game!", {}
-
     serializer = MoveSerializer(
         data={
             "x": data.get("x"),
             "y": data.get("y"),
-            "player": player,
         },
     )
     if not serializer.is_valid():
+        metrics.move("invalid")
         # todo: make serializer.errors pretty!
         return "error", str(serializer.errors), {}
 
     x = serializer.validated_data.get("x")
     y = serializer.validated_data.get("y")
+    move_save = sync_to_async(_move_save)
 
-    # check to see if the game is over or tied.
-    game_state = getattr(game, "state")
-    if not game_state.startswith("turn_"):
-        if game_state == "winner_x":
-            return "error", "Game is over! Player X is the winner!", {}
-        if game_state == "winner_o":
-            return "error", "Game is over! Player O is the winner!", {}
-        return "error", "Game is over! Ended in Tie!", {}
+    try:
+        game = await game_cache.aget(game_id)
+        fresh = game is None
+        if fresh:
+            game = await game_cache.aload(game_id)
+        if game is None:
+            metrics.move("not_found")
+            return "error", "Game not found!", {}
+
+        reason, error, move = _move_judge(game, user, x, y)
+        moves = None if error is not None else _move_replies(game, move)
+        committed = error is None and await move_save(game.id, game.version, moves)
+        if not committed and not fresh:
+            # the cached game may be behind the database, judge the move against a fresh read
+            game = await game_cache.aload(game_id)
+            reason, error, move = _move_judge(game, user, x, y)
+            moves = None if error is not None else _move_replies(game, move)
+            committed = error is None and await move_save(game.id, game.version, moves)
+        if error is not None:
+            metrics.move(reason)
+            return error
+        if not committed:
+            metrics.move("changed")
+            return _not_your_turn(move["player"])
+    except IntegrityError:
+        metrics.move("taken")
+        return "error", "I am sorry a player already placed a move here!", {}
 
-    if not valid_move(x, y):
-        return (
-            "error",
-            "Move was not valid. Please try a different move!",
-            {},
-        )
+    metrics.move(MOVE_ACCEPTED)
+    _move_apply(game, moves)
+    await game_cache.aset(game)
+    return "ok", moves[-1]["message"], _move_data(moves)
 
-    other_player = "x"
-    if player == "x":
-        other_player = "o"
-    if f"turn_{player}" != getattr(game, "state"):
-        return (
-            "error",
-            f"It is not your turn {player}! Sorry, please wait for {other_player}.",
-            {},
+
+@transaction.atomic
+def _moves_save(game_id: str, user, items: list):
+    """
+    Judge a game's share of a batch of moves in order and commit the accepted ones together.
+
+    The game is read fresh and every accepted move, and the computer's reply to it, is played on
+    top of the previous one, then a single compare-and-set moves the version on by the number of
+    moves and the moves are inserted in bulk.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :param user: API Request user.
+    :type user: User.
+    :param items: index, x, y of each move for this game in batch order.
+    :type items: list.
+    :return: results, game where results pairs each index with its status_message, message, data
+        and game is the game after the moves or None if it does not exist. None when the game
+        changed while it was being judged.
+    :rtype: tuple or None
+    """
+
+    game = game_cache.load(game_id)
+    if game is None:
+        for _ in items:
+            metrics.move("not_found")
+        return [
+            (index, ("error", "Game not found!", {})) for index, _, _ in items
+        ], None
+
+    version = game.version
+    results = []
+    reasons = []
+    accepted = []
+    for index, x, y in items:
+        reason, error, move = _move_judge(game, user, x, y)
+        if error is not None:
+            results.append((index, error))
+            reasons.append(reason)
+            continue
+        moves = _move_replies(game, move)
+        _move_apply(game, moves)
+        accepted.extend(moves)
+        results.append((index, ("ok", moves[-1]["message"], _move_data(moves))))
+        reasons.append(MOVE_ACCEPTED)
+    if accepted and not _move_commit(game.id, version, accepted):
+        return None
+    # only counted once the batch is settled, a batch judged again would count its moves twice
+    for reason in reasons:
+        if reason == MOVE_ACCEPTED:
+            transaction.on_commit(partial(metrics.move, MOVE_ACCEPTED))
+        else:
+            metrics.move(reason)
+    return results, game
+
+
+async def amoves_post(user, data: dict):
+    """
+    A player is making a batch of moves, possibly across many games.
+
+    Every move is validated on its own, the moves of each game are applied in one transaction and
+    a result is handed back for every move in the order they were sent.
+
+    :param user: API Request user.
+    :type user: User.
+    :param data: Django request data.
+    :type data: dict.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
+
+    moves = data.get("moves") if isinstance(data, dict) else None
+    if not isinstance(moves, list) or not moves:
+        return "error", "moves must be a list of moves!", {}
+    if len(moves) > MOVES_BATCH_SIZE:
+        return "error", f"No more than {MOVES_BATCH_SIZE} moves at a time!", {}
+
+    results = [None] * len(moves)
+    games = {}
+    for index, item in enumerate(moves):
+        serializer = MoveBatchSerializer(data=item)
+        if not serializer.is_valid():
+            metrics.move("invalid")
+            # todo: make serializer.errors pretty!
+            results[index] = ("error", str(serializer.errors), {})
+            continue
+        games.setdefault(serializer.validated_data.get("game_id"), []).append(
+            (
+                index,
+                serializer.validated_data.get("x"),
+                serializer.validated_data.get("y"),
+            )
         )
 
-    previous_move = MovesModel.objects.filter(
-        game=game,
-        x=serializer.validated_data.get("x"),
-        y=serializer.validated_data.get("y"),
+    moves_save = sync_to_async(_moves_save)
+    for game_id, items in games.items():
+        try:
+            saved = await moves_save(game_id, user, items)
+            if saved is None:
+                # somebody moved while the batch was judged, judge it against the new game
+                saved = await moves_save(game_id, user, items)
+        except IntegrityError:
+            saved = None
+        if saved is None:
+            for _ in items:
+                metrics.move("changed")
+            changed = ("error", "The game changed, please try again!", {})
+            saved = [(index, changed) for index, _, _ in items], None
+        game_results, game = saved
+        if game is not None:
+            await game_cache.aset(game)
+        for index, result in game_results:
+            results[index] = result
+
+    return (
+        "ok",
+        "Moves were judged!",
+        {
+            "results": [
+                {"status": status_message, "message": message, "data": move}
+                for status_message, message, move in results
+            ]
+        },
     )
-    if previous_move:
-        return "error", "I am sorry a player already placed a move here!", {}
-    serializer.save(game=game)
 
-    winner = get_winner(game_id)
-    if winner is None:
-        message = f"Move accepted! Now it is {other_player}'s turn."
-        setattr(game, "state", f"turn_{other_player}")
-    elif winner in ["x", "o"]:
-        message = f"Congratulations {player} you are the winner!"
-        setattr(game, "state", f"winner_{player}")
-    elif winner == "tie":
-        message = "Full board! Game ended in a tie."
-        setattr(game, "state", "tie")
-    else:
-        return "error", f"Something went wrong! {winner}", {}
-    game.save()
-    return "ok", message, serializer.data
+
+def _cursor_decode(cursor: str):
+    """
+    Unpack a games listing cursor into the created time and id of the last game seen.
+
+    :param cursor: Opaque cursor handed out by agames_get.
+    :type cursor: str.
+    :return: created, id
+    :rtype: datetime, UUID
+    """
+    created, game_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created), UUID(game_id)
 
 
-def games_get():
+def _cursor_encode(game: GamesModel) -> str:
     """
-    Get all the games in the database.
+    Pack the created time and id of a game into an opaque games listing cursor.
 
+    :param game: Last game on the page.
+    :type game: GamesModel.
+    :return: Cursor for the next page.
+    :rtype: str.
+    """
+    return urlsafe_b64encode(
+        f"{game.created.isoformat()}|{game.id.hex}".encode()
+    ).decode()
+
+
+async def agames_get(params: dict):
+    """
+    Get a page of games, newest first, walking the pages with a keyset cursor.
+
+    :param params: Query parameters, any of cursor, limit, state, player and open.
+    :type params: dict.
     :return: status_message, message, data
     :rtype: str, str, dict
     """
-    # todo: setup filters and limits
-    games = GamesModel.objects.all()
-    serializer = GameSerializer(games, many=True)
-    return "ok", "Here are the games!", serializer.data
+    try:
+        limit = int(params.get("limit", GAMES_PAGE_SIZE))
+    except ValueError:
+        return "error", "limit must be a number!", {}
+    if limit < 1:
+        return "error", "limit must be at least 1!", {}
+    limit = min(limit, GAMES_MAX_PAGE_SIZE)
+
+    games = GamesModel.objects.select_related("player_o", "player_x").order_by(
+        "-created", "-id"
+    )
+    if params.get("state"):
+        games = games.filter(state=params.get("state"))
+    if params.get("player"):
+        try:
+            player = int(params.get("player"))
+        except ValueError:
+            return "error", "player must be a user id!", {}
+        games = games.filter(Q(player_x_id=player) | Q(player_o_id=player))
+    if params.get("open", "").lower() in ["1", "true"]:
+        games = games.filter(
+            Q(player_x__isnull=True) | Q(player_o__isnull=True)
+        ).exclude(Q(ai="x", player_o__isnull=False) | Q(ai="o", player_x__isnull=False))
+    if params.get("cursor"):
+        try:
+            created, game_id = _cursor_decode(params.get("cursor"))
+        except ValueError:
+            return "error", "cursor is not valid!", {}
+        games = games.filter(
+            Q(created__lt=created) | Q(created=created, id__lt=game_id)
+        )
+
+    page = [game async for game in games[: limit + 1]]
+    cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        cursor = _cursor_encode(page[-1])
+    serializer = GameSerializer(page, many=True)
+    return "ok", "Here are the games!", {"results": serializer.data, "next": cursor}
 
 
-def games_post(data: dict):
+async def agames_post(data: dict):
     """
     Create a game match.
 
@@ -251,39 +668,355 @@ def games_post(data: dict):
     if not serializer.is_valid():
         # todo: make serializer.errors pretty!
         return "error", str(serializer.errors), {}
-    serializer.save()
+    serializer.instance = await GamesModel.objects.acreate(**serializer.validated_data)
+    metrics.game_created()
     return "ok", "Game was created!", serializer.data
 
 
-def game_put(game_id: str, user_id: str, data: dict):
+async def agames_bulk_post(data: dict):
     """
-    Seat the players at the game board.
+    Create many game matches with their players already seated.
 
-    :param game_id:
-    :param user_id:
-    :param data:
-    :return:
+    The games are validated together, the players are looked up in one query and the games are
+    inserted in bulk, nothing is created unless every game is valid.
+
+    :param data: Django request data.
+    :type data: dict.
+    :return: status_message, message, data
+    :rtype: str, str, dict
     """
+    games = data.get("games") if isinstance(data, dict) else None
+    if isinstance(games, list) and len(games) > GAMES_BULK_SIZE:
+        return "error", f"No more than {GAMES_BULK_SIZE} games at a time!", {}
+    serializer = GamesBulkSerializer(data=data)
+    if not serializer.is_valid():
+        # todo: make serializer.errors pretty!
+        return "error", str(serializer.errors), {}
+    games = serializer.validated_data.get("games")
 
-    game = GamesModel.objects.get(id=game_id)
-    user = UserModel.objects.get(id=user_id)
+    players = {game[f"player_{symbol}_id"] for game in games for symbol in ["x", "o"]}
+    found = UserModel.objects.filter(id__in=players).values_list("id", flat=True)
+    missing = players - {player async for player in found}
+    if missing:
+        return "error", f"Players {sorted(missing)} do not exist!", {}
 
-    symbol = data.get("player")
-    if getattr(game, f"player_{symbol}") is not None:
-        return "error", f"Someone is already {symbol}", {}
-    setattr(game, f"player_{symbol}", user)
+    created = await GamesModel.objects.abulk_create(
+        [GamesModel(**game) for game in games]
+    )
+    metrics.game_created(len(created))
+    return (
+        "ok",
+        f"{len(created)} games were created!",
+        {"ids": [str(game.id) for game in created]},
+    )
+
+
+async def agame_put(game_id: str, user, data: dict):
+    """
+    Seat the players at the game board, the computer opens the game once seated if it plays x.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :param user: API Request user.
+    :type user: User.
+    :param data: Django request data.
+    :type data: dict.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
 
-    players = []
-    for i in ["player_x", "player_o"]:
-        players.append(str(getattr(game, i)))
+    game = await GamesModel.objects.aget(id=game_id)
 
-    if len(list(set(players))) != 2:
+    symbol = data.get("player")
+    if game.ai == symbol:
+        return "error", f"The computer is already {symbol}", {}
+    if getattr(game, f"player_{symbol}_id") is not None:
+        return "error", f"Someone is already {symbol}", {}
+    other = "o" if symbol == "x" else "x"
+    if getattr(game, f"player_{other}_id") == user.id:
         return "error", "Cannot be the same user for both players!", {}
     # todo: send back the game as data! this a nice to have!
-    game.save()
+    # the seat is claimed only while it is still free, so of two players racing for it one wins
+    # and the version is bumped in the database rather than from the row read above
+    claimed = (
+        await GamesModel.objects.filter(
+            id=game.id, **{f"player_{symbol}__isnull": True}
+        )
+        .exclude(**{f"player_{other}": user})
+        .aupdate(**{f"player_{symbol}": user}, version=F("version") + 1)
+    )
+    if not claimed:
+        return "error", f"Someone is already {symbol}", {}
+    setattr(game, f"player_{symbol}", user)
+    game.version = (
+        await GamesModel.objects.filter(id=game.id)
+        .values_list("version", flat=True)
+        .aget()
+    )
+    await game_cache.adelete(game.id)
+    hub.publish(
+        str(game.id),
+        "seat",
+        {
+            "version": game.version,
+            "player": symbol,
+            "id": user.id,
+            "username": user.username,
+        },
+    )
+
+    if _seated(game, "x") and _seated(game, "o") and not await _ai_open(game):
+        return "error", "The computer could not open the game, please try again!", {}
     return "ok", f"Set as player {symbol}", {}
 
 
+async def _ai_open(game: GamesModel) -> bool:
+    """
+    Commit the computer's opening move once both seats are taken, if the computer plays x.
+
+    The move is committed with a compare-and-set on the game version, when the game changed in
+    between it is read again and the move tried once more, like a batch of moves.
+
+    :param game: Game after the last seat was taken.
+    :type game: GamesModel.
+    :return: Boolean, False when the computer still has to move and its move was not committed.
+    :rtype: bool.
+    """
+
+    move_save = sync_to_async(_move_save)
+    for attempt in range(2):
+        if attempt:
+            game = await GamesModel.objects.aget(id=game.id)
+        reply = _ai_move(game, game.state, get_board(game))
+        if reply is None:
+            return True
+        if await move_save(game.id, game.version, [reply]):
+            await game_cache.adelete(game.id)
+            return True
+    return False
+
+
+async def agame_analysis(game_id: str):
+    """
+    Evaluate every empty cell of a 3x3 game for the player to move, looked up in the solver table.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
+
+    game = await game_cache.afetch(game_id)
+    if game is None:
+        return "error", "Game not found!", {}
+    if game.size != SOLVER_SIZE or game.win_length != SOLVER_SIZE:
+        return "error", "Analysis is only available for 3x3 games!", {}
+    if not game.state.startswith("turn_"):
+        return "ok", "Game is over!", {"player": None, "cells": []}
+    return (
+        "ok",
+        "Here is the analysis!",
+        {"player": game.state[len("turn_") :], "cells": analyse(get_board(game))},
+    )
+
+
+async def agame_replay(game_id: str, ply=None):
+    """
+    Rebuild the board of a game as it stood after one of its plies.
+
+    Only the moves between the ply and the nearer end of the game are read, by a range scan on the
+    game's plies: a ply in the first half is played onto an empty board and a later one is reached
+    by taking the moves after it back off the current board.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :param ply: Number of moves played, the latest when None.
+    :type ply: str or int or None.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
+
+    game = await game_cache.afetch(game_id)
+    if game is None:
+        return "error", "Game not found!", {}
+    if ply is None:
+        ply = game.moves_count
+    else:
+        try:
+            ply = int(ply)
+        except ValueError:
+            return "error", "ply must be a number!", {}
+    if not 0 <= ply <= game.moves_count:
+        return "error", f"ply must be between 0 and {game.moves_count}!", {}
+
+    moves = MovesModel.objects.filter(game_id=game.id)
+    move = None
+    if ply * 2 < game.moves_count:
+        board = Board(game.size, game.win_length)
+        async for played in moves.filter(ply__lte=ply):
+            board.place(played.x, played.y, played.player)
+            if played.ply == ply:
+                move = played
+    else:
+        board = get_board(game)
+        async for played in moves.filter(ply__gte=ply):
+            if played.ply == ply:
+                move = played
+            else:
+                board.clear(played.x, played.y)
+
+    winner = board.winner()
+    if winner in ["x", "o"]:
+        state = f"winner_{winner}"
+    elif winner == "tie":
+        state = "tie"
+    else:
+        state = "turn_x" if ply % 2 == 0 else "turn_o"
+    return (
+        "ok",
+        "Here is the game at that ply!",
+        {
+            "ply": ply,
+            "moves_count": game.moves_count,
+            "state": state,
+            "move": MoveSerializer(move).data if move is not None else None,
+            "moves": board.to_moves(),
+        },
+    )
+
+
+async def agame_moves_since(game_id: str, since):
+    """
+    Gather the moves of a game played after a ply the client already has, with its current state.
+
+    The new moves are read by a range scan on the game's plies and nothing is read at all when
+    the client is up to date, so the cost follows the moves made since rather than the board size.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :param since: Number of moves the client already has.
+    :type since: str or int.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
+
+    game = await game_cache.afetch(game_id)
+    if game is None:
+        return "error", "Game not found!", {}
+    try:
+        since = int(since)
+    except ValueError:
+        return "error", "since must be a number!", {}
+    if not 0 <= since <= game.moves_count:
+        return "error", f"since must be between 0 and {game.moves_count}!", {}
+
+    moves = []
+    if since < game.moves_count:
+        newer = MovesModel.objects.filter(game_id=game.id, ply__gt=since).order_by(
+            "ply"
+        )
+        moves = [move async for move in newer]
+    return (
+        "ok",
+        "Here are the new moves!",
+        {
+            "since": since,
+            "moves_count": game.moves_count,
+            "state": game.state,
+            "moves": MoveSerializer(moves, many=True).data,
+        },
+    )
+
+
+def _evaluate(boards: list, size: int, win_length: int):
+    """
+    Classify boards sent as encoded strings or lists of cells.
+
+    :param boards: Boards as sent.
+    :type boards: list.
+    :param size: Number of rows and columns on the boards.
+    :type size: int.
+    :param win_length: Marks in a row needed to win.
+    :type win_length: int.
+    :return: Outcome of every board, see evaluator.OUTCOMES.
+    :rtype: numpy.ndarray.
+    """
+
+    if all(isinstance(board, str) for board in boards):
+        boards = decode(boards, size)
+    else:
+        boards = np.array(boards, dtype=np.int8)
+    return evaluate(boards, size, win_length)
+
+
+async def aevaluate_post(data: dict):
+    """
+    Classify a batch of boards that do not need to belong to any game.
+
+    The boards are checked all at once by the evaluator, no game is read or written.
+
+    :param data: Django request data.
+    :type data: dict.
+    :return: status_message, message, data
+    :rtype: str, str, dict
+    """
+
+    boards = data.get("boards") if isinstance(data, dict) else None
+    if isinstance(boards, list) and len(boards) > EVALUATE_MAX_BOARDS:
+        return "error", f"No more than {EVALUATE_MAX_BOARDS} boards at a time!", {}
+    serializer = EvaluateSerializer(data=data)
+    if not serializer.is_valid():
+        # todo: make serializer.errors pretty!
+        return "error", str(serializer.errors), {}
+    size = serializer.validated_data.get("size")
+    win_length = serializer.validated_data.get("win_length")
+    boards = serializer.validated_data.get("boards")
+
+    try:
+        # thousands of boards are numpy work, run off the event loop so other requests go on
+        outcomes = await sync_to_async(_evaluate, thread_sensitive=False)(
+            boards, size, win_length
+        )
+    except (OverflowError, TypeError, ValueError):
+        return "error", f"Boards need {size * size} cells of x, o or empty each!", {}
+    return (
+        "ok",
+        "Boards were evaluated!",
+        {"results": np.array(OUTCOMES)[outcomes].tolist()},
+    )
+
+
+async def agame_version(game_id: str):
+    """
+    Look up just the version and state of a game, enough to answer a conditional request.
+
+    The whole game is cached on a miss so building the full response afterwards is a cache hit.
+
+    :param game_id: The ID that has been assigned to the game.
+    :type game_id: str.
+    :return: version, state or None if the game does not exist.
+    :rtype: tuple or None.
+    """
+
+    game = await game_cache.afetch(game_id)
+    if game is None:
+        return None
+    return game.version, game.state
+
+
+def get_board(game: GamesModel) -> Board:
+    """
+    Build the board for a game from its encoded board column.
+
+    :param game: The game to build the board for.
+    :type game: GamesModel.
+    :return: Board of the game.
+    :rtype: Board.
+    """
+
+    return Board.decode(game.board, game.size, game.win_length)
+
+
 def get_moves(game_id: str) -> list:
     """
     Gather all the moves in the game performed or not.
@@ -294,14 +1027,8 @@ def get_moves(game_id: str) -> list:
     :rtype: list.
     """
 
-    game = GamesModel.objects.get(id=game_id)
-    moves_object = MovesModel.objects.filter(game=game)
-    moves_serializer = MoveSerializer(moves_object, many=True)
-
-    moves = [[None] * 3 for _ in range(3)]
-    for move in moves_serializer.data:
-        moves[move["y"]][move["x"]] = move["player"]
-    return moves
+    game = GamesModel.objects.only("size", "win_length", "board").get(id=game_id)
+    return get_board(game).to_moves()
 
 
 def get_winner(game_id: str) -> str:
@@ -313,36 +1040,26 @@ def get_winner(game_id: str) -> str:
     :return: The winning player, tie or None if the matches is still playing.
     :rtype: str.
     """
-    moves = get_moves(game_id)
-
-    horizontal = _check_horizontal(moves)
-    if horizontal is not None:
-        return horizontal
-    vertical = _check_vertical(moves)
-    if vertical is not None:
-        return vertical
-    diagonal = _check_diagonal(moves)
-    if diagonal is not None:
-        return diagonal
-    if _check_full(moves):
+
+    game = GamesModel.objects.only("size", "win_length", "board").get(id=game_id)
+    winner = get_board(game).winner()
+    if winner == "tie":
         log.debug("We have a tie!")
-        return "tie"
+    return winner
 
 
-def valid_move(x: int, y: int) -> bool:
+def valid_move(x: int, y: int, size: int = SIZE) -> bool:
     """
-
-    :param x:
-    :param y:
-    :return:
+    See if a move lands on the board.
+
+    :param x: Column of the move.
+    :type x: int.
+    :param y: Row of the move.
+    :type y: int.
+    :param size: Number of rows and columns on the board.
+    :type size: int.
+    :return: Boolean.
+    :rtype: bool.
     """
-    min_x = 0
-    max_x = 2  # think about maybe making this dynamic?
-    min_y = 0
-    max_y = 2  # think about maybe making this dynamic?
 
-    if x < min_x or x > max_x:
-        return False
-    if y < min_y or y > max_y:
-        return False
-    return True
+    return 0 <= x < size and 0 <= y < size
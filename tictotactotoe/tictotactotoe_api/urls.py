@@ -17,6 +17,8 @@ limitations under the License.
 from django.urls import path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.urlpatterns import format_suffix_patterns
+from .views import viewevents
+from .views import viewstats
 from .views import viewtictactoe
 from .views import viewauth
 
@@ -25,6 +27,10 @@ urlpatterns = [
         "v1/games",
         viewtictactoe.GamesView.as_view(),
     ),
+    path(
+        "v1/games/bulk",
+        viewtictactoe.GamesBulkView.as_view(),
+    ),
     path(
         "v1/games/<str:game_id>",
         viewtictactoe.GameView.as_view(),
@@ -33,6 +39,46 @@ urlpatterns = [
         "v1/games/<str:game_id>/moves",
         viewtictactoe.MovesView.as_view(),
     ),
+    path(
+        "v1/games/<str:game_id>/analysis",
+        viewtictactoe.AnalysisView.as_view(),
+    ),
+    path(
+        "v1/games/<str:game_id>/replay",
+        viewtictactoe.ReplayView.as_view(),
+    ),
+    path(
+        "v1/moves",
+        viewtictactoe.MovesBatchView.as_view(),
+    ),
+    path(
+        "v1/evaluate",
+        viewtictactoe.EvaluateView.as_view(),
+    ),
+    path(
+        "v1/games/<str:game_id>/events",
+        viewevents.GameEventsView.as_view(),
+    ),
+    path(
+        "v1/stats/cache",
+        viewstats.CacheStatsView.as_view(),
+    ),
+    path(
+        "v1/stats/loop",
+        viewstats.LoopStatsView.as_view(),
+    ),
+    path(
+        "v1/stats/profiles",
+        viewstats.ProfilesView.as_view(),
+    ),
+    path(
+        "v1/stats/profiles/<str:profile_id>",
+        viewstats.ProfileView.as_view(),
+    ),
+    path(
+        "v1/stats/sampler",
+        viewstats.SamplerView.as_view(),
+    ),
     path(
         "v1/login",
         viewauth.LoginApiView.as_view(),
@@ -15,9 +15,20 @@ limitations under the License.
 """
 
 import logging
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from rest_framework.generics import GenericAPIView
 from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from ..cache import game_cache
+from ..lag import loop_lag
+from ..profiling import request_profiler
+
+# A finished game never changes again so clients can hold on to it for a year.
+FINISHED_MAX_AGE = 365 * 24 * 60 * 60
+FINISHED_STATES = ("winner_x", "winner_o", "tie")
 
 
 class TicToTacToToeAPIView(GenericAPIView):
@@ -31,6 +42,25 @@ class TicToTacToToeAPIView(GenericAPIView):
         self.log = logging.getLogger("api")
         super().__init__()
 
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Dispatch the request, under cProfile when a staff user asks for it and profiling is on.
+
+        :param request: Django request object.
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+        profile = request_profiler.start(request)
+        if profile is None:
+            return super().dispatch(request, *args, **kwargs)
+        response = None
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            profile.stop(response)
+        return response
+
     @staticmethod
     def _response(response_code, data=None, message="", status_message="ok"):
         if data is None:
@@ -43,3 +73,99 @@ class TicToTacToToeAPIView(GenericAPIView):
             },
             status=response_code,
         )
+
+    @staticmethod
+    def _not_modified(request, version: int):
+        """
+        Answer a conditional request for a game resource without building it.
+
+        :param request: Django request object.
+        :param version: Current version of the game.
+        :type version: int.
+        :return: Not modified response or None when the resource needs to be sent.
+        """
+        return get_conditional_response(request, etag=quote_etag(str(version)))
+
+    @staticmethod
+    def _cache(response, version: int, state: str):
+        """
+        Tag a game resource with its version and say how long it can be cached for.
+
+        :param response: Response for the game resource.
+        :param version: Version of the game the response was built from.
+        :type version: int.
+        :param state: State of the game the response was built from.
+        :type state: str.
+        :return: Response with ETag and Cache-Control set.
+        """
+        response["ETag"] = quote_etag(str(version))
+        if state in FINISHED_STATES:
+            patch_cache_control(
+                response, private=True, max_age=FINISHED_MAX_AGE, immutable=True
+            )
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class TicToTacToToeAsyncAPIView(TicToTacToToeAPIView):
+    """
+    API view whose handlers are coroutines served straight on the event loop.
+
+    DRF only dispatches sync handlers, so this dispatch mirrors APIView.dispatch and awaits the
+    handler. The session user is loaded with the async auth API before DRF checks permissions;
+    when there is none, the checks run in a thread as other authenticators may hit the database.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Authenticate, check permissions and await the handler for the request, under cProfile when
+        a staff user asks for it and profiling is on.
+
+        :param request: Django request object.
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+        loop_lag.start()
+        checking = game_cache.start_request()
+        try:
+            request.user = await request.auser()
+            profile = request_profiler.start(request)
+            if profile is None:
+                return await self._dispatch(request, *args, **kwargs)
+            response = None
+            try:
+                response = await self._dispatch(request, *args, **kwargs)
+            finally:
+                profile.stop(response)
+            return response
+        finally:
+            game_cache.end_request(checking)
+
+    async def _dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if request._request.user.is_authenticated:
+                self.initial(request, *args, **kwargs)
+            else:
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,107 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from ..events import format_event, hub
+from ..lag import loop_lag
+from ..models import Games as GamesModel
+
+# Seconds between keep-alive comments so proxies do not close an idle stream.
+EVENTS_KEEPALIVE = 15
+
+
+class GameEventsView(View):
+    """
+    Live updates for a specific Tic-Tac-Toe game as server-sent events.
+
+    This is a plain async Django view rather than a DRF one so the stream is served on the event
+    loop without holding a thread per listener.
+    """
+
+    def __init__(self, **kwargs):
+        self.log = logging.getLogger("api")
+        super().__init__(**kwargs)
+
+    async def get(self, request, **kwargs):
+        """
+        Stream the events of a game, starting with a sync event holding the current state.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Event stream response.
+        """
+
+        loop_lag.start()
+        user = await request.auser()
+        if not user.is_authenticated:
+            return self._response(403, "Permission Denied")
+        try:
+            game_id = str(UUID(kwargs.get("game_id")))
+        except ValueError:
+            return self._response(404, "Game not found!")
+        if not await GamesModel.objects.filter(id=game_id).aexists():
+            return self._response(404, "Game not found!")
+
+        self.log.debug("User %s is listening to game %s!", user.username, game_id)
+        response = StreamingHttpResponse(
+            self._stream(game_id),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    async def _stream(game_id: str):
+        # listen before reading the game so nothing committed in between goes unheard, events
+        # the sync event already covers are skipped by their version
+        queue = hub.subscribe(game_id)
+        try:
+            game = (
+                await GamesModel.objects.filter(id=game_id)
+                .values("state", "moves_count", "version")
+                .afirst()
+            )
+            if game is None:
+                return
+            yield format_event("sync", game)
+            while True:
+                try:
+                    version, message = await asyncio.wait_for(
+                        queue.get(), EVENTS_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if version is None or version > game["version"]:
+                    yield message
+        finally:
+            hub.unsubscribe(game_id, queue)
+
+    @staticmethod
+    def _response(response_code, message):
+        return JsonResponse(
+            data={
+                "data": {},
+                "status": "error",
+                "message": message,
+            },
+            status=response_code,
+        )
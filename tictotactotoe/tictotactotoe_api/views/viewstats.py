@@ -0,0 +1,249 @@
+"""
+Copyright 2024 Wes Hendrickson
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from django.http import HttpResponse
+from django.views import View
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from .base import TicToTacToToeAPIView
+from ..cache import game_cache
+from ..lag import loop_lag
+from ..metrics import metrics
+from ..profiling import request_profiler, stack_sampler
+from ..serializers import (
+    CacheStatsSerializer,
+    LoopStatsSerializer,
+    ProfileSerializer,
+    ProfilesSerializer,
+    SamplerSerializer,
+)
+
+
+class CacheStatsView(TicToTacToToeAPIView):
+    """
+    Game cache counters for the worker answering the request.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = CacheStatsSerializer
+
+    def get(self, request, **kwargs):
+        """
+        Hits and misses of the game cache.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        return self._response(
+            data=game_cache.stats(),
+            response_code=status.HTTP_200_OK,
+            message="Here are the cache stats!",
+            status_message="ok",
+        )
+
+
+class LoopStatsView(TicToTacToToeAPIView):
+    """
+    Event loop lag for the worker answering the request.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = LoopStatsSerializer
+
+    def get(self, request, **kwargs):
+        """
+        How late the event loop has been waking up, in seconds.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        return self._response(
+            data=loop_lag.stats(),
+            response_code=status.HTTP_200_OK,
+            message="Here are the event loop stats!",
+            status_message="ok",
+        )
+
+
+class MetricsView(View):
+    """
+    Request, query and game metrics of the worker answering the request, for Prometheus to scrape.
+
+    This is a plain async Django view rather than a DRF one since the body is the Prometheus text
+    format, it sits outside /api so the ingress does not expose it.
+    """
+
+    async def get(self, request, **kwargs):
+        """
+        Every metric in the Prometheus text exposition format.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Metrics text response.
+        """
+
+        return HttpResponse(
+            metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class ProfilesView(TicToTacToToeAPIView):
+    """
+    Request profiling for the worker answering the request.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = ProfilesSerializer
+
+    def get(self, request, **kwargs):
+        """
+        Whether requests can be profiled and the requests profiled so far.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        return self._response(
+            data=request_profiler.stats(),
+            response_code=status.HTTP_200_OK,
+            message="Here are the profiles!",
+            status_message="ok",
+        )
+
+    def put(self, request, **kwargs):
+        """
+        Switch request profiling on or off.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        serializer = ProfilesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return self._response(
+                response_code=status.HTTP_400_BAD_REQUEST,
+                message=str(serializer.errors),
+                status_message="error",
+            )
+        request_profiler.enabled = serializer.validated_data["enabled"]
+        self.log.info(
+            "User %s switched request profiling %s!",
+            request.user.username,
+            "on" if request_profiler.enabled else "off",
+        )
+        return self._response(
+            data=request_profiler.stats(),
+            response_code=status.HTTP_202_ACCEPTED,
+            message="Request profiling was switched!",
+            status_message="ok",
+        )
+
+
+class ProfileView(TicToTacToToeAPIView):
+    """
+    A request profiled by the worker answering the request.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = ProfileSerializer
+
+    @extend_schema(operation_id="v1_stats_profile_retrieve")
+    def get(self, request, **kwargs):
+        """
+        The hottest functions of a profiled request.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        profile = request_profiler.get(kwargs.get("profile_id"))
+        if profile is None:
+            return self._response(
+                response_code=status.HTTP_404_NOT_FOUND,
+                message="Profile not found!",
+                status_message="error",
+            )
+        return self._response(
+            data=profile,
+            response_code=status.HTTP_200_OK,
+            message="Here is the profile!",
+            status_message="ok",
+        )
+
+
+class SamplerView(TicToTacToToeAPIView):
+    """
+    Stack sampler for the worker answering the request.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = SamplerSerializer
+
+    def get(self, request, **kwargs):
+        """
+        Stacks sampled so far, ready for a flame graph.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        return self._response(
+            data=stack_sampler.stats(),
+            response_code=status.HTTP_200_OK,
+            message="Here are the sampled stacks!",
+            status_message="ok",
+        )
+
+    def put(self, request, **kwargs):
+        """
+        Start sampling afresh or stop, the stacks are kept until the next start.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        serializer = SamplerSerializer(data=request.data)
+        if not serializer.is_valid():
+            return self._response(
+                response_code=status.HTTP_400_BAD_REQUEST,
+                message=str(serializer.errors),
+                status_message="error",
+            )
+        if serializer.validated_data["running"]:
+            stack_sampler.start(serializer.validated_data.get("interval"))
+        else:
+            stack_sampler.stop()
+        self.log.info(
+            "User %s switched the stack sampler %s!",
+            request.user.username,
+            "on" if stack_sampler.running else "off",
+        )
+        return self._response(
+            data=stack_sampler.stats(),
+            response_code=status.HTTP_202_ACCEPTED,
+            message="The stack sampler was switched!",
+            status_message="ok",
+        )
@@ -17,15 +17,37 @@ limitations under the License.
 import sys
 import traceback
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema
-from .base import TicToTacToToeAPIView
-from ..tictactoe import game_get, game_post, get_moves, games_get, games_post, game_put
-from ..serializers import GameSerializer, MoveSerializer
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from .base import TicToTacToToeAsyncAPIView
+from ..tictactoe import (
+    agame_analysis,
+    agame_get,
+    agame_moves_since,
+    agame_post,
+    agame_put,
+    agame_replay,
+    agame_version,
+    aevaluate_post,
+    agames_bulk_post,
+    agames_get,
+    agames_post,
+    amoves_post,
+)
+from ..serializers import (
+    AnalysisSerializer,
+    EvaluateSerializer,
+    GameSerializer,
+    GamesBulkSerializer,
+    MoveSerializer,
+    MovesBatchSerializer,
+    ReplaySerializer,
+)
 from ..models import Moves as MovesModel
 
 
-class GameView(TicToTacToToeAPIView):
+class GameView(TicToTacToToeAsyncAPIView):
     """
     Specific Tic-Tac-Toe game.
     """
@@ -34,7 +56,7 @@ class GameView(TicToTacToToeAPIView):
     serializer_class = GameSerializer
 
     @extend_schema(operation_id="v1_game_retrieve")
-    def get(self, request, **kwargs):
+    async def get(self, request, **kwargs):
         """
         Game details.
 
@@ -49,20 +71,28 @@ class GameView(TicToTacToToeAPIView):
         response_code = status.HTTP_404_NOT_FOUND
         game_id = kwargs.get("game_id")
 
-        data = game_get(game_id)
+        current = await agame_version(game_id)
+        if current is not None:
+            not_modified = self._not_modified(request, current[0])
+            if not_modified is not None:
+                return self._cache(not_modified, *current)
+
+        data = await agame_get(game_id) if current is not None else {}
         if data:
             message = "Look at this awesome game!"
             status_message = "ok"
             response_code = status.HTTP_200_OK
-            data["moves"] = get_moves(game_id)
-        return self._response(
+        response = self._response(
             data=data,
             message=message,
             response_code=response_code,
             status_message=status_message,
         )
+        if data:
+            return self._cache(response, data["version"], data["state"])
+        return response
 
-    def put(self, request, **kwargs):
+    async def put(self, request, **kwargs):
         """
         Update game.
 
@@ -73,9 +103,9 @@ class GameView(TicToTacToToeAPIView):
 
         self.log.debug("User %s wants the seat!", request.user.username)
         response_code = status.HTTP_400_BAD_REQUEST
-        status_message, message, data = game_put(
+        status_message, message, data = await agame_put(
             kwargs.get("game_id"),
-            request.user.id,
+            request.user,
             request.data,
         )
         if status_message == "ok":
@@ -88,7 +118,7 @@ class GameView(TicToTacToToeAPIView):
         )
 
 
-class GamesView(TicToTacToToeAPIView):
+class GamesView(TicToTacToToeAsyncAPIView):
     """
     List all the Tic-Tac-Toe games.
     """
@@ -96,10 +126,22 @@ class GamesView(TicToTacToToeAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = GameSerializer
 
-    @extend_schema(operation_id="v1_games_retrieve")
-    def get(self, request, **kwargs):
+    @extend_schema(
+        operation_id="v1_games_retrieve",
+        parameters=[
+            OpenApiParameter("cursor", str),
+            OpenApiParameter("limit", int),
+            OpenApiParameter("state", str),
+            OpenApiParameter("player", int),
+            OpenApiParameter("open", bool),
+        ],
+    )
+    async def get(self, request, **kwargs):
         """
-        Multiple game details.
+        Multiple game details, a page at a time.
+
+        Query parameters: cursor from the previous page's next, limit (at most 100), state,
+        player (user id) and open (true for games with an empty seat).
 
         :param request: Django request object.
         :param kwargs: Keyword arguments.
@@ -108,7 +150,7 @@ class GamesView(TicToTacToToeAPIView):
 
         self.log.debug("Look at %s getting the games!", request.user.username)
         response_code = status.HTTP_400_BAD_REQUEST
-        status_message, message, data = games_get()
+        status_message, message, data = await agames_get(request.query_params)
         if status_message == "ok":
             response_code = status.HTTP_200_OK
         return self._response(
@@ -118,7 +160,7 @@ class GamesView(TicToTacToToeAPIView):
             status_message=status_message,
         )
 
-    def post(self, request, **kwargs):
+    async def post(self, request, **kwargs):
         """
         Create a game.
 
@@ -129,7 +171,7 @@ class GamesView(TicToTacToToeAPIView):
 
         self.log.debug("New game was received.")
         response_code = status.HTTP_400_BAD_REQUEST
-        status_message, message, data = games_post(request.data)
+        status_message, message, data = await agames_post(request.data)
         if status_message == "ok":
             response_code = status.HTTP_201_CREATED
         return self._response(
@@ -140,7 +182,37 @@ class GamesView(TicToTacToToeAPIView):
         )
 
 
-class MovesView(TicToTacToToeAPIView):
+class GamesBulkView(TicToTacToToeAsyncAPIView):
+    """
+    Create Tic-Tac-Toe games in bulk, such as a tournament round.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = GamesBulkSerializer
+
+    async def post(self, request, **kwargs):
+        """
+        Create games with both players seated and hand back their ids in order.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        self.log.debug("User %s is creating games in bulk!", request.user.username)
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await agames_bulk_post(request.data)
+        if status_message == "ok":
+            response_code = status.HTTP_201_CREATED
+        return self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )
+
+
+class MovesView(TicToTacToToeAsyncAPIView):
     """
     Moves for a specific Tic-Tac-Toe game.
     """
@@ -148,9 +220,19 @@ class MovesView(TicToTacToToeAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = MoveSerializer
 
-    def get(self, request, **kwargs):
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                int,
+                description="Only the moves after this ply along with the state of the game, "
+                "no content when there are none.",
+            )
+        ]
+    )
+    async def get(self, request, **kwargs):
         """
-        Gather moves for a specific game.
+        Gather moves for a specific game, or only the ones a client does not have yet.
 
         :param request: Django request object.
         :param kwargs: Keyword arguments.
@@ -158,16 +240,66 @@ class MovesView(TicToTacToToeAPIView):
         """
 
         self.log.debug("Look at %s wants the moves!", request.user.username)
-        queryset = MovesModel.objects.filter(game__id=kwargs.get("game_id"))
-        serializer = MoveSerializer(queryset, many=True)
-        return self._response(
+        game_id = kwargs.get("game_id")
+        current = await agame_version(game_id)
+        if current is not None:
+            not_modified = self._not_modified(request, current[0])
+            if not_modified is not None:
+                return self._cache(not_modified, *current)
+
+        since = request.query_params.get("since")
+        if since is not None:
+            return await self._since(game_id, since, current)
+
+        moves = [
+            move
+            async for move in MovesModel.objects.filter(game__id=game_id).order_by(
+                "ply"
+            )
+        ]
+        serializer = MoveSerializer(moves, many=True)
+        response = self._response(
             data=serializer.data,
             response_code=status.HTTP_200_OK,
             message="ok",
             status_message="Here are the moves!",
         )
+        if current is not None:
+            return self._cache(response, *current)
+        return response
 
-    def post(self, request, **kwargs):
+    async def _since(self, game_id: str, since: str, current: tuple):
+        """
+        The moves after a ply, no content when the client is up to date.
+
+        :param game_id: The ID that has been assigned to the game.
+        :type game_id: str.
+        :param since: Number of moves the client already has.
+        :type since: str.
+        :param current: Version and state of the game, None when it does not exist.
+        :type current: tuple or None.
+        :return: Api Response.
+        """
+
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await agame_moves_since(game_id, since)
+        if current is None:
+            response_code = status.HTTP_404_NOT_FOUND
+        elif status_message == "ok" and not data["moves"]:
+            return self._cache(Response(status=status.HTTP_204_NO_CONTENT), *current)
+        elif status_message == "ok":
+            response_code = status.HTTP_200_OK
+        response = self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )
+        if status_message == "ok":
+            return self._cache(response, *current)
+        return response
+
+    async def post(self, request, **kwargs):
         """
         Making a moving on a specific game.
 
@@ -176,16 +308,15 @@ class MovesView(TicToTacToToeAPIView):
         :return: Api Response.
         """
 
-        username = request.user.username
-        self.log.debug("User %s is making a move!", username)
+        self.log.debug("User %s is making a move!", request.user.username)
         response_code = status.HTTP_400_BAD_REQUEST
         status_message = "error"
         data = {}
         # todo: this wrapping needs to happen everywhere!
         try:
-            status_message, message, data = game_post(
+            status_message, message, data = await agame_post(
                 kwargs.get("game_id"),
-                username,
+                request.user,
                 request.data,
             )
         except Exception as e:
@@ -210,3 +341,150 @@ class MovesView(TicToTacToToeAPIView):
             message=message,
             status_message=status_message,
         )
+
+
+class AnalysisView(TicToTacToToeAsyncAPIView):
+    """
+    Evaluation of every empty cell of a specific Tic-Tac-Toe game.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = AnalysisSerializer
+
+    async def get(self, request, **kwargs):
+        """
+        Win, draw or loss and how many moves away it is, for each cell the player to move can take.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        self.log.debug("User %s wants some coaching!", request.user.username)
+        game_id = kwargs.get("game_id")
+        current = await agame_version(game_id)
+        if current is not None:
+            not_modified = self._not_modified(request, current[0])
+            if not_modified is not None:
+                return self._cache(not_modified, *current)
+
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await agame_analysis(game_id)
+        if current is None:
+            response_code = status.HTTP_404_NOT_FOUND
+        elif status_message == "ok":
+            response_code = status.HTTP_200_OK
+        response = self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )
+        if status_message == "ok":
+            return self._cache(response, *current)
+        return response
+
+
+class ReplayView(TicToTacToToeAsyncAPIView):
+    """
+    A specific Tic-Tac-Toe game as it stood after any of its plies.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ReplaySerializer
+
+    @extend_schema(parameters=[OpenApiParameter("ply", int)])
+    async def get(self, request, **kwargs):
+        """
+        The board after a number of moves, the latest when no ply is given.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        self.log.debug("User %s is replaying a game!", request.user.username)
+        game_id = kwargs.get("game_id")
+        current = await agame_version(game_id)
+        if current is not None:
+            not_modified = self._not_modified(request, current[0])
+            if not_modified is not None:
+                return self._cache(not_modified, *current)
+
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await agame_replay(
+            game_id, request.query_params.get("ply")
+        )
+        if current is None:
+            response_code = status.HTTP_404_NOT_FOUND
+        elif status_message == "ok":
+            response_code = status.HTTP_200_OK
+        response = self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )
+        if status_message == "ok":
+            return self._cache(response, *current)
+        return response
+
+
+class MovesBatchView(TicToTacToToeAsyncAPIView):
+    """
+    Batches of moves across Tic-Tac-Toe games, for bots and replays.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = MovesBatchSerializer
+
+    async def post(self, request, **kwargs):
+        """
+        Make many moves at once, each move gets its own result in the order they were sent.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        self.log.debug("User %s is making a batch of moves!", request.user.username)
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await amoves_post(request.user, request.data)
+        if status_message == "ok":
+            response_code = status.HTTP_200_OK
+        return self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )
+
+
+class EvaluateView(TicToTacToToeAsyncAPIView):
+    """
+    Classification of boards that are not part of any Tic-Tac-Toe game.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = EvaluateSerializer
+
+    async def post(self, request, **kwargs):
+        """
+        Evaluate many boards at once, each gets the state it is in or illegal in the order sent.
+
+        :param request: Django request object.
+        :param kwargs: Keyword arguments.
+        :return: Api Response.
+        """
+
+        self.log.debug("User %s is evaluating boards!", request.user.username)
+        response_code = status.HTTP_400_BAD_REQUEST
+        status_message, message, data = await aevaluate_post(request.data)
+        if status_message == "ok":
+            response_code = status.HTTP_200_OK
+        return self._response(
+            data=data,
+            response_code=response_code,
+            message=message,
+            status_message=status_message,
+        )